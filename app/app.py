@@ -1,11 +1,110 @@
+import os
+import sys
+from datetime import date
 import streamlit as st
 import polars as pl
 import joblib
-import numpy as np
+
+# Permet d'importer src avec `streamlit run app/app.py` depuis la racine du projet
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.preprocessing.preprocessing import build_prediction_features
+from src.preprocessing.form import RollingForm
+from src.preprocessing.head_to_head import HeadToHead
+from src.preprocessing.rankings import rankings_asof, scan_ranking_snapshots
+from src.preprocessing.ratings import EloRatings
+from src.models.compact import CompactEnsemble
+from src.models.feature_selection import apply_feature_schema, load_feature_schema
+from src.models.registry import ModelRegistry, PromotedModel
+
+
+ELO_RATINGS_FILE = "data/elo_ratings.npz"
+MATCHES_FILE = "data/matchs.parquet"
+FORM_FILE = "data/form.npz"
+MODEL_FILE = "data/best_model.joblib"
+# Modèle compilé par scripts/models/export_model.py, plus rapide et plus léger,
+# utilisé s'il n'est pas plus ancien que le modèle sauvegardé
+COMPACT_MODEL_FILE = "data/best_model_compact.npz"
+
+
+@st.cache_resource
+def served_model() -> PromotedModel:
+    """
+    Version promue du registre, partagée par les sessions et remplacée à chaque promotion.
+    Lève FileNotFoundError (non mis en cache) tant qu'aucune version n'a été promue.
+    """
+    return PromotedModel(ModelRegistry())
+
+
+@st.cache_resource
+def saved_model() -> object:
+    """Modèle sauvegardé hors registre, compilé s'il n'est pas plus ancien."""
+    if os.path.exists(COMPACT_MODEL_FILE) and os.path.getmtime(COMPACT_MODEL_FILE) >= os.path.getmtime(MODEL_FILE):
+        return CompactEnsemble.load(COMPACT_MODEL_FILE)
+    return joblib.load(MODEL_FILE)
+
+
+def current_model() -> tuple[object, list[str] | None]:
+    """
+    Modèle servi et ses variables.
+
+    Returns:
+        tuple[object, list[str] | None]: Modèle de la version promue et son schéma de
+        variables, ou à défaut le modèle sauvegardé et les variables de
+        scripts/models/feature_selection.py (toutes si None).
+    """
+    try:
+        model, metadata = served_model().get()
+    except FileNotFoundError:
+        return saved_model(), load_feature_schema()
+    return model, metadata["features"]
 
 
-model = joblib.load("data/best_model.joblib")
 player_data = pl.read_parquet("data/tennis_dataset_app.parquet")
+elo_ratings = EloRatings.load(ELO_RATINGS_FILE) if os.path.exists(ELO_RATINGS_FILE) else None
+# Dernier classement connu : les lignes du dataset app donnent celui du dernier match
+current_rankings = {
+    row.pop("nom_joueur"): row
+    for row in rankings_asof(scan_ranking_snapshots(), date.today()).iter_rows(named=True)
+}
+form = RollingForm.load(FORM_FILE) if os.path.exists(FORM_FILE) else None
+head_to_head = (
+    HeadToHead(
+        pl.read_parquet(MATCHES_FILE),
+        dict(player_data.select("player1_name", "player1_ranking").iter_rows()),
+    )
+    if os.path.exists(MATCHES_FILE)
+    else None
+)
+
+
+def current_player_features(player: str, opponent: str, surface: str) -> dict:
+    """
+    Récupère les features d'un joueur pour un match à venir.
+
+    Args:
+        player (str): Nom du joueur.
+        opponent (str): Nom de l'adversaire.
+        surface (str): Surface du match.
+
+    Returns:
+        dict: Features du joueur sans le préfixe "player1_", avec son dernier classement ATP,
+        ses classements Elo actuels (après son dernier match) sur la surface choisie, sa forme
+        et ses confrontations avec l'adversaire à ce jour.
+    """
+    stats = player_data.filter(pl.col("player1_name") == player).row(0, named=True)
+    features = {key.removeprefix("player1_"): value for key, value in stats.items()}
+    features.update(current_rankings.get(player, {}))
+    if elo_ratings is not None and "elo" in features:
+        features["elo"] = elo_ratings.rating(player)
+        features["elo_surface"] = elo_ratings.rating(player, surface)
+    if form is not None and "form_win_rate" in features:
+        features.update(form.snapshot(player, date.today()))
+    if head_to_head is not None and "h2h_wins" in features:
+        features.update(
+            head_to_head.features([player], [opponent], [date.today()]).row(0, named=True)
+        )
+    return features
 
 
 def display_top_200():
@@ -90,52 +189,30 @@ def predict_match():
         "Choisissez une surface", ["Dure", "Salle", "Terre Battue", "Gazon"]
     )
     surface_mapping = {
-        "Dure": [1, 0, 0, 0],
-        "Salle": [0, 1, 0, 0],
-        "Terre Battue": [0, 0, 1, 0],
-        "Gazon": [0, 0, 0, 1],
+        "Dure": "dure",
+        "Salle": "salle",
+        "Terre Battue": "terre battue",
+        "Gazon": "gazon",
     }
-    surface_one_hot = surface_mapping[surface]
+    surface_value = surface_mapping[surface]
 
     if st.button("Prédire l'issue du match"):
-        player1_stats = (
-            player_data.filter(pl.col("player1_name") == player1)
-            .select(pl.col(player_data.columns[1:26]))
-            .to_numpy()
-        )
-        player2_stats = (
-            player_data.filter(pl.col("player1_name") == player2)
-            .select(pl.col(player_data.columns[1:26]))
-            .to_numpy()
-        )
+        model, feature_schema = current_model()
+        player1_stats = current_player_features(player1, player2, surface_value)
+        player2_stats = current_player_features(player2, player1, surface_value)
 
-        match_data = np.concatenate([player1_stats[0], player2_stats[0]]).reshape(1, -1)
-
-        additional_features = [
-            abs(match_data[0][1] - match_data[0][26]),
-            abs(match_data[0][2] - match_data[0][27]),
-            abs(match_data[0][3] - match_data[0][28]),
-            abs(match_data[0][4] - match_data[0][29]),
-            abs(match_data[0][5] - match_data[0][30]),
-            abs(match_data[0][24] - match_data[0][49]),
-            abs(match_data[0][23] - match_data[0][48]),
-            abs(match_data[0][7] - match_data[0][32]),
-            abs(match_data[0][9] - match_data[0][34]),
-            abs(match_data[0][11] - match_data[0][36]),
-            abs(match_data[0][13] - match_data[0][38]),
-        ]
-
-        tournament_and_surface_features = [tournament_encoded] + surface_one_hot
-        match_data_with_all_features = np.append(
-            match_data, additional_features + tournament_and_surface_features
-        ).reshape(1, -1)
+        match_features = apply_feature_schema(
+            build_prediction_features(player1_stats, player2_stats, tournament_encoded, surface_value),
+            feature_schema,
+        )
 
-        if match_data_with_all_features.shape[1] != 66:
+        if match_features.width != model.n_features_in_:
             st.error(
-                f"Erreur : Le modèle attend 66 colonnes, mais l'entrée en contient {match_data_with_all_features.shape[1]}."
+                f"Erreur : Le modèle attend {model.n_features_in_} colonnes, mais l'entrée en contient {match_features.width}."
             )
             return
 
+        match_data_with_all_features = match_features.to_numpy()
         probabilities = model.predict_proba(match_data_with_all_features)
 
         st.header("Probabilités de victoire :")
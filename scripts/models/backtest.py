@@ -0,0 +1,38 @@
+"""Script pour évaluer le modèle retenu dans l'ordre chronologique (après models.py)
+
+    Chaque période de 90 jours est prédite par un modèle entraîné sur les matchs
+    antérieurs (mêmes hyperparamètres que best_model.joblib). `--warm-start` met à jour
+    le modèle période après période au lieu de le réentraîner.
+
+    Return : backtest_predictions.parquet (une ligne par match prédit)
+"""
+
+import logging
+import os
+import sys
+import polars as pl
+from joblib import load
+from src.logging.logging_config import setup_logging
+from src.models.backtest import backtest
+from src.models.cache import CVCache
+from src.models.feature_selection import load_feature_schema
+from src.models.retrain import MODEL_PATH
+
+setup_logging("backtest.log")
+logger: logging.Logger = logging.getLogger(__name__)
+
+current_dir: str = os.getcwd()
+dataset_path: str = os.path.join(current_dir, "data", "tennis_dataset_clean.parquet")
+output_path: str = os.path.join(current_dir, "data", "backtest_predictions.parquet")
+
+# Dataset complet : la surface et la catégorie des rapports restent disponibles
+# même si la sélection de variables les a retirées du modèle
+df: pl.DataFrame = pl.read_parquet(dataset_path)
+model = load(MODEL_PATH)
+
+mode = "warm_start" if "--warm-start" in sys.argv else "retrain"
+results = backtest(df, model, mode=mode, cache=CVCache(), features=load_feature_schema())
+
+for name in ("folds", "by_surface", "by_category"):
+    logger.info(f"Métriques {name} :\n{results[name]}")
+results["predictions"].write_parquet(output_path)
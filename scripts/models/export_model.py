@@ -0,0 +1,48 @@
+"""Script pour compiler best_model.joblib en modèle compact pour l'application
+
+    Return : best_model_compact.npz (les versions du registre ont déjà leur artefact "compact",
+    voir `ModelRegistry.register`)
+"""
+
+import logging
+import os
+import numpy as np
+import polars as pl
+from joblib import load
+from src.logging.logging_config import setup_logging
+from src.models.compact import compile_model
+from src.models.feature_selection import apply_feature_schema, load_feature_schema
+from src.models.profiling import profile_model
+from src.models.retrain import features_and_target
+
+setup_logging("export_model.log")
+logger: logging.Logger = logging.getLogger(__name__)
+
+current_dir: str = os.getcwd()
+dataset_path: str = os.path.join(current_dir, "data", "tennis_dataset_clean.parquet")
+model_path: str = os.path.join(current_dir, "data", "best_model.joblib")
+output_path: str = os.path.join(current_dir, "data", "best_model_compact.npz")
+
+# Écart maximal de probabilité accepté entre le modèle compilé et le modèle d'origine
+TOLERANCE = 1e-5
+# Arbres constants à cette précision près retirés (0 = sans perte)
+prune_tol = 0.0
+
+model = load(model_path)
+compact = compile_model(model, prune_tol=prune_tol)
+
+df = apply_feature_schema(pl.read_parquet(dataset_path).head(10_000), load_feature_schema())
+X, _ = features_and_target(df)
+ecart = float(np.abs(compact.predict_proba(X) - model.predict_proba(X)).max())
+if ecart > TOLERANCE:
+    raise ValueError(f"Le modèle compilé s'écarte du modèle d'origine de {ecart:.2e} (> {TOLERANCE}).")
+
+compact.save(output_path)
+
+for name, profiled in (("origine", model), ("compilé", compact)):
+    profile = profile_model(profiled, X)
+    logger.info(
+        f"Modèle {name} : prédiction p50 {profile['predict_p50_ms']:.3f} ms, "
+        f"p99 {profile['predict_p99_ms']:.3f} ms, taille {profile['size_mb']:.1f} Mo"
+    )
+logger.info(f"Modèle compilé sauvegardé dans {output_path} (écart maximal {ecart:.2e}).")
@@ -0,0 +1,41 @@
+"""Script pour choisir les variables du modèle, entre creation_dataset_clean.py et models.py
+
+    Compare précision, temps d'entraînement et de prédiction de plusieurs jeux de variables
+    et garde le plus petit à la précision équivalente.
+
+    Return : features.json (variables retenues, utilisées par models.py, retrain.py et l'application)
+"""
+
+import logging
+import os
+import polars as pl
+from src.logging.logging_config import setup_logging
+from src.models.feature_selection import (
+    evaluate_feature_sets,
+    propose_feature_sets,
+    save_feature_schema,
+    select_feature_set,
+)
+from src.models.models_selector import SEED
+
+setup_logging("feature_selection.log")
+logger: logging.Logger = logging.getLogger(__name__)
+
+current_dir: str = os.getcwd()
+dataset_path: str = os.path.join(current_dir, "data", "tennis_dataset_clean.parquet")
+output_path: str = os.path.join(current_dir, "data", "features.json")
+
+df: pl.DataFrame = pl.read_parquet(dataset_path)
+
+# Importance par 'permutation' (plus fiable) ou par le 'model' (plus rapide)
+importance = 'permutation'
+
+feature_sets = propose_feature_sets(df, SEED, importance=importance)
+report = evaluate_feature_sets(df, feature_sets, SEED)
+selected = select_feature_set(report)
+
+save_feature_schema(selected["features"], output_path, report)
+logger.info(
+    f"Jeu retenu : {selected['name']} ({selected['n_features']} variables sur "
+    f"{report[0]['n_features']}), accuracy {selected['accuracy']:.4f}."
+)
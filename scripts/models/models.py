@@ -3,22 +3,67 @@ import logging
 import os
 from joblib import dump
 from src.logging.logging_config import setup_logging
+from src.models.cache import CVCache, dataset_fingerprint
+from src.models.feature_selection import apply_feature_schema, load_feature_schema
+from src.models.journal import SearchJournal
 from src.models.models_selector import find_best_model, SEED
+from src.models.registry import ModelRegistry
+from src.models.retrain import MANIFEST_PATH, features_and_target, load_manifest, record_version, save_manifest
 
 setup_logging("models.log")
 logger: logging.Logger = logging.getLogger(__name__)  
 
 current_dir: str = os.getcwd()
 dataset_path: str = os.path.join(current_dir, "data", "tennis_dataset_clean.parquet")
-df: pl.DataFrame = pl.read_parquet(dataset_path)
+df_full: pl.DataFrame = pl.read_parquet(dataset_path)
 
-df = df.drop("player1_name", "player2_name", "date") 
+# Variables retenues par feature_selection.py (toutes si la sélection n'a pas été faite)
+feature_schema = load_feature_schema()
+df_full = apply_feature_schema(df_full, feature_schema)
+df = df_full.drop("player1_name", "player2_name", "date")
 
-results = find_best_model(df, SEED)
+# Stratégie de recherche : 'exhaustive', 'halving' ou 'tpe' (voir cross_validate_models)
+strategy = 'exhaustive'
+# Contraintes de service (None = pas de contrainte) : latence p99 d'une prédiction en ms,
+# taille du modèle en Mo, et écart de précision sous lequel le modèle le plus rapide l'emporte
+max_latency_ms = None
+max_size_mb = None
+accuracy_tolerance = 0.0
+
+# Les candidats déjà évalués sur les mêmes données ne sont pas ré-entraînés,
+# et une recherche interrompue reprend depuis son journal
+journal = SearchJournal()
+results = find_best_model(
+    df,
+    SEED,
+    strategy=strategy,
+    cache=CVCache(),
+    journal=journal,
+    max_latency_ms=max_latency_ms,
+    max_size_mb=max_size_mb,
+    accuracy_tolerance=accuracy_tolerance,
+)
 
 output_file = 'data/best_model.joblib'
 dump(results['best_model'], output_file)
 logger.info("Modele sauvergardé")
 
+# Point de départ des mises à jour incrémentales (voir retrain.py)
+manifest = load_manifest(MANIFEST_PATH)
+record_version(manifest, df_full, "search", results['best_model'], results['accuracy'])
+save_manifest(manifest, MANIFEST_PATH)
+journal.clear()
+
+# Nouvelle version servie par l'application sans redémarrage
+ModelRegistry().register(
+    results['best_model'],
+    feature_schema,
+    dataset_fingerprint(*features_and_target(df_full)),
+    results['profiles'][results['model_name']],
+    promote=True,
+    mode="search",
+    n_rows=df_full.height,
+)
+
 logger.info(f"Meilleur modèle : {results['model_name']}")
 logger.info(f"Précision : {results['accuracy']}")
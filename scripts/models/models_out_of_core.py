@@ -0,0 +1,50 @@
+"""Script pour entraîner le modèle sur un dataset trop grand pour la mémoire,
+en lisant tennis_dataset_clean.parquet par paquets de lignes
+
+    Return : best_model.joblib (même format que models.py), et nouvelle version promue du registre
+"""
+
+import logging
+import os
+import polars as pl
+from joblib import dump
+from src.logging.logging_config import setup_logging
+from src.models.cache import file_fingerprint
+from src.models.feature_selection import load_feature_schema
+from src.models.models_selector import SEED
+from src.models.out_of_core import find_best_model_out_of_core
+from src.models.registry import ModelRegistry
+from src.models.retrain import MANIFEST_PATH, load_manifest, record_version, save_manifest
+
+setup_logging("models_out_of_core.log")
+logger: logging.Logger = logging.getLogger(__name__)
+
+current_dir: str = os.getcwd()
+dataset_path: str = os.path.join(current_dir, "data", "tennis_dataset_clean.parquet")
+
+feature_schema = load_feature_schema()
+results = find_best_model_out_of_core(dataset_path, SEED, features=feature_schema)
+
+output_file = 'data/best_model.joblib'
+dump(results['best_model'], output_file)
+logger.info("Modele sauvergardé")
+
+# Seules les dates et les joueurs sont chargés pour le manifeste
+manifest = load_manifest(MANIFEST_PATH)
+dates = pl.scan_parquet(dataset_path).select("date", "player1_name", "player2_name").collect()
+record_version(manifest, dates, "search", results['best_model'], results['accuracy'])
+save_manifest(manifest, MANIFEST_PATH)
+
+# Nouvelle version servie par l'application sans redémarrage
+ModelRegistry().register(
+    results['best_model'],
+    feature_schema,
+    file_fingerprint(dataset_path),
+    results['profiles'][results['model_name']],
+    promote=True,
+    mode="search",
+    n_rows=dates.height,
+)
+
+logger.info(f"Meilleur modèle : {results['model_name']}")
+logger.info(f"Précision : {results['accuracy']}")
@@ -0,0 +1,40 @@
+"""Script pour mettre à jour best_model.joblib avec les matchs ajoutés depuis son
+dernier entraînement (à lancer après chaque crawl)
+
+    Mise à jour incrémentale par défaut, réentraînement complet quand le manifeste
+    data/best_model.json le demande (voir full_retrain_reason).
+"""
+
+import os
+import sys
+import logging
+import polars as pl
+from joblib import load
+from src.logging.logging_config import setup_logging
+from src.models.feature_selection import apply_feature_schema, load_feature_schema
+from src.models.cache import dataset_fingerprint
+from src.models.registry import ModelRegistry
+from src.models.retrain import MANIFEST_PATH, MODEL_PATH, features_and_target, retrain
+
+setup_logging("retrain.log")
+logger: logging.Logger = logging.getLogger(__name__)
+
+current_dir: str = os.getcwd()
+dataset_path: str = os.path.join(current_dir, "data", "tennis_dataset_clean.parquet")
+feature_schema = load_feature_schema()
+df: pl.DataFrame = apply_feature_schema(pl.read_parquet(dataset_path), feature_schema)
+
+# Les modèles hors mémoire sont réentraînés en relisant le fichier par paquets
+version = retrain(df, MODEL_PATH, MANIFEST_PATH, force_full="--full" in sys.argv, dataset_path=dataset_path)
+if version is not None:
+    logger.info(f"Version {version['version']} ({version['mode']}) sur {version['n_rows']} matchs.")
+    # Promue aussitôt : l'application la charge sans redémarrer
+    ModelRegistry().register(
+        load(MODEL_PATH),
+        feature_schema,
+        dataset_fingerprint(*features_and_target(df)),
+        {'accuracy': version['accuracy'], 'accuracy_new_rows': version['accuracy_new_rows']},
+        promote=True,
+        mode=version['mode'],
+        n_rows=version['n_rows'],
+    )
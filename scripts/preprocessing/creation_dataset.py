@@ -3,8 +3,9 @@
     Return : tennis_dataset_raw.csv
 """
 
-from polars import DataFrame
 import src.preprocessing.preprocessing as pre
+from src.preprocessing.rankings import scan_ranking_snapshots
+from src.preprocessing.tournaments import build_tournament_table
 from src.logging.logging_config import setup_logging
 import logging
 
@@ -15,6 +16,10 @@ logger.info("Script de scraping des données des joueurs démarré.")
 logger.info("Chargement des données...")
 
 output_file = "data/tennis_dataset_raw.parquet"
+ratings_file = "data/elo_ratings.npz"
+form_file = "data/form.npz"
+matches_file = "data/matchs.parquet"
+tournaments_file = "data/tournois.parquet"
 
 try:
     joueurs_data, detail_joueurs, stats_matches = pre.load_data(
@@ -29,11 +34,26 @@ except Exception as e:
 
 try:
     logger.info("Création du dataset d'entraînement...")
-    df: DataFrame = pre.create_training_dataset(
-        joueurs_data, detail_joueurs, stats_matches
+    match_stream = pre.build_match_stream(detail_joueurs)
+    # Seuls les matchs absents des états sauvegardés font évoluer l'Elo et la forme
+    ratings, form = pre.load_incremental_state(match_stream, ratings_file, form_file)
+    pre.write_training_dataset(
+        joueurs_data,
+        detail_joueurs,
+        stats_matches,
+        output_file,
+        ratings=ratings,
+        form=form,
+        # Classement en vigueur à la date de chaque match (voir scraping_classement.py)
+        ranking_snapshots=scan_ranking_snapshots(),
     )
-    df.write_parquet(output_file)
     logger.info("Dataset brut sauvegardé dans 'data/tennis_dataset_raw.parquet'.")
+    # Classements Elo et forme après le dernier match, utilisés par l'application
+    ratings.save(ratings_file)
+    form.save(form_file)
+    # Historique des matchs (confrontations directes dans l'application) et table des tournois
+    match_stream.write_parquet(matches_file)
+    build_tournament_table(match_stream).write_parquet(tournaments_file)
 except Exception as e:
     logger.error(f"Erreur lors de la création du dataset : {e}")
     raise
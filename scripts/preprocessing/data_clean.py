@@ -2,18 +2,13 @@
 
     Return : stats_matchs_cleaned.json
 """ 
-import json
-from src.preprocessing.preprocessing import replace_empty_values_with_na
+from src.preprocessing.json_stream import write_json_items
+from src.preprocessing.preprocessing import iter_stats_matches
 
 input_file = "data/stats_matchs.json"
 output_file = "data/stats_matchs_cleaned.json"
 
-with open(input_file, "r", encoding="utf-8") as f:
-    data = json.load(f)
-
-cleaned_data = replace_empty_values_with_na(data)
-
-with open(output_file, "w", encoding="utf-8") as f:
-    json.dump(cleaned_data, f, ensure_ascii=False, indent=4)
+# Les matchs sont lus, nettoyés et réécrits un par un
+write_json_items(output_file, iter_stats_matches(input_file))
 
 print(f"Fichier nettoyé sauvegardé dans {output_file}")
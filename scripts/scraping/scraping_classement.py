@@ -10,6 +10,8 @@ import src.scraping.scrap_page_classement as spp
 import Ligne
 import json
 import os
+from datetime import date
+from src.preprocessing.rankings import write_ranking_snapshot
 
 ADRESSE = "https://www.tennisendirect.net/atp/classement/"
 
@@ -52,3 +54,5 @@ with open(file_path, "w") as fichier:
         )
     )
 
+# Historique du classement : seuls les changements depuis le dernier snapshot sont écrits
+write_ranking_snapshot([joueur.__dict__ for joueur in joueurs], date.today())
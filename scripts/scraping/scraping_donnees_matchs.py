@@ -1,12 +1,14 @@
 import json
 import os
 import time
+from datetime import datetime
 import logging
 import src.scraping.scrap_page_match as spb
 from requests import Response, get
 from random import uniform
 from bs4 import BeautifulSoup
 from src.logging.logging_config import setup_logging
+from src.preprocessing.preprocessing import select_match_links
 from tqdm import tqdm 
 
 setup_logging("scraping_donnees_matchs.log")
@@ -16,27 +18,11 @@ current_dir: str = os.getcwd()
 output_file: str = os.path.join(current_dir, "data", "stats_matchs.json")
 
 path_detail_joueurs: str = os.path.join(current_dir, "data", "detail_joueurs.json")
-try:
-    with open(path_detail_joueurs, "r") as fichier:
-        detail_joueurs = json.load(fichier)
-        logger.info(f"Fichier {path_detail_joueurs} chargé avec succès.")
-except Exception as e:
-    logger.error(f"Erreur lors du chargement de {path_detail_joueurs}: {e}")
-    raise
-
-liens_match = set()
-for key, value in detail_joueurs.items():
-    joueur = detail_joueurs[key]
-    matchs = joueur['matchs']
-    
-    for i in range(len(matchs)):
-        lien_match = matchs[i]['lien_detail_match']
-        liens_match.add(lien_match)
-
-id_matchs = {f"match_{i+1}": lien for i, lien in enumerate(liens_match)}
+path_joueurs: str = os.path.join(current_dir, "data", "joueurs.json")
 
-nombre_matchs_scrap = 100
-premiers_liens_avec_id = {key: id_matchs[key] for key in list(id_matchs.keys())}
+# Fenêtre des matchs à récupérer (None = pas de limite)
+date_min: datetime | None = None
+date_max: datetime | None = None
 
 if os.path.exists(output_file):
     try:
@@ -50,6 +36,30 @@ else:
     match_data = {}
     logger.info(f"Aucun fichier {output_file} trouvé. Un nouveau sera créé.")
 
+try:
+    # Seuls les matchs qui peuvent servir aux variables du dataset sont récupérés
+    liens_match, rapport = select_match_links(
+        path_detail_joueurs,
+        path_joueurs,
+        stored_links={match["lien_match"] for match in match_data.values()},
+        date_min=date_min,
+        date_max=date_max,
+    )
+    logger.info(f"Fichier {path_detail_joueurs} chargé avec succès.")
+    print(
+        f"{rapport['a_recuperer']} matchs à récupérer, "
+        f"{rapport['total'] - rapport['a_recuperer']} requêtes évitées sur {rapport['total']}."
+    )
+except Exception as e:
+    logger.error(f"Erreur lors du chargement de {path_detail_joueurs}: {e}")
+    raise
+
+# Les identifiants continuent ceux déjà enregistrés pour ne pas les écraser
+premier_id = max((int(id_match.split("_")[-1]) for id_match in match_data), default=0)
+premiers_liens_avec_id = {
+    f"match_{premier_id + i + 1}": lien for i, lien in enumerate(liens_match)
+}
+
 for id_match, lien_match in tqdm(premiers_liens_avec_id.items(), desc="Scraping des matchs", unit="match"):
     logger.info(f"Début du scraping pour {id_match} : {lien_match}...")
     
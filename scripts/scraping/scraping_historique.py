@@ -0,0 +1,55 @@
+"""Script pour récupérer l'historique des matchs des joueurs, saison par saison
+
+    Chaque (joueur, saison) est une tâche indépendante, exécutée en parallèle et
+    sauvegardée dans data/historique/ : un lancement interrompu reprend là où il
+    s'était arrêté. Les matchs récupérés sont ensuite ajoutés à detail_joueurs.json.
+"""
+
+import os
+import time
+import logging
+from random import uniform
+from requests import get
+from src.logging.logging_config import setup_logging
+from src.preprocessing.json_stream import iter_json_items, write_json_items
+from src.scraping.historique import executer_taches, fusionner_historique, generer_taches
+
+setup_logging("scraping_historique.log")
+logger: logging.Logger = logging.getLogger(__name__)
+
+current_dir: str = os.getcwd()
+path_joueurs: str = os.path.join(current_dir, "data", "joueurs.json")
+path_detail_joueurs: str = os.path.join(current_dir, "data", "detail_joueurs.json")
+dossier_historique: str = os.path.join(current_dir, "data", "historique")
+
+# Saisons à récupérer (None = toutes celles présentes dans les statistiques des joueurs)
+annees: set[str] | None = None
+nombre_workers = 4
+
+
+def telecharger(url: str) -> str:
+    reponse = get(url)
+    reponse.raise_for_status()
+    # Pause par requête : le débit total reste d'environ nombre_workers requêtes toutes les 2 à 5 s
+    time.sleep(uniform(2, 5))
+    return reponse.text
+
+
+liens_joueurs = {
+    joueur["nom_joueur"]: joueur["lien_joueur"] for _, joueur in iter_json_items(path_joueurs)
+}
+taches = generer_taches(
+    iter_json_items(path_detail_joueurs), liens_joueurs, dossier_historique, annees
+)
+logger.info(f"{len(taches)} saisons à récupérer.")
+
+rapport = executer_taches(taches, telecharger, dossier_historique, max_workers=nombre_workers)
+logger.info(
+    f"{rapport['terminees']} saisons récupérées ({rapport['matchs']} matchs), "
+    f"{rapport['en_erreur']} en erreur (reprises au prochain lancement)."
+)
+
+detail_joueurs = dict(iter_json_items(path_detail_joueurs))
+fusionner_historique(detail_joueurs, dossier_historique)
+write_json_items(path_detail_joueurs, detail_joueurs.items())
+logger.info(f"Historique ajouté dans {path_detail_joueurs}.")
@@ -0,0 +1,219 @@
+"""Module pour évaluer un modèle dans l'ordre chronologique (walk-forward) : à chaque
+période, le modèle est entraîné sur les matchs passés et prédit ceux de la période
+"""
+
+import logging
+from contextlib import nullcontext
+import numpy as np
+import polars as pl
+from joblib import Parallel, delayed
+from threadpoolctl import threadpool_limits
+from src.models.cache import CVCache, candidate_key, dataset_fingerprint
+from src.models.feature_selection import apply_feature_schema
+from src.models.matrix import shared_arrays
+from src.models.models_selector import _with_threads, split_cpu_budget
+from src.models.retrain import features_and_target, incremental_fit, match_dates, supports_incremental
+from src.preprocessing.preprocessing import SURFACE_DUMMIES
+
+logger = logging.getLogger(__name__)
+
+# Durée de chaque période de test et historique minimal avant la première
+TEST_DAYS = 90
+MIN_TRAIN_DAYS = 365
+# Probabilités bornées pour le log-loss
+EPSILON = 1e-15
+
+
+def walk_forward_folds(
+    dates: np.ndarray, test_days: int = TEST_DAYS, min_train_days: int = MIN_TRAIN_DAYS
+) -> list[tuple[int, int]]:
+    """
+    Découpe l'historique en périodes de test successives.
+
+    Args:
+        dates (np.ndarray): Dates des matchs triées (datetime64[D]).
+        test_days (int): Durée d'une période de test.
+        min_train_days (int): Historique minimal avant la première période.
+
+    Returns:
+        list[tuple[int, int]]: (début, fin) des lignes de test de chaque période : le fold
+        s'entraîne sur les lignes [0, début) et prédit les lignes [début, fin).
+    """
+    if len(dates) == 0:
+        return []
+    boundary = dates[0] + np.timedelta64(min_train_days, "D")
+    step = np.timedelta64(test_days, "D")
+
+    folds = []
+    while boundary <= dates[-1]:
+        start = int(np.searchsorted(dates, boundary, side="left"))
+        end = int(np.searchsorted(dates, boundary + step, side="left"))
+        if end > start and start > 0:
+            folds.append((start, end))
+        boundary += step
+    return folds
+
+
+def _fit_predict_fold(model, X, y, start: int, end: int, inner_jobs: int) -> np.ndarray:
+    """Entraîne une copie du modèle sur le passé d'un fold et prédit sa période de test."""
+    with threadpool_limits(limits=inner_jobs):
+        fitted = _with_threads(model, {}, inner_jobs).fit(X[:start], y[:start])
+        return fitted.predict_proba(X[start:end])[:, 1]
+
+
+def _surface(df: pl.DataFrame) -> pl.Expr:
+    """Surface du match, à partir des indicatrices du dataset propre ("autre" sinon)."""
+    surfaces = [
+        pl.when(pl.col(column) == 1).then(pl.lit(surface))
+        for column, surface in SURFACE_DUMMIES.items()
+        if column in df.columns
+    ]
+    return pl.coalesce(*surfaces, pl.lit("autre"))
+
+
+def _category(df: pl.DataFrame) -> pl.Expr:
+    """Catégorie du tournoi, si le dataset la contient."""
+    if "tournament_category" in df.columns:
+        return pl.col("tournament_category")
+    return pl.lit(None, dtype=pl.Int64).alias("tournament_category")
+
+
+def score_predictions(predictions: pl.DataFrame, by: str | None = None) -> pl.DataFrame:
+    """
+    Log-loss, score de Brier et précision des prédictions, globalement ou par groupe.
+
+    Args:
+        predictions (pl.DataFrame): Colonnes "proba" (victoire du joueur 1) et "target".
+        by (str | None): Colonne de regroupement (ex. "fold", "surface", "tournament_category").
+
+    Returns:
+        pl.DataFrame: Une ligne par groupe avec "n", "log_loss", "brier" et "accuracy".
+    """
+    p = pl.col("proba").clip(EPSILON, 1 - EPSILON)
+    y = pl.col("target")
+    metrics = [
+        pl.len().alias("n"),
+        (-(y * p.log() + (1 - y) * (1 - p).log())).mean().alias("log_loss"),
+        ((pl.col("proba") - y) ** 2).mean().alias("brier"),
+        ((pl.col("proba") > 0.5).cast(pl.Int64) == y).mean().alias("accuracy"),
+    ]
+    if by is None:
+        return predictions.select(metrics)
+    return predictions.group_by(by).agg(metrics).sort(by)
+
+
+def backtest(
+    df: pl.DataFrame,
+    model,
+    test_days: int = TEST_DAYS,
+    min_train_days: int = MIN_TRAIN_DAYS,
+    mode: str = "retrain",
+    n_jobs: int | None = None,
+    inner_jobs: int = 1,
+    cache: CVCache | None = None,
+    features: list[str] | None = None,
+) -> dict:
+    """
+    Rejoue l'historique des matchs dans l'ordre chronologique.
+
+    En mode 'retrain', chaque fold réentraîne une copie du modèle sur tout son passé :
+    les folds sont indépendants et répartis sur les processus, qui partagent la matrice
+    des variables en memmap. En mode 'warm_start', le modèle du fold précédent est mis
+    à jour avec les matchs de la période précédente (voir `incremental_fit`), ce qui
+    impose un ordre séquentiel. Les prédictions d'un fold sont mises en cache : après
+    l'ajout de nouveaux matchs, seuls les nouveaux folds sont calculés.
+
+    Args:
+        df (pl.DataFrame): Dataset propre complet (colonnes "date" et "target", variables).
+        model: Modèle non entraîné dont les hyperparamètres sont évalués.
+        test_days (int): Durée d'une période de test.
+        min_train_days (int): Historique minimal avant la première période.
+        mode (str): 'retrain' ou 'warm_start'.
+        n_jobs (int | None): Nombre total de cœurs.
+        inner_jobs (int): Threads par fit.
+        cache (CVCache | None): Cache des prédictions de chaque fold ('retrain' uniquement).
+        features (list[str] | None): Variables du modèle (voir `load_feature_schema`, toutes
+            si None). Surface et catégorie des rapports sont lues dans `df` complet, même si
+            la sélection les a retirées des variables.
+
+    Returns:
+        dict: Un dictionnaire contenant :
+            - 'predictions' (pl.DataFrame): Une ligne par match prédit ("date", "fold",
+              "surface", "tournament_category", "proba", "target").
+            - 'summary' (dict): Métriques globales (voir `score_predictions`).
+            - 'folds', 'by_surface', 'by_category' (pl.DataFrame): Métriques par groupe.
+    """
+    if mode not in ("retrain", "warm_start"):
+        raise ValueError(f"Mode inconnu : {mode} (possibles : retrain, warm_start)")
+
+    df = df.with_columns(match_dates(df).alias("date")).sort("date", maintain_order=True)
+    X, y = features_and_target(apply_feature_schema(df, features))
+    folds = walk_forward_folds(df["date"].to_numpy().astype("datetime64[D]"), test_days, min_train_days)
+    logger.info(f"Backtest {mode} : {len(folds)} périodes de {test_days} jours sur {df.height} matchs.")
+
+    if mode == "warm_start":
+        probas = _warm_start_folds(model, X, y, folds, inner_jobs)
+    else:
+        probas = _retrain_folds(model, X, y, folds, n_jobs, inner_jobs, cache)
+
+    rows = np.concatenate([np.arange(start, end) for start, end in folds]) if folds else np.zeros(0, int)
+    predictions = df[rows].select(
+        "date",
+        pl.Series("fold", np.repeat(np.arange(len(folds)), [end - start for start, end in folds])),
+        _surface(df).alias("surface"),
+        _category(df),
+        pl.Series("proba", np.concatenate(probas) if probas else np.zeros(0)),
+        "target",
+    )
+
+    summary = score_predictions(predictions).row(0, named=True)
+    logger.info(
+        f"Backtest : log-loss {summary['log_loss']:.4f}, Brier {summary['brier']:.4f}, "
+        f"accuracy {summary['accuracy']:.4f} sur {summary['n']} matchs."
+    )
+    return {
+        'predictions': predictions,
+        'summary': summary,
+        'folds': score_predictions(predictions, "fold"),
+        'by_surface': score_predictions(predictions, "surface"),
+        'by_category': score_predictions(predictions, "tournament_category"),
+    }
+
+
+def _retrain_folds(model, X, y, folds, n_jobs, inner_jobs, cache) -> list[np.ndarray]:
+    """Prédictions de chaque fold, folds absents du cache calculés en parallèle."""
+    keys = [
+        candidate_key(dataset_fingerprint(X[:end], y[:end]), model, {}, backtest_fold=(start, end))
+        for start, end in folds
+    ] if cache is not None else [None] * len(folds)
+    probas = [cache.get_scores(key) if key is not None else None for key in keys]
+    missing = [i for i, proba in enumerate(probas) if proba is None]
+
+    outer_jobs, inner_jobs = split_cpu_budget(n_jobs, inner_jobs)
+    with shared_arrays(X, y) if outer_jobs > 1 and missing else nullcontext((X, y)) as (X_shared, y_shared):
+        computed = Parallel(n_jobs=outer_jobs)(
+            delayed(_fit_predict_fold)(model, X_shared, y_shared, *folds[i], inner_jobs) for i in missing
+        )
+    for i, proba in zip(missing, computed):
+        probas[i] = proba
+        if cache is not None:
+            cache.put_scores(keys[i], proba.tolist())
+
+    if cache is not None:
+        logger.info(f"{len(folds) - len(missing)} périodes reprises du cache sur {len(folds)}.")
+    return [np.asarray(proba, dtype=float) for proba in probas]
+
+
+def _warm_start_folds(model, X, y, folds, inner_jobs) -> list[np.ndarray]:
+    """Prédictions de chaque fold avec un modèle mis à jour période après période."""
+    probas, fitted, seen = [], None, 0
+    with threadpool_limits(limits=inner_jobs):
+        for start, end in folds:
+            if fitted is None or not supports_incremental(fitted):
+                fitted = _with_threads(model, {}, inner_jobs).fit(X[:start], y[:start])
+            elif start > seen:
+                fitted = incremental_fit(fitted, X[seen:start], y[seen:start], seen)
+            seen = start
+            probas.append(fitted.predict_proba(X[start:end])[:, 1])
+    return probas
+
@@ -0,0 +1,163 @@
+import hashlib
+import json
+import logging
+import os
+import numpy as np
+from joblib import dump, load
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = "data/cache_cv"
+# Taille maximale du cache sur disque, au-delà les entrées les moins récemment utilisées sont supprimées
+MAX_CACHE_BYTES = 2 * 1024**3
+
+
+def dataset_fingerprint(X: np.ndarray, y: np.ndarray) -> str:
+    """
+    Calcule l'empreinte du contenu d'un jeu de données.
+
+    Args:
+        X (np.ndarray): Données.
+        y (np.ndarray): Étiquettes.
+
+    Returns:
+        str: Empreinte SHA-256 (forme, type et octets des deux tableaux).
+    """
+    digest = hashlib.sha256()
+    for array in (X, y):
+        array = np.ascontiguousarray(array)
+        digest.update(f"{array.shape}{array.dtype.str}".encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def file_fingerprint(path: str, chunk_size: int = 1 << 20) -> str:
+    """Empreinte SHA-256 d'un fichier lu par blocs (dataset trop grand pour la mémoire)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fichier:
+        while chunk := fichier.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def candidate_key(fingerprint: str, model, params: dict, **context) -> str:
+    """
+    Calcule la clé de cache d'un candidat : même données, même classe, mêmes
+    hyperparamètres et même découpage donnent la même clé.
+
+    Args:
+        fingerprint (str): Empreinte des données (voir `dataset_fingerprint`).
+        model: Modèle de base (non entraîné).
+        params (dict): Hyperparamètres du candidat.
+        **context: Ce qui change le résultat en dehors du modèle (graine, folds, budget...).
+
+    Returns:
+        str: Clé SHA-256.
+    """
+    all_params = {**model.get_params(deep=False), **params}
+    # Le nombre de threads ne change pas le résultat
+    all_params.pop("n_jobs", None)
+    description = json.dumps(
+        {
+            "data": fingerprint,
+            "class": f"{type(model).__module__}.{type(model).__qualname__}",
+            "params": all_params,
+            "context": context,
+        },
+        sort_keys=True,
+        default=repr,
+    )
+    return hashlib.sha256(description.encode()).hexdigest()
+
+
+class CVCache:
+    """
+    Cache disque des scores de validation croisée et des modèles entraînés.
+
+    Une entrée est un fichier par clé : `<clé>.json` pour des scores, `<clé>.joblib`
+    pour un modèle. La date de modification sert de date de dernière utilisation
+    pour l'éviction LRU quand le cache dépasse `max_bytes`.
+    """
+
+    def __init__(self, directory: str = CACHE_DIR, max_bytes: int = MAX_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str, extension: str) -> str:
+        return os.path.join(self.directory, f"{key}.{extension}")
+
+    def _hit(self, path: str) -> bool:
+        if not os.path.exists(path):
+            self.misses += 1
+            return False
+        os.utime(path)
+        self.hits += 1
+        return True
+
+    def get_scores(self, key: str) -> list[float] | None:
+        """Scores des folds d'un candidat, ou None s'ils ne sont pas en cache."""
+        path = self._path(key, "json")
+        if not self._hit(path):
+            return None
+        with open(path, "r", encoding="utf-8") as fichier:
+            return json.load(fichier)
+
+    def put_scores(self, key: str, scores: list[float]) -> None:
+        """Enregistre les scores des folds d'un candidat."""
+        self._write(self._path(key, "json"), lambda path: _write_json(path, scores))
+
+    def get_model(self, key: str) -> tuple[object, float] | None:
+        """Modèle entraîné et durée de son entraînement en secondes, ou None s'il n'est pas en cache."""
+        path = self._path(key, "joblib")
+        if not self._hit(path):
+            return None
+        entry = load(path)
+        return entry["model"], entry["fit_seconds"]
+
+    def put_model(self, key: str, model, fit_seconds: float) -> None:
+        """Enregistre un modèle entraîné avec la durée de son entraînement."""
+        entry = {"model": model, "fit_seconds": fit_seconds}
+        self._write(self._path(key, "joblib"), lambda path: dump(entry, path))
+
+    def _write(self, path: str, writer) -> None:
+        # Écriture dans un fichier temporaire puis renommage : pas d'entrée à moitié écrite
+        writer(path + ".tmp")
+        os.replace(path + ".tmp", path)
+        self.evict()
+
+    def size(self) -> int:
+        """Taille totale des entrées, en octets."""
+        return sum(entry.stat().st_size for entry in os.scandir(self.directory) if entry.is_file())
+
+    def evict(self) -> int:
+        """
+        Supprime les entrées les moins récemment utilisées jusqu'à repasser sous `max_bytes`.
+
+        Returns:
+            int: Nombre d'entrées supprimées.
+        """
+        entries = sorted(
+            (entry.stat().st_mtime_ns, entry.stat().st_size, entry.path)
+            for entry in os.scandir(self.directory)
+            if entry.is_file()
+        )
+        total = sum(size for _, size, _ in entries)
+        nb_removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+            nb_removed += 1
+
+        if nb_removed:
+            logger.info(f"{nb_removed} entrées supprimées du cache {self.directory}.")
+        return nb_removed
+
+
+def _write_json(path: str, value) -> None:
+    with open(path, "w", encoding="utf-8") as fichier:
+        json.dump(value, fichier)
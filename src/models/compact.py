@@ -0,0 +1,295 @@
+"""Module pour convertir un ensemble d'arbres entraîné (scikit-learn ou XGBoost) en
+tableaux de nœuds plats, évalués de façon vectorisée avec NumPy pour le service
+"""
+
+import json
+import logging
+import numpy as np
+import xgboost as xgb
+from sklearn.ensemble import ExtraTreesClassifier, GradientBoostingClassifier, RandomForestClassifier
+from sklearn.tree import DecisionTreeClassifier
+from src.models.out_of_core import BoosterClassifier
+
+logger = logging.getLogger(__name__)
+
+# Lignes évaluées à la fois : borne la mémoire du tableau (lignes x arbres) des nœuds courants
+CHUNK_ROWS = 4096
+
+
+def _float32_le(thresholds: np.ndarray, strict: bool = False) -> np.ndarray:
+    """
+    Seuils float32 équivalents pour des variables float32 : x <= t (ou x < t si `strict`)
+    devient x <= seuil, en arrondissant vers le bas quand la conversion arrondit vers le haut.
+    """
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+    result = thresholds.astype(np.float32)
+    if strict:
+        result = np.nextafter(result, np.float32(-np.inf))
+    else:
+        rounded_up = result.astype(np.float64) > thresholds
+        result[rounded_up] = np.nextafter(result[rounded_up], np.float32(-np.inf))
+    return result
+
+
+class CompactEnsemble:
+    """
+    Ensemble d'arbres binaire sous forme de tableaux de nœuds.
+
+    Chaque nœud a une variable, un seuil float32 (aller à gauche si x <= seuil), ses deux
+    enfants, le côté des valeurs manquantes et une valeur de feuille déjà pondérée. Les
+    feuilles pointent sur elles-mêmes : `max_depth` pas de descente suffisent pour tous les
+    arbres à la fois. La sortie brute est `bias` + la somme des feuilles atteintes, puis
+    la probabilité est cette somme ('identity', forêts) ou sa sigmoïde ('logistic', boosting).
+    """
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        missing_left: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        bias: float,
+        link: str,
+        max_depth: int,
+        n_features_in: int,
+    ):
+        self.feature = feature.astype(np.int32)
+        self.threshold = threshold.astype(np.float32)
+        self.left = left.astype(np.int32)
+        self.right = right.astype(np.int32)
+        self.missing_left = missing_left.astype(bool)
+        self.value = value.astype(np.float32)
+        self.roots = roots.astype(np.int32)
+        self.bias = float(bias)
+        self.link = link
+        self.max_depth = int(max_depth)
+        self.n_features_in_ = int(n_features_in)
+        self.classes_ = np.array([0, 1])
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            array.nbytes
+            for array in (
+                self.feature, self.threshold, self.left, self.right,
+                self.missing_left, self.value, self.roots,
+            )
+        )
+
+    def _leaves(self, X: np.ndarray) -> np.ndarray:
+        """Feuille atteinte dans chaque arbre, de forme (lignes, arbres)."""
+        node = np.broadcast_to(self.roots, (len(X), self.n_trees))
+        rows = np.arange(len(X))[:, None]
+        for _ in range(self.max_depth):
+            x = X[rows, self.feature[node]]
+            go_left = (x <= self.threshold[node]) | (np.isnan(x) & self.missing_left[node])
+            node = np.where(go_left, self.left[node], self.right[node])
+        return node
+
+    def raw_predict(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+        raw = np.empty(len(X))
+        for start in range(0, len(X), CHUNK_ROWS):
+            chunk = X[start:start + CHUNK_ROWS]
+            raw[start:start + CHUNK_ROWS] = self.value[self._leaves(chunk)].sum(axis=1, dtype=np.float64)
+        return raw + self.bias
+
+    def predict_proba(self, X) -> np.ndarray:
+        raw = self.raw_predict(X)
+        proba = 1 / (1 + np.exp(-raw)) if self.link == "logistic" else np.clip(raw, 0, 1)
+        return np.column_stack([1 - proba, proba])
+
+    def predict(self, X) -> np.ndarray:
+        return (self.predict_proba(X)[:, 1] > 0.5).astype(np.int64)
+
+    def save(self, path: str) -> None:
+        np.savez(
+            path,
+            feature=self.feature,
+            threshold=self.threshold,
+            left=self.left,
+            right=self.right,
+            missing_left=self.missing_left,
+            value=self.value,
+            roots=self.roots,
+            meta=np.array(
+                [json.dumps({
+                    "bias": self.bias,
+                    "link": self.link,
+                    "max_depth": self.max_depth,
+                    "n_features_in": self.n_features_in_,
+                })]
+            ),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "CompactEnsemble":
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"][0]))
+            return cls(
+                data["feature"],
+                data["threshold"],
+                data["left"],
+                data["right"],
+                data["missing_left"],
+                data["value"],
+                data["roots"],
+                **meta,
+            )
+
+
+def _sklearn_tree(tree, scale: float, class_value: bool) -> dict:
+    """Nœuds d'un arbre scikit-learn (`tree_`), valeurs de feuille multipliées par `scale`."""
+    is_leaf = tree.children_left < 0
+    nodes = np.arange(tree.node_count)
+    if class_value:
+        counts = tree.value[:, 0, :]
+        value = counts[:, 1] / counts.sum(axis=1)
+    else:
+        value = tree.value[:, 0, 0]
+    return {
+        "feature": np.where(is_leaf, 0, tree.feature),
+        "threshold": _float32_le(np.where(is_leaf, 0, tree.threshold)),
+        "left": np.where(is_leaf, nodes, tree.children_left),
+        "right": np.where(is_leaf, nodes, tree.children_right),
+        "missing_left": tree.missing_go_to_left.astype(bool),
+        "value": np.where(is_leaf, value * scale, 0),
+        "is_leaf": is_leaf,
+        "depth": tree.max_depth,
+    }
+
+
+def _xgboost_tree(dump: str) -> dict:
+    """Nœuds d'un arbre XGBoost à partir de son export JSON."""
+    nodes, stack = {}, [(json.loads(dump), 0)]
+    while stack:
+        node, depth = stack.pop()
+        nodes[node["nodeid"]] = (node, depth)
+        stack += [(child, depth + 1) for child in node.get("children", [])]
+
+    # Numérotation contiguë des nœuds, la racine en premier
+    index = {nodeid: i for i, nodeid in enumerate(sorted(nodes))}
+    size = len(index)
+    tree = {
+        "feature": np.zeros(size, np.int64),
+        "threshold": np.zeros(size, np.float64),
+        "left": np.arange(size),
+        "right": np.arange(size),
+        "missing_left": np.zeros(size, bool),
+        "value": np.zeros(size, np.float64),
+        "is_leaf": np.zeros(size, bool),
+        "depth": max(depth for _, depth in nodes.values()),
+    }
+    strict = np.zeros(size, bool)
+    for nodeid, (node, _) in nodes.items():
+        i = index[nodeid]
+        if "leaf" in node:
+            tree["value"][i] = node["leaf"]
+            tree["is_leaf"][i] = True
+            continue
+        tree["feature"][i] = int(node["split"].removeprefix("f"))
+        tree["threshold"][i] = node["split_condition"]
+        tree["left"][i], tree["right"][i] = index[node["yes"]], index[node["no"]]
+        tree["missing_left"][i] = node["missing"] == node["yes"]
+        strict[i] = True
+    # XGBoost va à gauche si x < seuil
+    tree["threshold"] = _float32_le(tree["threshold"], strict=True)
+    tree["threshold"][~strict] = 0
+    return tree
+
+
+def _trees(model) -> tuple[list[dict], str, int]:
+    """Arbres d'un modèle, lien de sortie et nombre de variables."""
+    if isinstance(model, (RandomForestClassifier, ExtraTreesClassifier, DecisionTreeClassifier)):
+        if list(model.classes_) != [0, 1]:
+            raise ValueError("Seule la classification binaire (classes 0 et 1) est prise en charge.")
+        estimators = model.estimators_ if hasattr(model, "estimators_") else [model]
+        scale = 1 / len(estimators)
+        return [_sklearn_tree(e.tree_, scale, True) for e in estimators], "identity", model.n_features_in_
+
+    if isinstance(model, GradientBoostingClassifier):
+        if model.estimators_.shape[1] != 1:
+            raise ValueError("Seule la classification binaire est prise en charge.")
+        trees = [_sklearn_tree(e.tree_, model.learning_rate, False) for e in model.estimators_[:, 0]]
+        return trees, "logistic", model.n_features_in_
+
+    if isinstance(model, (xgb.XGBClassifier, BoosterClassifier)):
+        booster = model.get_booster() if isinstance(model, xgb.XGBClassifier) else model.booster_
+        objective = json.loads(booster.save_config())["learner"]["objective"]["name"]
+        if objective != "binary:logistic":
+            raise ValueError(f"Objectif XGBoost non pris en charge : {objective}")
+        trees = [_xgboost_tree(dump) for dump in booster.get_dump(dump_format="json")]
+        return trees, "logistic", booster.num_features()
+
+    raise ValueError(f"Modèle non pris en charge : {type(model).__name__}")
+
+
+def _raw_margin(model, X: np.ndarray) -> np.ndarray:
+    """Sortie brute d'un modèle de boosting, pour caler le biais du modèle compilé."""
+    if isinstance(model, GradientBoostingClassifier):
+        return model.decision_function(X)
+    booster = model.get_booster() if isinstance(model, xgb.XGBClassifier) else model.booster_
+    return booster.predict(xgb.DMatrix(X), output_margin=True)
+
+
+def compile_model(model, prune_tol: float = 0.0) -> CompactEnsemble:
+    """
+    Convertit un ensemble d'arbres entraîné en `CompactEnsemble`.
+
+    Les arbres dont toutes les feuilles valent à `prune_tol` près la même chose ne
+    changent la prédiction que d'une constante : ils sont retirés et leur valeur moyenne
+    ajoutée au biais (sans perte avec `prune_tol` = 0).
+
+    Args:
+        model: RandomForestClassifier, ExtraTreesClassifier, DecisionTreeClassifier,
+            GradientBoostingClassifier, XGBClassifier ou modèle XGBoost hors mémoire (binaires).
+        prune_tol (float): Écart maximal entre les feuilles d'un arbre retiré.
+
+    Returns:
+        CompactEnsemble: Modèle compilé.
+    """
+    trees, link, n_features = _trees(model)
+
+    bias, kept = 0.0, []
+    for tree in trees:
+        leaves = tree["value"][tree["is_leaf"]]
+        if leaves.max() - leaves.min() <= prune_tol:
+            bias += float(leaves.mean())
+        else:
+            kept.append(tree)
+
+    offsets = np.cumsum([0] + [len(tree["value"]) for tree in kept])
+    arrays = {
+        key: np.concatenate([tree[key] + (offset if key in ("left", "right") else 0)
+                             for tree, offset in zip(kept, offsets)])
+        if kept else np.zeros(0)
+        for key in ("feature", "threshold", "left", "right", "missing_left", "value")
+    }
+    compact = CompactEnsemble(
+        **arrays,
+        roots=offsets[:-1],
+        bias=bias,
+        link=link,
+        max_depth=max((tree["depth"] for tree in kept), default=0),
+        n_features_in=n_features,
+    )
+
+    if link == "logistic":
+        # Constante d'initialisation du boosting (log-odds a priori, base_score)
+        x0 = np.zeros((1, n_features), dtype=np.float32)
+        compact.bias += float(_raw_margin(model, x0)[0] - compact.raw_predict(x0)[0])
+
+    logger.info(
+        f"{type(model).__name__} compilé : {compact.n_trees} arbres gardés sur {len(trees)}, "
+        f"{compact.nbytes / 1e6:.1f} Mo."
+    )
+    return compact
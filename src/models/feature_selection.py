@@ -0,0 +1,236 @@
+"""Module pour proposer un jeu de variables réduit (variables constantes, redondantes ou
+peu importantes retirées) et comparer précision et temps de calcul de chaque jeu
+"""
+
+import json
+import logging
+import os
+import time
+import numpy as np
+import polars as pl
+from scipy.cluster.hierarchy import fcluster, linkage
+from scipy.spatial.distance import squareform
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.inspection import permutation_importance
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import train_test_split
+from src.models.models_selector import N_JOBS, SEED, train_test
+from src.models.profiling import profile_model
+from src.preprocessing.preprocessing import NON_FEATURE_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+FEATURES_PATH = "data/features.json"
+
+# Deux variables plus corrélées que ce seuil (en valeur absolue) sont redondantes
+CORRELATION_THRESHOLD = 0.95
+# Parts des variables non redondantes gardées, par importance décroissante
+TOP_FRACTIONS = [0.75, 0.5, 0.25]
+# Écart de précision toléré pour préférer un jeu plus petit
+ACCURACY_TOLERANCE = 0.005
+# Part du jeu d'entraînement de `train_test` gardée pour la validation de la sélection
+VALIDATION_SIZE = 0.25
+
+REFERENCE_MODEL = RandomForestClassifier(
+    n_estimators=200, max_depth=10, max_features='sqrt', random_state=SEED
+)
+
+
+def feature_columns(df: pl.DataFrame) -> list[str]:
+    """Variables du modèle : toutes les colonnes sauf `NON_FEATURE_COLUMNS`."""
+    return [column for column in df.columns if column not in NON_FEATURE_COLUMNS]
+
+
+def load_feature_schema(path: str = FEATURES_PATH) -> list[str] | None:
+    """Variables retenues par la sélection, dans l'ordre du modèle (None si aucune sélection)."""
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as fichier:
+        return json.load(fichier)["features"]
+
+
+def save_feature_schema(
+    features: list[str], path: str = FEATURES_PATH, report: list[dict] | None = None
+) -> None:
+    """Enregistre les variables retenues, avec le rapport de `evaluate_feature_sets`."""
+    with open(path + ".tmp", "w", encoding="utf-8") as fichier:
+        json.dump(
+            {"features": features, "report": report or []}, fichier, ensure_ascii=False, indent=4
+        )
+    os.replace(path + ".tmp", path)
+
+
+def apply_feature_schema(df: pl.DataFrame, features: list[str] | None) -> pl.DataFrame:
+    """
+    Garde les variables du schéma, dans son ordre, et les colonnes hors variables présentes.
+
+    Args:
+        df (pl.DataFrame): Dataset propre ou entrée du modèle.
+        features (list[str] | None): Variables retenues (toutes si None).
+
+    Returns:
+        pl.DataFrame: `df` réduit aux variables du schéma.
+    """
+    if features is None:
+        return df
+    return df.select(*features, *(column for column in NON_FEATURE_COLUMNS if column in df.columns))
+
+
+def selection_split(df: pl.DataFrame, seed: int = SEED):
+    """
+    Découpe entraînement/validation pour la sélection, pris dans le jeu d'entraînement
+    de `train_test` : le jeu de test sur lequel `find_best_model` mesure la précision
+    ne sert ni à l'importance des variables ni au choix du jeu.
+
+    Args:
+        df (pl.DataFrame): Variables retenues et colonne "target".
+        seed (int): Graine des deux découpages.
+
+    Returns:
+        tuple: (X_fit, X_val, y_fit, y_val).
+    """
+    X_train, _, y_train, _ = train_test(df, seed)
+    return train_test_split(X_train, y_train, test_size=VALIDATION_SIZE, random_state=seed)
+
+
+def correlation_clusters(X: np.ndarray, threshold: float = CORRELATION_THRESHOLD) -> np.ndarray:
+    """
+    Regroupe les variables corrélées entre elles au-delà de `threshold`
+    (classification hiérarchique, lien moyen, distance 1 - |corrélation|).
+
+    Args:
+        X (np.ndarray): Données, sans variable constante.
+        threshold (float): Corrélation minimale au sein d'un groupe.
+
+    Returns:
+        np.ndarray: Numéro de groupe de chaque colonne.
+    """
+    if X.shape[1] < 2:
+        return np.ones(X.shape[1], dtype=int)
+    correlation = np.nan_to_num(np.corrcoef(X, rowvar=False))
+    distance = 1 - np.abs(correlation)
+    np.fill_diagonal(distance, 0)
+    tree = linkage(squareform(np.clip(distance, 0, None), checks=False), method="average")
+    return fcluster(tree, t=1 - threshold, criterion="distance")
+
+
+def feature_importances(
+    model, X_test: np.ndarray, y_test: np.ndarray, method: str = "permutation", seed: int = SEED
+) -> np.ndarray:
+    """Importance de chaque variable : par permutation sur le jeu de test, ou celle du modèle."""
+    if method == "model":
+        return model.feature_importances_
+    result = permutation_importance(
+        model, X_test, y_test, n_repeats=5, random_state=seed, n_jobs=N_JOBS
+    )
+    return result.importances_mean
+
+
+def propose_feature_sets(
+    df: pl.DataFrame,
+    seed: int = SEED,
+    model=None,
+    importance: str = "permutation",
+    threshold: float = CORRELATION_THRESHOLD,
+) -> dict[str, list[str]]:
+    """
+    Propose des jeux de variables de plus en plus petits.
+
+    L'importance est mesurée sur la validation de `selection_split`.
+
+    - "toutes" : toutes les variables.
+    - "sans_redondance" : sans les variables constantes, et une seule variable (la plus
+      importante) par groupe de variables corrélées (voir `correlation_clusters`).
+    - "top_XX" : les XX % les plus importantes de "sans_redondance" (voir `TOP_FRACTIONS`).
+
+    Args:
+        df (pl.DataFrame): Dataset propre.
+        seed (int): Graine des découpages et du modèle.
+        model: Modèle de référence pour l'importance (`REFERENCE_MODEL` si None).
+        importance (str): 'permutation' ou 'model' (`feature_importances_`).
+        threshold (float): Seuil de corrélation des variables redondantes.
+
+    Returns:
+        dict[str, list[str]]: Jeux de variables, dans l'ordre des colonnes du dataset.
+    """
+    names = feature_columns(df)
+    X_train, X_test, y_train, y_test = selection_split(df.select(*names, "target"), seed)
+
+    constant = X_train.std(axis=0) == 0
+    kept = [name for name, is_constant in zip(names, constant) if not is_constant]
+    X_train, X_test = X_train[:, ~constant], X_test[:, ~constant]
+    if constant.any():
+        logger.info(f"Variables constantes retirées : {', '.join(np.array(names)[constant])}")
+
+    reference = clone(model if model is not None else REFERENCE_MODEL).fit(X_train, y_train)
+    scores = feature_importances(reference, X_test, y_test, importance, seed)
+
+    clusters = correlation_clusters(X_train, threshold)
+    representatives = {
+        int(np.argmax(np.where(clusters == cluster, scores, -np.inf)))
+        for cluster in np.unique(clusters)
+    }
+    for cluster in np.unique(clusters):
+        members = np.flatnonzero(clusters == cluster)
+        if len(members) > 1:
+            logger.info(f"Variables redondantes : {', '.join(kept[i] for i in members)}")
+
+    non_redundant = sorted(representatives)
+    feature_sets = {
+        "toutes": names,
+        "sans_redondance": [kept[i] for i in non_redundant],
+    }
+    ranked = sorted(non_redundant, key=lambda i: -scores[i])
+    for fraction in TOP_FRACTIONS:
+        top = set(ranked[: max(1, round(len(ranked) * fraction))])
+        feature_sets[f"top_{round(fraction * 100)}"] = [kept[i] for i in non_redundant if i in top]
+    return feature_sets
+
+
+def evaluate_feature_sets(
+    df: pl.DataFrame, feature_sets: dict[str, list[str]], seed: int = SEED, model=None
+) -> list[dict]:
+    """
+    Entraîne le modèle de référence sur chaque jeu de variables et mesure son coût,
+    sur la validation de `selection_split`.
+
+    Args:
+        df (pl.DataFrame): Dataset propre.
+        feature_sets (dict[str, list[str]]): Jeux de variables (voir `propose_feature_sets`).
+        seed (int): Graine des découpages.
+        model: Modèle de référence (`REFERENCE_MODEL` si None).
+
+    Returns:
+        list[dict]: Pour chaque jeu : "name", "features", "n_features", "accuracy" (validation),
+        "fit_seconds" et les mesures de `profile_model` (latences, taille).
+    """
+    report = []
+    for name, features in feature_sets.items():
+        X_train, X_test, y_train, y_test = selection_split(df.select(*features, "target"), seed)
+        start = time.perf_counter()
+        fitted = clone(model if model is not None else REFERENCE_MODEL).fit(X_train, y_train)
+        fit_seconds = time.perf_counter() - start
+
+        entry = {
+            "name": name,
+            "features": features,
+            "n_features": len(features),
+            "accuracy": float(accuracy_score(y_test, fitted.predict(X_test))),
+            "fit_seconds": fit_seconds,
+            **profile_model(fitted, X_test),
+        }
+        logger.info(
+            f"{name} : {entry['n_features']} variables, accuracy {entry['accuracy']:.4f}, "
+            f"entraînement {fit_seconds:.1f} s, prédiction p99 {entry['predict_p99_ms']:.2f} ms, "
+            f"lot {entry['predict_batch_ms']:.1f} ms"
+        )
+        report.append(entry)
+    return report
+
+
+def select_feature_set(report: list[dict], tolerance: float = ACCURACY_TOLERANCE) -> dict:
+    """Plus petit jeu de variables à moins de `tolerance` de la meilleure précision."""
+    best = max(entry["accuracy"] for entry in report)
+    eligible = [entry for entry in report if entry["accuracy"] >= best - tolerance]
+    return min(eligible, key=lambda entry: entry["n_features"])
@@ -0,0 +1,95 @@
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_PATH = "data/journal_recherche.jsonl"
+
+
+class SearchJournal:
+    """
+    Journal d'une recherche d'hyperparamètres : une ligne JSON par candidat terminé
+    (clé, modèle, hyperparamètres, part du budget, scores des folds, durée).
+
+    Chaque ligne est écrite et synchronisée sur disque dès que le candidat est fini :
+    une recherche interrompue reprend sans ré-entraîner les candidats déjà journalisés.
+    Les clés incluent l'empreinte des données (voir `candidate_key`), un journal écrit
+    sur d'autres données n'est donc jamais réutilisé.
+    """
+
+    def __init__(self, path: str = JOURNAL_PATH):
+        self.path = path
+        self.entries: dict[str, dict] = {}
+        if os.path.exists(path):
+            self._load()
+
+    def _load(self) -> None:
+        with open(self.path, "rb+") as fichier:
+            contenu = fichier.read()
+            complet = contenu.rfind(b"\n") + 1
+            if complet < len(contenu):
+                # Dernière ligne tronquée par l'interruption : retirée pour que la prochaine
+                # entrée commence sur une nouvelle ligne, le candidat sera refait
+                logger.warning(f"Dernière ligne tronquée dans {self.path}, retirée.")
+                fichier.truncate(complet)
+
+        for numero, ligne in enumerate(contenu[:complet].decode("utf-8").splitlines(), start=1):
+            try:
+                entry = json.loads(ligne)
+            except json.JSONDecodeError:
+                logger.warning(f"Ligne {numero} illisible dans {self.path}, ignorée.")
+                continue
+            self.entries[entry["key"]] = entry
+        logger.info(f"{len(self.entries)} candidats repris depuis {self.path}.")
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: str) -> list[float] | None:
+        """Scores des folds d'un candidat déjà terminé, ou None."""
+        entry = self.entries.get(key)
+        return entry["scores"] if entry is not None else None
+
+    def append(
+        self,
+        key: str,
+        model_name: str,
+        params: dict,
+        fraction: float,
+        scores: list[float],
+        duration: float,
+    ) -> None:
+        """
+        Ajoute un candidat terminé au journal.
+
+        Args:
+            key (str): Clé du candidat (voir `candidate_key`).
+            model_name (str): Nom du modèle.
+            params (dict): Hyperparamètres utilisés.
+            fraction (float): Part des lignes d'entraînement utilisée.
+            scores (list[float]): Scores des folds.
+            duration (float): Temps total des fits, en secondes.
+        """
+        entry = {
+            "key": key,
+            "model": model_name,
+            "params": params,
+            "fraction": fraction,
+            "scores": [float(score) for score in scores],
+            "duration": round(duration, 3),
+        }
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as fichier:
+            fichier.write(json.dumps(entry, default=repr) + "\n")
+            fichier.flush()
+            os.fsync(fichier.fileno())
+        self.entries[key] = entry
+
+    def clear(self) -> None:
+        """Supprime le journal, une fois la recherche terminée."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.entries = {}
@@ -0,0 +1,130 @@
+import time
+import numpy as np
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.metrics import accuracy_score
+from sklearn.neighbors import KNeighborsClassifier, NearestNeighbors
+from sklearn.preprocessing import StandardScaler
+from threadpoolctl import threadpool_limits
+
+# Hyperparamètres qui ne changent que le vote : un seul index de voisins pour tous
+VOTE_PARAMS = ("n_neighbors", "weights")
+
+
+class ScaledKNNClassifier(ClassifierMixin, BaseEstimator):
+    """
+    K plus proches voisins sur variables standardisées.
+
+    Sans mise à l'échelle, les variables à grande amplitude (points ATP, Elo) décident
+    seules des voisins. En validation croisée, `score_candidates` évalue tous les
+    `n_neighbors`/`weights` d'un fold avec une seule recherche de voisins.
+    """
+
+    candidate_params = VOTE_PARAMS
+
+    def __init__(
+        self, n_neighbors: int = 5, weights: str = "uniform", algorithm: str = "brute", n_jobs=None
+    ):
+        self.n_neighbors = n_neighbors
+        self.weights = weights
+        self.algorithm = algorithm
+        self.n_jobs = n_jobs
+
+    def fit(self, X, y):
+        self.scaler_ = StandardScaler().fit(X)
+        self.knn_ = KNeighborsClassifier(
+            n_neighbors=self.n_neighbors,
+            weights=self.weights,
+            algorithm=self.algorithm,
+            n_jobs=self.n_jobs,
+        ).fit(self.scaler_.transform(X), y)
+        self.classes_ = self.knn_.classes_
+        self.n_features_in_ = self.knn_.n_features_in_
+        return self
+
+    def predict_proba(self, X) -> np.ndarray:
+        return self.knn_.predict_proba(self.scaler_.transform(X))
+
+    def predict(self, X) -> np.ndarray:
+        return self.knn_.predict(self.scaler_.transform(X))
+
+    @staticmethod
+    def vote(
+        distances: np.ndarray,
+        neighbors_y: np.ndarray,
+        classes: np.ndarray,
+        n_neighbors: int,
+        weights: str,
+    ) -> np.ndarray:
+        """
+        Prédictions à partir des voisins triés par distance, comme `KNeighborsClassifier`.
+
+        Args:
+            distances (np.ndarray): Distances aux voisins, (lignes, k >= n_neighbors).
+            neighbors_y (np.ndarray): Indices de classe des voisins, même forme.
+            classes (np.ndarray): Classes du modèle.
+            n_neighbors (int): Nombre de voisins qui votent.
+            weights (str): 'uniform' ou 'distance'.
+
+        Returns:
+            np.ndarray: Classe prédite pour chaque ligne.
+        """
+        distances, neighbors_y = distances[:, :n_neighbors], neighbors_y[:, :n_neighbors]
+        if weights == "distance":
+            with np.errstate(divide="ignore"):
+                w = 1 / distances
+            # Voisins à distance nulle : eux seuls votent
+            exact = np.isinf(w)
+            w = np.where(exact.any(axis=1, keepdims=True), exact.astype(float), w)
+        else:
+            w = np.ones_like(distances)
+
+        votes = np.zeros((len(neighbors_y), len(classes)))
+        np.add.at(votes, (np.arange(len(neighbors_y))[:, None], neighbors_y), w)
+        return classes[votes.argmax(axis=1)]
+
+    def score_candidates(
+        self, candidates: list[dict], X, y, train, test, inner_jobs: int
+    ) -> list[tuple[float, float]]:
+        """
+        Évalue plusieurs candidats sur un fold avec une seule mise à l'échelle et une
+        seule recherche des voisins (celle du plus grand `n_neighbors`).
+
+        Args:
+            candidates (list[dict]): Hyperparamètres des candidats, qui ne diffèrent
+                que par `VOTE_PARAMS`.
+            X (np.ndarray): Données.
+            y (np.ndarray): Étiquettes.
+            train (np.ndarray): Lignes d'entraînement du fold.
+            test (np.ndarray): Lignes de validation du fold.
+            inner_jobs (int): Threads pour la recherche des voisins.
+
+        Returns:
+            list[tuple[float, float]]: (précision, durée en secondes) de chaque candidat,
+            la durée commune étant répartie entre eux.
+        """
+        start = time.perf_counter()
+        params = {**self.get_params(), **candidates[0]}
+        with threadpool_limits(limits=inner_jobs):
+            scaler = StandardScaler().fit(X[train])
+            index = NearestNeighbors(algorithm=params["algorithm"], n_jobs=inner_jobs)
+            index.fit(scaler.transform(X[train]))
+            k = max(candidate.get("n_neighbors", self.n_neighbors) for candidate in candidates)
+            distances, neighbors = index.kneighbors(scaler.transform(X[test]), n_neighbors=k)
+
+        classes, y_train = np.unique(y[train], return_inverse=True)
+        neighbors_y = y_train[neighbors]
+        scores = [
+            accuracy_score(
+                y[test],
+                self.vote(
+                    distances,
+                    neighbors_y,
+                    classes,
+                    candidate.get("n_neighbors", self.n_neighbors),
+                    candidate.get("weights", self.weights),
+                ),
+            )
+            for candidate in candidates
+        ]
+        duration = (time.perf_counter() - start) / len(candidates)
+        return [(score, duration) for score in scores]
@@ -0,0 +1,64 @@
+import logging
+import os
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+import numpy as np
+import polars as pl
+
+logger = logging.getLogger(__name__)
+
+# Les arbres de scikit-learn et XGBoost travaillent en float32 : pas de conversion à chaque fit
+FEATURE_DTYPE = pl.Float32
+
+
+@dataclass(frozen=True)
+class FeatureMatrix:
+    X: np.ndarray
+    y: np.ndarray
+    feature_names: list[str]
+
+
+def feature_matrix(df: pl.DataFrame, target: str = "target") -> FeatureMatrix:
+    """
+    Construit la matrice des variables : un seul tableau float32 contigu par lignes.
+
+    Args:
+        df (pl.DataFrame): Données avec la colonne `target` et uniquement des variables numériques.
+        target (str): Colonne de la cible.
+
+    Returns:
+        FeatureMatrix: Matrice X (float32, ordre C), cible y et noms des colonnes de X.
+    """
+    features = df.drop(target)
+    X = features.select(pl.all().cast(FEATURE_DTYPE)).to_numpy(order="c")
+    return FeatureMatrix(X, df[target].to_numpy(), features.columns)
+
+
+@contextmanager
+def shared_arrays(*arrays: np.ndarray) -> Iterator[list[np.ndarray]]:
+    """
+    Écrit les tableaux une seule fois dans un dossier temporaire et les rouvre en
+    memmap lecture seule : joblib transmet alors aux processus le chemin du fichier
+    au lieu d'une copie du tableau, pour toute la durée du bloc.
+
+    Args:
+        *arrays (np.ndarray): Tableaux à partager.
+
+    Yields:
+        list[np.ndarray]: Tableaux en memmap, dans le même ordre.
+    """
+    with tempfile.TemporaryDirectory(prefix="ml_tennis_", ignore_cleanup_errors=True) as dossier:
+        shared = []
+        for i, array in enumerate(arrays):
+            path = os.path.join(dossier, f"{i}.npy")
+            np.save(path, np.ascontiguousarray(array))
+            shared.append(np.load(path, mmap_mode="r"))
+        logger.info(
+            f"{len(shared)} tableaux partagés ({sum(array.nbytes for array in shared) / 1e6:.1f} Mo)."
+        )
+        try:
+            yield shared
+        finally:
+            del shared
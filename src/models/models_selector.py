@@ -1,18 +1,49 @@
 import logging
-from sklearn.model_selection import train_test_split, GridSearchCV
+import math
+import os
+import time
+from collections import Counter
+from contextlib import nullcontext
+import numpy as np
+from joblib import Parallel, delayed
+from threadpoolctl import threadpool_limits
+from sklearn.base import clone
+from sklearn.model_selection import train_test_split, ParameterGrid, StratifiedKFold
 from sklearn.linear_model import LogisticRegression
 from sklearn.tree import DecisionTreeClassifier
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
-from sklearn.neighbors import KNeighborsClassifier
 from sklearn.metrics import accuracy_score
 import xgboost as xgb
 import polars as pl
+from src.models.cache import CVCache, candidate_key, dataset_fingerprint
+from src.models.journal import SearchJournal
+from src.models.knn import ScaledKNNClassifier
+from src.models.matrix import feature_matrix, shared_arrays
+from src.models.profiling import pareto_front, profile_model, select_model
 
 logger = logging.getLogger(__name__)
 
 # Ne pas toucher à SEED
 SEED = 1
 
+CV_FOLDS = 5
+
+# Nombre de cœurs utilisables par la recherche de modèles (tous par défaut)
+N_JOBS = os.cpu_count() or 1
+
+# Successive halving : facteur de réduction des candidats et taille minimale d'un fold
+HALVING_FACTOR = 3
+MIN_HALVING_SAMPLES = 100
+
+# Candidats de chaque modèle entraînés et profilés pour le choix final : ceux dont le score
+# moyen est à moins d'une erreur standard (entre folds) du meilleur, dans cette limite
+MAX_PROFILED_CANDIDATES = 5
+
+# Recherche TPE : essais par modèle, essais aléatoires avant de modéliser, part des "bons" essais
+N_TRIALS = 20
+TPE_STARTUP_TRIALS = 5
+TPE_GAMMA = 0.25
+
 MODELS = {
     'LogisticRegression': {
         'model': LogisticRegression(random_state=SEED, max_iter=10_000),
@@ -29,7 +60,7 @@ MODELS = {
         }
     },
     'RandomForestClassifier': {
-        'model': RandomForestClassifier(random_state=SEED, n_jobs=3),
+        'model': RandomForestClassifier(random_state=SEED),
         'param_grid': {
             'n_estimators': [400, 600, 800],
             'max_depth': [5, 10, 20],
@@ -55,7 +86,8 @@ MODELS = {
         }
     },
     'KNeighborsClassifier': {
-        'model': KNeighborsClassifier(n_jobs=3),
+        # Variables standardisées, voisins calculés une fois par fold pour toute la grille
+        'model': ScaledKNNClassifier(),
         'param_grid': {
             'n_neighbors': [3, 5, 7, 9],
             'weights': ['uniform', 'distance']
@@ -68,6 +100,9 @@ def train_test(df: pl.DataFrame, seed: int):
     """
     Sépare les données en ensembles d'entraînement et de test.
 
+    Les lignes sont mises dans l'ordre du découpage avant la conversion : X_train et
+    X_test sont deux vues d'une seule matrice float32 (voir `feature_matrix`).
+
     Args:
         df (pl.DataFrame): DataFrame contenant les données avec une colonne "target" comme étiquette.
         seed (int): Valeur pour initialiser le générateur aléatoire afin d'assurer la reproductibilité.
@@ -79,52 +114,549 @@ def train_test(df: pl.DataFrame, seed: int):
             - y_train (np.ndarray): Étiquettes d'entraînement.
             - y_test (np.ndarray): Étiquettes de test.
     """
+    train, test = train_test_split(np.arange(df.height), test_size=0.2, random_state=seed)
+    matrix = feature_matrix(df[np.concatenate([train, test])])
+    n_train = len(train)
+    return matrix.X[:n_train], matrix.X[n_train:], matrix.y[:n_train], matrix.y[n_train:]
+
+
+def split_cpu_budget(n_jobs: int | None = None, inner_jobs: int = 1) -> tuple[int, int]:
+    """
+    Répartit le budget de cœurs entre les fits lancés en parallèle et les threads de chaque fit.
+
+    Args:
+        n_jobs (int | None): Nombre total de cœurs (`N_JOBS` si None).
+        inner_jobs (int): Threads par fit (n_jobs des modèles, BLAS, OpenMP).
+
+    Returns:
+        tuple[int, int]: (fits en parallèle, threads par fit), dont le produit ne dépasse pas le budget.
+    """
+    n_jobs = n_jobs or N_JOBS
+    inner_jobs = max(1, min(inner_jobs, n_jobs))
+    return max(1, n_jobs // inner_jobs), inner_jobs
+
+
+def _with_threads(model, params: dict, inner_jobs: int):
+    """Copie non entraînée du modèle avec ses hyperparamètres et son nombre de threads."""
+    estimator = clone(model).set_params(**params)
+    if "n_jobs" in estimator.get_params():
+        estimator.set_params(n_jobs=inner_jobs)
+    return estimator
+
+
+def _fit_and_score(model, params: dict, X, y, train, test, inner_jobs: int) -> tuple[float, float]:
+    """
+    Entraîne un candidat sur un fold.
+
+    Returns:
+        tuple[float, float]: Précision sur la partie de validation et durée en secondes.
+    """
+    start = time.perf_counter()
+    with threadpool_limits(limits=inner_jobs):
+        estimator = _with_threads(model, params, inner_jobs)
+        estimator.fit(X[train], y[train])
+        score = accuracy_score(y[test], estimator.predict(X[test]))
+    return score, time.perf_counter() - start
+
+
+def _fit(model, params: dict, X, y, inner_jobs: int) -> tuple[object, float]:
+    """Entraîne un candidat sur toutes les données et renvoie le modèle et la durée en secondes."""
+    start = time.perf_counter()
+    with threadpool_limits(limits=inner_jobs):
+        estimator = _with_threads(model, params, inner_jobs).fit(X, y)
+    return estimator, time.perf_counter() - start
+
+
+def _with_resource(model, params: dict, fraction: float, resource: str) -> tuple[dict, float]:
+    """
+    Réduit le budget d'un candidat pour un tour de successive halving.
 
-    X = df.drop("target").to_numpy()
-    y = df.select("target").to_numpy().flatten()
-    return train_test_split(X, y, test_size=0.2, random_state=seed)
+    Returns:
+        tuple[dict, float]: Hyperparamètres à utiliser et fraction des lignes d'entraînement.
+    """
+    if fraction >= 1:
+        return params, 1.0
+    if resource == "n_estimators" and "n_estimators" in model.get_params():
+        n_estimators = params.get("n_estimators", model.get_params()["n_estimators"])
+        return {**params, "n_estimators": max(1, round(n_estimators * fraction))}, 1.0
+    return params, fraction
+
+
+def _subsample(train: np.ndarray, fraction: float) -> np.ndarray:
+    """Premières lignes d'un fold (les données sont déjà mélangées par `train_test`)."""
+    if fraction >= 1:
+        return train
+    return train[: max(round(len(train) * fraction), min(len(train), MIN_HALVING_SAMPLES))]
 
 
-def find_best_model(df: pl.DataFrame, seed: int) -> dict:
+class _FitRunner:
+    """
+    Exécute des lots de candidats (modèle, hyperparamètres, budget) en validation croisée,
+    chaque lot formant une seule file de fits répartie sur le budget de cœurs.
+    """
+
+    def __init__(
+        self,
+        models: dict,
+        X,
+        y,
+        n_jobs: int | None,
+        inner_jobs: int,
+        resource: str,
+        cache: CVCache | None = None,
+        seed: int | None = None,
+        journal: SearchJournal | None = None,
+    ):
+        self.models = models
+        self.X, self.y = X, y
+        self.outer_jobs, self.inner_jobs = split_cpu_budget(n_jobs, inner_jobs)
+        self.folds = list(StratifiedKFold(n_splits=CV_FOLDS).split(X, y))
+        self.resource = resource
+        self.cache = cache
+        self.seed = seed
+        self.journal = journal
+        keyed = cache is not None or journal is not None
+        self.fingerprint = dataset_fingerprint(X, y) if keyed else None
+        self.nb_fits = 0
+
+    def _lookup(self, key: str | None) -> list[float] | None:
+        """Scores déjà connus d'un candidat : journal de la recherche en cours, puis cache."""
+        if key is None:
+            return None
+        if self.journal is not None and (scores := self.journal.get(key)) is not None:
+            return scores
+        return self.cache.get_scores(key) if self.cache is not None else None
+
+    def _record(
+        self, key: str | None, name: str, params: dict, fraction: float, fold_results: list
+    ) -> list[float]:
+        """Enregistre un candidat dès que tous ses folds sont finis et renvoie ses scores."""
+        scores = [score for score, _ in fold_results]
+        if self.cache is not None:
+            self.cache.put_scores(key, scores)
+        if self.journal is not None:
+            duration = sum(duration for _, duration in fold_results)
+            self.journal.append(key, name, params, fraction, scores, duration)
+        return scores
+
+    def __call__(self, tasks: list[tuple[str, dict, float]]) -> list[list[float]]:
+        """
+        Args:
+            tasks (list[tuple[str, dict, float]]): (modèle, hyperparamètres, part du budget).
+
+        Returns:
+            list[list[float]]: Scores des folds de chaque tâche.
+        """
+        results, pending = [], []
+        for name, params, fraction in tasks:
+            model = self.models[name]['model']
+            fit_params, sample_fraction = _with_resource(model, params, fraction, self.resource)
+
+            key = None
+            if self.fingerprint is not None:
+                key = candidate_key(
+                    self.fingerprint, model, fit_params,
+                    folds=CV_FOLDS, sample_fraction=sample_fraction, seed=self.seed,
+                )
+            results.append(self._lookup(key))
+            if results[-1] is not None:
+                continue
+            pending.append((len(results) - 1, key, name, fit_params, sample_fraction))
+
+        if not pending:
+            return results
+
+        remaining = Counter(name for _, _, name, _, _ in pending)
+        for name, count in remaining.items():
+            logger.info(f"Training {name} : {count} candidats soumis...")
+
+        # Chaque job renvoie les (score, durée) d'un fold pour un ou plusieurs candidats
+        jobs, groups = [], {}
+        for p, (_, _, name, fit_params, sample_fraction) in enumerate(pending):
+            model = self.models[name]['model']
+            if hasattr(model, 'score_candidates'):
+                # Modèles qui évaluent plusieurs candidats d'un coup (voir ScaledKNNClassifier)
+                shared = {k: v for k, v in fit_params.items() if k not in model.candidate_params}
+                groups.setdefault((name, sample_fraction, repr(sorted(shared.items()))), []).append(p)
+                continue
+            jobs += [
+                (
+                    delayed(_fit_and_score)(
+                        model, fit_params, self.X, self.y,
+                        _subsample(train, sample_fraction), test, self.inner_jobs,
+                    ),
+                    [p],
+                    False,
+                )
+                for train, test in self.folds
+            ]
+        for (name, sample_fraction, _), members in groups.items():
+            model = self.models[name]['model']
+            jobs += [
+                (
+                    delayed(model.score_candidates)(
+                        [pending[p][3] for p in members], self.X, self.y,
+                        _subsample(train, sample_fraction), test, self.inner_jobs,
+                    ),
+                    members,
+                    True,
+                )
+                for train, test in self.folds
+            ]
+
+        # Résultats dans l'ordre des jobs, au fil de l'eau : chaque candidat est
+        # enregistré dès que ses folds sont finis, sans attendre la fin du lot
+        outputs = Parallel(n_jobs=self.outer_jobs, return_as="generator")(job for job, _, _ in jobs)
+        fold_results = [[] for _ in pending]
+        for (_, members, grouped), output in zip(jobs, outputs):
+            for p, result in zip(members, output if grouped else [output]):
+                fold_results[p].append(result)
+                if len(fold_results[p]) == len(self.folds):
+                    i, key, name, fit_params, sample_fraction = pending[p]
+                    self.nb_fits += len(self.folds)
+                    results[i] = self._record(key, name, fit_params, sample_fraction, fold_results[p])
+                    remaining[name] -= 1
+                    if remaining[name] == 0:
+                        logger.info(f"{name} : candidats soumis terminés.")
+        return results
+
+
+def _exhaustive_search(models: dict, run: _FitRunner, **_) -> dict:
+    """Tous les candidats de chaque grille, avec tout le budget."""
+    candidates = [
+        (name, params) for name, config in models.items()
+        for params in ParameterGrid(config['param_grid'])
+    ]
+    scores = run([(name, params, 1.0) for name, params in candidates])
+
+    results = {name: [] for name in models}
+    for (name, params), fold_scores in zip(candidates, scores):
+        results[name].append((params, fold_scores))
+    return results
+
+
+def _halving_search(models: dict, run: _FitRunner, factor: int = HALVING_FACTOR, **_) -> dict:
+    """
+    Successive halving : à chaque tour, les candidats sont évalués avec un budget
+    (lignes ou arbres) multiplié par `factor`, et seul le meilleur 1/`factor` est gardé.
+    Le dernier tour utilise tout le budget.
+    """
+    remaining = {name: list(ParameterGrid(config['param_grid'])) for name, config in models.items()}
+    # Nombre de tours pour ne garder que `factor` candidats au plus au dernier tour
+    rounds = {
+        name: max(1, math.ceil(round(math.log(len(grid), factor), 9)))
+        for name, grid in remaining.items()
+    }
+    nb_steps = max(rounds.values())
+    results = {name: [] for name in models}
+
+    for step in range(nb_steps):
+        # Les modèles aux grilles plus petites commencent plus tard et finissent en même temps
+        active = [name for name in models if step >= nb_steps - rounds[name]]
+        fraction = float(factor) ** (step - nb_steps + 1)
+        tasks = [(name, params, fraction) for name in active for params in remaining[name]]
+        scores = run(tasks)
+
+        for name in active:
+            evaluated = [
+                (params, fold_scores)
+                for (task_name, params, _), fold_scores in zip(tasks, scores)
+                if task_name == name
+            ]
+            if step == nb_steps - 1:
+                results[name] = evaluated
+            else:
+                order = sorted(
+                    range(len(evaluated)), key=lambda i: -np.mean(evaluated[i][1])
+                )[: math.ceil(len(evaluated) / factor)]
+                remaining[name] = [evaluated[i][0] for i in sorted(order)]
+    return results
+
+
+def _tpe_proposals(grid: list[dict], observed: dict[int, float], n: int, rng) -> list[int]:
+    """
+    Propose `n` candidats non évalués d'une grille avec un estimateur de Parzen
+    (TPE) : chaque valeur d'hyperparamètre est pondérée par sa fréquence parmi
+    les meilleurs essais rapportée à sa fréquence parmi les autres.
+    """
+    unseen = [i for i in rng.permutation(len(grid)).tolist() if i not in observed]
+    if len(observed) < TPE_STARTUP_TRIALS:
+        return unseen[:n]
+
+    ranked = sorted(observed, key=lambda i: -observed[i])
+    n_good = max(1, math.ceil(TPE_GAMMA * len(ranked)))
+    good, bad = ranked[:n_good], ranked[n_good:]
+
+    def density(trials: list[int], key: str, value) -> float:
+        values = {repr(params[key]) for params in grid}
+        count = sum(repr(grid[i][key]) == repr(value) for i in trials)
+        return (count + 1) / (len(trials) + len(values))
+
+    def ratio(i: int) -> float:
+        return math.prod(
+            density(good, key, value) / density(bad, key, value)
+            for key, value in grid[i].items()
+        )
+
+    return sorted(unseen, key=ratio, reverse=True)[:n]
+
+
+def _tpe_search(
+    models: dict, run: _FitRunner, n_trials: int = N_TRIALS, seed: int = SEED, **_
+) -> dict:
+    """
+    Recherche bayésienne (TPE) : au plus `n_trials` candidats par modèle, proposés
+    par lots d'après les scores des essais précédents.
+    """
+    rng = np.random.default_rng(seed)
+    grids = {name: list(ParameterGrid(config['param_grid'])) for name, config in models.items()}
+    observed = {name: {} for name in models}
+    scores_by_trial = {name: {} for name in models}
+    batch_size = max(1, math.ceil(run.outer_jobs / (CV_FOLDS * len(models))))
+
+    while True:
+        tasks, indices = [], []
+        for name, grid in grids.items():
+            budget = min(n_trials, len(grid)) - len(observed[name])
+            for i in _tpe_proposals(grid, observed[name], min(batch_size, budget), rng):
+                tasks.append((name, grid[i], 1.0))
+                indices.append((name, i))
+        if not tasks:
+            break
+
+        for (name, i), fold_scores in zip(indices, run(tasks)):
+            observed[name][i] = float(np.mean(fold_scores))
+            scores_by_trial[name][i] = fold_scores
+
+    # Ordre de la grille, pour départager les égalités comme la recherche exhaustive
+    return {
+        name: [(grids[name][i], scores_by_trial[name][i]) for i in sorted(scores_by_trial[name])]
+        for name in models
+    }
+
+
+SEARCH_STRATEGIES = {
+    'exhaustive': _exhaustive_search,
+    'halving': _halving_search,
+    'tpe': _tpe_search,
+}
+
+
+def cross_validate_models(
+    models: dict,
+    X,
+    y,
+    n_jobs: int | None = None,
+    inner_jobs: int = 1,
+    strategy: str = 'exhaustive',
+    resource: str = 'n_samples',
+    cache: CVCache | None = None,
+    journal: SearchJournal | None = None,
+    **options,
+) -> dict:
+    """
+    Évalue en validation croisée les candidats des grilles, en parallèle.
+
+    Les fits (candidat, fold) de tous les modèles forment une seule file de tâches,
+    répartie sur le budget de cœurs (voir `split_cpu_budget`) : les petits modèles
+    comblent les cœurs laissés libres par les gros. Avec plusieurs processus, X et y
+    leur sont partagés en memmap au lieu d'être copiés (voir `shared_arrays`).
+
+    Args:
+        models (dict): Modèles et grilles d'hyperparamètres (voir `MODELS`).
+        X (np.ndarray): Données d'entraînement.
+        y (np.ndarray): Étiquettes d'entraînement.
+        n_jobs (int | None): Nombre total de cœurs.
+        inner_jobs (int): Threads par fit.
+        strategy (str): 'exhaustive' (toute la grille), 'halving' (successive halving)
+            ou 'tpe' (recherche bayésienne avec un nombre d'essais limité).
+        resource (str): Budget réduit par le successive halving : 'n_samples' (lignes
+            d'entraînement) ou 'n_estimators' (arbres, lignes pour les autres modèles).
+        cache (CVCache | None): Cache des scores : seuls les candidats absents sont entraînés.
+        journal (SearchJournal | None): Journal où chaque candidat est écrit dès qu'il est fini,
+            pour reprendre une recherche interrompue.
+        **options: `factor` pour 'halving', `n_trials` pour 'tpe', `seed` (graine du découpage
+            train/test, aussi utilisée par 'tpe').
+
+    Returns:
+        dict: Pour chaque modèle, la liste des candidats (params, scores des folds) évalués
+        avec tout le budget, dans l'ordre de la grille.
+    """
+    if strategy not in SEARCH_STRATEGIES:
+        raise ValueError(
+            f"Stratégie inconnue : {strategy} (possibles : {', '.join(SEARCH_STRATEGIES)})"
+        )
+
+    outer_jobs, _ = split_cpu_budget(n_jobs, inner_jobs)
+    with shared_arrays(X, y) if outer_jobs > 1 else nullcontext((X, y)) as (X, y):
+        run = _FitRunner(
+            models, X, y, n_jobs, inner_jobs, resource, cache, options.get('seed'), journal
+        )
+        results = SEARCH_STRATEGIES[strategy](models, run, **options)
+    logger.info(
+        f"Recherche {strategy} : {run.nb_fits} fits sur "
+        f"{run.outer_jobs} processus x {run.inner_jobs} threads."
+    )
+    if cache is not None:
+        logger.info(f"Cache de validation croisée : {cache.hits} hits, {cache.misses} misses.")
+    return results
+
+
+def candidate_label(name: str, params: dict) -> str:
+    """Nom d'un candidat dans les profils, ex. "RandomForestClassifier (max_depth=10, n_estimators=200)"."""
+    if not params:
+        return name
+    return f"{name} ({', '.join(f'{key}={value}' for key, value in sorted(params.items()))})"
+
+
+def near_best_candidates(
+    cv_results: dict, max_candidates: int = MAX_PROFILED_CANDIDATES
+) -> list[tuple[str, dict]]:
+    """
+    Candidats de chaque modèle équivalents au meilleur aux fluctuations près : score moyen
+    à moins d'une erreur standard (écart-type des folds du meilleur / racine du nombre de folds).
+
+    Args:
+        cv_results (dict): Résultats de `cross_validate_models`.
+        max_candidates (int): Nombre maximal de candidats gardés par modèle.
+
+    Returns:
+        list[tuple[str, dict]]: (modèle, hyperparamètres), meilleur score moyen d'abord pour
+        chaque modèle. Comme GridSearchCV, le premier candidat l'emporte en cas d'égalité.
+    """
+    selected = []
+    for name, candidates in cv_results.items():
+        means = np.array([np.mean(scores) for _, scores in candidates])
+        order = np.argsort(-means, kind="stable")
+        best_scores = candidates[order[0]][1]
+        noise = np.std(best_scores) / math.sqrt(len(best_scores))
+        selected += [
+            (name, candidates[i][0])
+            for i in order[:max_candidates]
+            if means[i] >= means[order[0]] - noise
+        ]
+    return selected
+
+
+def _fit_candidates(
+    models: dict, candidates: list[tuple[str, dict]], X, y, n_jobs: int | None, inner_jobs: int,
+    cache: CVCache | None = None,
+) -> list[tuple[object, float]]:
+    """
+    Entraîne en parallèle des candidats sur toutes les données, ou les reprend du cache.
+
+    Returns:
+        list[tuple[object, float]]: (modèle, durée de l'entraînement en secondes, gardée
+        dans le cache avec le modèle) dans l'ordre de `candidates`.
+    """
+    outer_jobs, inner_jobs = split_cpu_budget(n_jobs, inner_jobs)
+    fingerprint = dataset_fingerprint(X, y) if cache is not None else None
+    keys = [
+        candidate_key(fingerprint, models[name]['model'], params, full_fit=True)
+        for name, params in candidates
+    ] if cache is not None else [None] * len(candidates)
+    fitted = [cache.get_model(key) if key is not None else None for key in keys]
+
+    to_fit = [i for i, entry in enumerate(fitted) if entry is None]
+    new_models = Parallel(n_jobs=outer_jobs)(
+        delayed(_fit)(models[candidates[i][0]]['model'], candidates[i][1], X, y, inner_jobs)
+        for i in to_fit
+    ) if to_fit else []
+    for i, (model, seconds) in zip(to_fit, new_models):
+        fitted[i] = (model, seconds)
+        if cache is not None:
+            cache.put_model(keys[i], model, seconds)
+
+    return fitted
+
+
+def find_best_model(
+    df: pl.DataFrame,
+    seed: int,
+    n_jobs: int | None = None,
+    inner_jobs: int = 1,
+    models: dict | None = None,
+    strategy: str = 'exhaustive',
+    cache: CVCache | None = None,
+    journal: SearchJournal | None = None,
+    max_latency_ms: float | None = None,
+    max_size_mb: float | None = None,
+    accuracy_tolerance: float = 0.0,
+    **search_options,
+) -> dict:
     """
     Identifie le meilleur modèle en testant plusieurs algorithmes avec recherche d'hyperparamètres.
 
     Args:
         df (pl.DataFrame): DataFrame contenant les données avec une colonne "target" comme étiquette.
         seed (int): Valeur pour initialiser le générateur aléatoire afin d'assurer la reproductibilité.
+        n_jobs (int | None): Nombre total de cœurs utilisés (`N_JOBS` si None).
+        inner_jobs (int): Threads par fit, le reste du budget sert à lancer des fits en parallèle.
+        models (dict | None): Modèles et grilles à tester (`MODELS` si None).
+        strategy (str): Stratégie de recherche (voir `cross_validate_models`).
+        cache (CVCache | None): Cache des scores de validation croisée et des modèles entraînés.
+        journal (SearchJournal | None): Journal de la recherche, repris s'il existe déjà.
+        max_latency_ms (float | None): Latence p99 maximale d'une prédiction (voir `select_model`).
+        max_size_mb (float | None): Taille maximale du modèle sauvegardé, en Mo.
+        accuracy_tolerance (float): Écart de précision en dessous duquel le modèle le plus
+            rapide est préféré.
+        **search_options: Options de la stratégie (`resource`, `factor`, `n_trials`).
 
     Returns:
         dict: Un dictionnaire contenant :
-            - 'model_name' (str): Nom du modèle avec la meilleure performance.
-            - 'best_model' (object): Instance du meilleur modèle entraîné.
+            - 'model_name' (str): Nom du candidat retenu (voir `candidate_label`).
+            - 'best_model' (object): Instance du modèle retenu, entraîné.
             - 'accuracy' (float): Score de précision obtenu sur le jeu de test.
+            - 'profiles' (dict): Pour chaque candidat proche du meilleur de son modèle
+              (voir `near_best_candidates`), précision, durée d'entraînement, latences de
+              prédiction et taille (voir `profile_model`).
+            - 'pareto_front' (list[str]): Candidats non dominés en précision, latence et taille.
     """
-
+    models = models or MODELS
     X_train, X_test, y_train, y_test = train_test(df, seed)
 
-    best_model = None
-    best_score = 0
-    best_name = None
+    search_options.setdefault('seed', seed)
+    cv_results = cross_validate_models(
+        models, X_train, y_train, n_jobs, inner_jobs, strategy,
+        cache=cache, journal=journal, **search_options
+    )
 
-    for name, config in MODELS.items():
-        logger.info(f"Training {name}...")
+    # Chaque candidat proche du meilleur de son modèle est profilé : un candidat moins
+    # coûteux à précision équivalente peut être retenu sous contraintes
+    candidates = near_best_candidates(cv_results)
+    fitted = _fit_candidates(models, candidates, X_train, y_train, n_jobs, inner_jobs, cache)
 
-        grid_search = GridSearchCV(config['model'], config['param_grid'], cv=5, scoring='accuracy', verbose=1)
-        grid_search.fit(X_train, y_train)
-
-        model = grid_search.best_estimator_
+    trained, profiles = {}, {}
+    for (name, params), (model, fit_seconds) in zip(candidates, fitted):
+        label = candidate_label(name, params)
         y_pred = model.predict(X_test)
         score = accuracy_score(y_test, y_pred)
+        trained[label] = model
+        profiles[label] = {
+            'accuracy': score,
+            'fit_seconds': fit_seconds,
+            **profile_model(model, X_test),
+        }
+
+        logger.info(
+            f"{label} accuracy: {score:.4f}, prédiction p99 : {profiles[label]['predict_p99_ms']:.2f} ms, "
+            f"lot : {profiles[label]['predict_batch_ms']:.1f} ms, taille : {profiles[label]['size_mb']:.1f} Mo"
+        )
 
-        logger.info(f"{name} accuracy: {score:.4f}")
+    front = pareto_front(profiles)
+    logger.info(f"Front de Pareto (précision, latence, taille) : {', '.join(front)}")
 
-        if score > best_score:
-            best_score = score
-            best_model = model
-            best_name = name
+    best_name = select_model(profiles, max_latency_ms, max_size_mb, accuracy_tolerance)
+    if best_name is None:
+        logger.warning(
+            "Aucun modèle ne respecte les contraintes de latence et de taille, le plus précis est retenu."
+        )
+        best_name = select_model(profiles)
 
     return {
         'model_name': best_name,
-        'best_model': best_model,
-        'accuracy': best_score
+        'best_model': trained[best_name],
+        'accuracy': profiles[best_name]['accuracy'],
+        'profiles': profiles,
+        'pareto_front': front,
     }
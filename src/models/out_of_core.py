@@ -0,0 +1,337 @@
+"""Module pour entraîner les modèles sur un dataset Parquet plus grand que la mémoire,
+lu par paquets de lignes
+"""
+
+import logging
+import os
+import tempfile
+import time
+from collections.abc import Iterator
+import numpy as np
+import pyarrow.parquet as pq
+import polars as pl
+import xgboost as xgb
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.linear_model import SGDClassifier
+from sklearn.preprocessing import StandardScaler
+from src.models.matrix import feature_matrix
+from src.models.profiling import pareto_front, profile_model, select_model
+from src.preprocessing.preprocessing import NON_FEATURE_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 100_000
+TEST_SIZE = 0.2
+
+OUT_OF_CORE_MODELS = {
+    'XGBoost': {
+        'max_depth': 6,
+        'learning_rate': 0.1,
+        'num_boost_round': 400,
+    },
+    'SGDClassifier': {
+        'alpha': 1e-4,
+        'epochs': 5,
+    },
+}
+
+
+def iter_batches(
+    path: str, seed: int, split: str, batch_size: int = BATCH_SIZE, features: list[str] | None = None
+) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """
+    Lit un fichier Parquet par paquets de lignes et garde la partie demandée du découpage.
+
+    Une ligne est en test avec une probabilité `TEST_SIZE`, tirée avec une graine
+    qui dépend de `seed` et du numéro du paquet : le découpage est le même à chaque lecture.
+
+    Args:
+        path (str): Dataset propre au format Parquet.
+        seed (int): Graine du découpage train/test.
+        split (str): 'train' ou 'test'.
+        batch_size (int): Nombre de lignes lues à la fois.
+        features (list[str] | None): Variables lues, dans cet ordre (toutes si None,
+            voir `load_feature_schema`).
+
+    Yields:
+        tuple[np.ndarray, np.ndarray]: (X, y) d'un paquet (X en float32, voir `feature_matrix`).
+    """
+    parquet = pq.ParquetFile(path)
+    if features is None:
+        features = [name for name in parquet.schema_arrow.names if name not in NON_FEATURE_COLUMNS]
+    columns = [*features, "target"]
+    for i, batch in enumerate(parquet.iter_batches(batch_size=batch_size, columns=columns)):
+        is_test = np.random.default_rng([seed, i]).random(batch.num_rows) < TEST_SIZE
+        mask = is_test if split == "test" else ~is_test
+        if not mask.any():
+            continue
+        matrix = feature_matrix(pl.from_arrow(batch).filter(pl.Series(mask)))
+        yield matrix.X, matrix.y
+
+
+class _ParquetIter(xgb.DataIter):
+    """Itérateur XGBoost sur les paquets d'entraînement (mémoire externe)."""
+
+    def __init__(
+        self, path: str, seed: int, batch_size: int, features: list[str] | None, cache_prefix: str
+    ):
+        self.path, self.seed, self.batch_size, self.features = path, seed, batch_size, features
+        self._batches = None
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data) -> bool:
+        if self._batches is None:
+            self._batches = iter_batches(self.path, self.seed, "train", self.batch_size, self.features)
+        batch = next(self._batches, None)
+        if batch is None:
+            return False
+        input_data(data=batch[0], label=batch[1])
+        return True
+
+    def reset(self) -> None:
+        self._batches = None
+
+
+class BoosterClassifier(ClassifierMixin, BaseEstimator):
+    """
+    Booster XGBoost avec l'interface de scikit-learn. Entraîné hors mémoire par
+    `train_xgboost`, ou en mémoire par `fit`. `partial_fit` poursuit le boosting
+    avec de nouveaux matchs (mise à jour incrémentale, voir `retrain`).
+    """
+
+    def __init__(
+        self, max_depth: int = 6, learning_rate: float = 0.1, num_boost_round: int = 400, seed: int = 0
+    ):
+        self.max_depth = max_depth
+        self.learning_rate = learning_rate
+        self.num_boost_round = num_boost_round
+        self.seed = seed
+
+    def _xgb_params(self) -> dict:
+        return {
+            "objective": "binary:logistic",
+            "tree_method": "hist",
+            "seed": self.seed,
+            "max_depth": self.max_depth,
+            "learning_rate": self.learning_rate,
+        }
+
+    def _set_booster(self, booster: xgb.Booster) -> "BoosterClassifier":
+        self.booster_ = booster
+        self.classes_ = np.array([0, 1])
+        self.n_features_in_ = booster.num_features()
+        return self
+
+    def fit(self, X, y) -> "BoosterClassifier":
+        data = xgb.DMatrix(np.asarray(X, dtype=np.float32), label=y)
+        return self._set_booster(xgb.train(self._xgb_params(), data, num_boost_round=self.num_boost_round))
+
+    def partial_fit(self, X, y, num_boost_round: int | None = None) -> "BoosterClassifier":
+        """
+        Ajoute des arbres au booster existant, appris sur les lignes données.
+
+        Args:
+            X: Variables des nouveaux matchs.
+            y: Cibles des nouveaux matchs.
+            num_boost_round (int | None): Arbres ajoutés (`num_boost_round` si None).
+
+        Returns:
+            BoosterClassifier: Le modèle mis à jour.
+        """
+        if not hasattr(self, "booster_"):
+            return self.fit(X, y)
+        data = xgb.DMatrix(np.asarray(X, dtype=np.float32), label=y)
+        rounds = num_boost_round or self.num_boost_round
+        return self._set_booster(
+            xgb.train(self._xgb_params(), data, num_boost_round=rounds, xgb_model=self.booster_)
+        )
+
+    def predict_proba(self, X) -> np.ndarray:
+        proba = self.booster_.inplace_predict(np.asarray(X, dtype=np.float32))
+        return np.column_stack([1 - proba, proba])
+
+    def predict(self, X) -> np.ndarray:
+        return (self.predict_proba(X)[:, 1] >= 0.5).astype(np.int64)
+
+
+class ScaledSGDClassifier(ClassifierMixin, BaseEstimator):
+    """
+    Régression logistique par descente de gradient stochastique, sur variables standardisées.
+    Entraînée hors mémoire par `train_sgd`, ou en mémoire par `fit` avec les mêmes passes.
+    `partial_fit` fait une passe sur de nouveaux matchs, avec la standardisation déjà apprise.
+    """
+
+    def __init__(self, alpha: float = 1e-4, epochs: int = 5, seed: int = 0):
+        self.alpha = alpha
+        self.epochs = epochs
+        self.seed = seed
+
+    def _start(self) -> None:
+        self.scaler = StandardScaler()
+        self.model = SGDClassifier(loss="log_loss", alpha=self.alpha, random_state=self.seed)
+        self.classes_ = np.array([0, 1])
+
+    def partial_fit(self, X, y) -> "ScaledSGDClassifier":
+        """Une passe de descente de gradient sur les lignes données (standardisation apprise au besoin)."""
+        if not hasattr(self, "model"):
+            self._start()
+            self.scaler.fit(X)
+            self.n_features_in_ = self.scaler.n_features_in_
+        self.model.partial_fit(self.scaler.transform(X), y, classes=self.classes_)
+        return self
+
+    def fit(self, X, y) -> "ScaledSGDClassifier":
+        self._start()
+        self.scaler.fit(X)
+        self.n_features_in_ = self.scaler.n_features_in_
+        for _ in range(self.epochs):
+            self.partial_fit(X, y)
+        return self
+
+    def predict_proba(self, X) -> np.ndarray:
+        return self.model.predict_proba(self.scaler.transform(X))
+
+    def predict(self, X) -> np.ndarray:
+        return self.model.predict(self.scaler.transform(X))
+
+
+def train_xgboost(
+    path: str, seed: int, batch_size: int = BATCH_SIZE, features: list[str] | None = None, **params
+) -> BoosterClassifier:
+    """
+    Entraîne XGBoost en mémoire externe : les paquets sont mis en cache sur disque
+    par XGBoost, seule une page à la fois est en mémoire.
+
+    Args:
+        path (str): Dataset propre au format Parquet.
+        seed (int): Graine du découpage train/test.
+        batch_size (int): Nombre de lignes par paquet.
+        features (list[str] | None): Variables utilisées (toutes si None).
+        **params: Hyperparamètres de `BoosterClassifier` (`num_boost_round` pour le nombre d'arbres).
+
+    Returns:
+        BoosterClassifier: Modèle entraîné.
+    """
+    model = BoosterClassifier(seed=seed, **params)
+    with tempfile.TemporaryDirectory(prefix="xgb_cache_") as dossier:
+        data = xgb.ExtMemQuantileDMatrix(
+            _ParquetIter(path, seed, batch_size, features, os.path.join(dossier, "cache"))
+        )
+        booster = xgb.train(model._xgb_params(), data, num_boost_round=model.num_boost_round)
+        # Le cache de XGBoost est libéré avant la suppression de son dossier
+        del data
+    return model._set_booster(booster)
+
+
+def train_sgd(
+    path: str,
+    seed: int,
+    batch_size: int = BATCH_SIZE,
+    features: list[str] | None = None,
+    alpha: float = 1e-4,
+    epochs: int = 5,
+) -> ScaledSGDClassifier:
+    """
+    Entraîne une régression logistique avec `partial_fit`, paquet par paquet : une passe
+    pour les moyennes et écarts-types, puis `epochs` passes d'apprentissage.
+
+    Args:
+        path (str): Dataset propre au format Parquet.
+        seed (int): Graine du découpage train/test et du modèle.
+        batch_size (int): Nombre de lignes par paquet.
+        features (list[str] | None): Variables utilisées (toutes si None).
+        alpha (float): Régularisation L2.
+        epochs (int): Nombre de passes sur les données.
+
+    Returns:
+        ScaledSGDClassifier: Modèle entraîné.
+    """
+    model = ScaledSGDClassifier(alpha=alpha, epochs=epochs, seed=seed)
+    model._start()
+    for X, _ in iter_batches(path, seed, "train", batch_size, features):
+        model.scaler.partial_fit(X)
+    model.n_features_in_ = model.scaler.n_features_in_
+
+    for _ in range(epochs):
+        for X, y in iter_batches(path, seed, "train", batch_size, features):
+            model.partial_fit(X, y)
+    return model
+
+
+def streaming_accuracy(
+    model, path: str, seed: int, batch_size: int = BATCH_SIZE, features: list[str] | None = None
+) -> float:
+    """Précision du modèle sur la partie test, calculée paquet par paquet."""
+    correct = total = 0
+    for X, y in iter_batches(path, seed, "test", batch_size, features):
+        correct += int((model.predict(X) == y).sum())
+        total += len(y)
+    return correct / total if total else 0.0
+
+
+_TRAINERS = {
+    'XGBoost': train_xgboost,
+    'SGDClassifier': train_sgd,
+}
+
+
+def find_best_model_out_of_core(
+    path: str,
+    seed: int,
+    models: dict | None = None,
+    batch_size: int = BATCH_SIZE,
+    features: list[str] | None = None,
+) -> dict:
+    """
+    Équivalent de `find_best_model` pour un dataset Parquet qui ne tient pas en mémoire :
+    chaque modèle est entraîné en lisant le fichier par paquets, puis évalué sur la partie test.
+
+    Args:
+        path (str): Dataset propre au format Parquet (colonne "target" comme étiquette).
+        seed (int): Graine du découpage train/test et des modèles.
+        models (dict | None): Hyperparamètres par modèle (`OUT_OF_CORE_MODELS` si None).
+        batch_size (int): Nombre de lignes lues à la fois.
+        features (list[str] | None): Variables utilisées (toutes si None).
+
+    Returns:
+        dict: Un dictionnaire contenant (même format que `find_best_model`) :
+            - 'model_name' (str): Nom du modèle avec la meilleure performance.
+            - 'best_model' (object): Instance du meilleur modèle entraîné.
+            - 'accuracy' (float): Score de précision obtenu sur le jeu de test.
+            - 'profiles' (dict): Pour chaque modèle, précision, durée d'entraînement,
+              latences de prédiction sur le premier paquet de test et taille (voir `profile_model`).
+            - 'pareto_front' (list[str]): Modèles non dominés en précision, latence et taille.
+    """
+    models = models or OUT_OF_CORE_MODELS
+    # Un seul paquet de test en mémoire pour mesurer les latences
+    X_profile, _ = next(iter_batches(path, seed, "test", batch_size, features))
+
+    trained, profiles = {}, {}
+    for name, params in models.items():
+        logger.info(f"Training {name} (hors mémoire)...")
+        start = time.perf_counter()
+        model = _TRAINERS[name](path, seed, batch_size, features, **params)
+        fit_seconds = time.perf_counter() - start
+        score = streaming_accuracy(model, path, seed, batch_size, features)
+        trained[name] = model
+        profiles[name] = {
+            'accuracy': score,
+            'fit_seconds': fit_seconds,
+            **profile_model(model, X_profile),
+        }
+        logger.info(
+            f"{name} accuracy: {score:.4f}, prédiction p99 : {profiles[name]['predict_p99_ms']:.2f} ms, "
+            f"taille : {profiles[name]['size_mb']:.1f} Mo"
+        )
+
+    front = pareto_front(profiles)
+    logger.info(f"Front de Pareto (précision, latence, taille) : {', '.join(front)}")
+
+    best_name = select_model(profiles)
+    return {
+        'model_name': best_name,
+        'best_model': trained[best_name],
+        'accuracy': profiles[best_name]['accuracy'],
+        'profiles': profiles,
+        'pareto_front': front,
+    }
@@ -0,0 +1,127 @@
+"""Module pour mesurer le coût de service des modèles (latence de prédiction, taille)
+et choisir un modèle sous contraintes
+"""
+
+import io
+import logging
+import time
+import numpy as np
+from joblib import dump
+
+logger = logging.getLogger(__name__)
+
+# Prédictions d'une ligne mesurées pour estimer la latence du service
+LATENCY_REPEATS = 200
+# Objectifs du front de Pareto : (mesure, True si plus grand est meilleur)
+PARETO_OBJECTIVES = [
+    ("accuracy", True),
+    ("predict_p99_ms", False),
+    ("size_mb", False),
+]
+
+
+def artifact_size_mb(model) -> float:
+    """Taille du modèle sérialisé avec joblib, en Mo."""
+    buffer = io.BytesIO()
+    dump(model, buffer)
+    return buffer.getbuffer().nbytes / 1e6
+
+
+def profile_model(model, X: np.ndarray, repeats: int = LATENCY_REPEATS) -> dict:
+    """
+    Mesure le coût de service d'un modèle entraîné.
+
+    Args:
+        model: Modèle entraîné.
+        X (np.ndarray): Lignes de test : la première sert aux prédictions unitaires,
+            toutes à la prédiction par lot.
+        repeats (int): Nombre de prédictions d'une ligne.
+
+    Returns:
+        dict: "predict_p50_ms" et "predict_p99_ms" (une ligne, comme dans l'application),
+        "predict_batch_ms" (tout `X`) et "size_mb" (taille du fichier joblib).
+    """
+    row = X[:1]
+    model.predict_proba(row)
+
+    timings = np.empty(repeats)
+    for i in range(repeats):
+        start = time.perf_counter()
+        model.predict_proba(row)
+        timings[i] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    model.predict_proba(X)
+    batch = time.perf_counter() - start
+
+    return {
+        "predict_p50_ms": float(np.percentile(timings, 50) * 1e3),
+        "predict_p99_ms": float(np.percentile(timings, 99) * 1e3),
+        "predict_batch_ms": batch * 1e3,
+        "size_mb": artifact_size_mb(model),
+    }
+
+
+def pareto_front(profiles: dict[str, dict]) -> list[str]:
+    """
+    Modèles qu'aucun autre ne bat à la fois en précision, en latence et en taille.
+
+    Args:
+        profiles (dict[str, dict]): Mesures de chaque modèle (voir `PARETO_OBJECTIVES`).
+
+    Returns:
+        list[str]: Noms des modèles du front, dans l'ordre de `profiles`.
+    """
+    def dominates(a: dict, b: dict) -> bool:
+        better_or_equal = all(
+            a[key] >= b[key] if maximize else a[key] <= b[key] for key, maximize in PARETO_OBJECTIVES
+        )
+        return better_or_equal and any(a[key] != b[key] for key, _ in PARETO_OBJECTIVES)
+
+    return [
+        name
+        for name, profile in profiles.items()
+        if not any(dominates(other, profile) for other in profiles.values() if other is not profile)
+    ]
+
+
+def select_model(
+    profiles: dict[str, dict],
+    max_latency_ms: float | None = None,
+    max_size_mb: float | None = None,
+    accuracy_tolerance: float = 0.0,
+) -> str | None:
+    """
+    Choisit un modèle sous contraintes de service.
+
+    Parmi les modèles qui respectent la latence p99 et la taille maximales, ceux à moins
+    de `accuracy_tolerance` de la meilleure précision sont jugés équivalents : le plus
+    rapide est retenu. Avec les valeurs par défaut, c'est le plus précis.
+
+    Args:
+        profiles (dict[str, dict]): Mesures de chaque modèle ("accuracy", "predict_p99_ms", "size_mb").
+        max_latency_ms (float | None): Latence p99 maximale d'une prédiction, en ms.
+        max_size_mb (float | None): Taille maximale du modèle, en Mo.
+        accuracy_tolerance (float): Écart de précision considéré comme du bruit.
+
+    Returns:
+        str | None: Nom du modèle retenu, None si aucun ne respecte les contraintes.
+    """
+    eligible = {
+        name: profile
+        for name, profile in profiles.items()
+        if (max_latency_ms is None or profile["predict_p99_ms"] <= max_latency_ms)
+        and (max_size_mb is None or profile["size_mb"] <= max_size_mb)
+    }
+    if not eligible:
+        return None
+
+    best_accuracy = max(profile["accuracy"] for profile in eligible.values())
+    candidates = [
+        name for name, profile in eligible.items()
+        if profile["accuracy"] >= best_accuracy - accuracy_tolerance
+    ]
+    # À précision égale (tolérance nulle), le premier modèle l'emporte comme avant
+    if accuracy_tolerance == 0:
+        return candidates[0]
+    return min(candidates, key=lambda name: eligible[name]["predict_p99_ms"])
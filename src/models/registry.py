@@ -0,0 +1,241 @@
+"""Module pour garder chaque modèle entraîné avec ses métadonnées (variables, empreinte
+des données, métriques) et servir la version promue sans redémarrer l'application
+"""
+
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+from joblib import dump, load
+from src.models.compact import compile_model
+
+logger = logging.getLogger(__name__)
+
+REGISTRY_DIR = "data/registry"
+# Fichier désignant la version servie, remplacé d'un bloc à chaque promotion
+PROMOTED_FILE = "promoted.json"
+METADATA_FILE = "metadata.json"
+# Intervalle minimal entre deux vérifications de la version promue, en secondes
+CHECK_INTERVAL = 5.0
+
+
+def _write_json(path: str, value) -> None:
+    with open(path + ".tmp", "w", encoding="utf-8") as fichier:
+        json.dump(value, fichier, ensure_ascii=False, indent=4)
+        fichier.flush()
+        os.fsync(fichier.fileno())
+    os.replace(path + ".tmp", path)
+
+
+class ModelRegistry:
+    """
+    Versions des modèles, une par dossier (`v0001`, `v0002`...) : les artefacts joblib
+    (non compressés, pour être chargés en memmap) et `metadata.json`. Les ensembles
+    d'arbres sont aussi enregistrés compilés (artefact "compact", servi en priorité) :
+    leurs tableaux de nœuds restent dans le fichier au chargement, ceux du modèle
+    d'origine non (scikit-learn recopie les nœuds, XGBoost relit un tampon d'octets).
+
+    Une version est écrite dans un dossier temporaire puis renommée : un lecteur ne voit
+    jamais de version incomplète. La version servie est désignée par `promoted.json`,
+    remplacé avec `os.replace`.
+    """
+
+    def __init__(self, directory: str = REGISTRY_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, version: str, *names: str) -> str:
+        return os.path.join(self.directory, version, *names)
+
+    def versions(self) -> list[str]:
+        """Versions enregistrées, de la plus ancienne à la plus récente."""
+        return sorted(
+            name for name in os.listdir(self.directory)
+            if name.startswith("v") and os.path.exists(self._path(name, METADATA_FILE))
+        )
+
+    def metadata(self, version: str) -> dict:
+        with open(self._path(version, METADATA_FILE), "r", encoding="utf-8") as fichier:
+            return json.load(fichier)
+
+    def register(
+        self,
+        model,
+        features: list[str] | None,
+        fingerprint: str,
+        metrics: dict,
+        promote: bool = False,
+        **extra,
+    ) -> str:
+        """
+        Enregistre un modèle entraîné comme nouvelle version, avec sa version compilée
+        si c'est un ensemble d'arbres (voir `compile_model`).
+
+        Args:
+            model: Modèle entraîné.
+            features (list[str] | None): Variables du modèle, dans l'ordre (toutes si None).
+            fingerprint (str): Empreinte des données d'entraînement (voir `dataset_fingerprint`).
+            metrics (dict): Métriques du modèle (précision, latence...).
+            promote (bool): Servir cette version dès son enregistrement.
+            **extra: Autres métadonnées (mode d'entraînement, nombre de matchs...).
+
+        Returns:
+            str: Nom de la version.
+        """
+        existing = self.versions()
+        version = f"v{int(existing[-1][1:]) + 1 if existing else 1:04d}"
+        tmp = self._path(f".{version}.tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+
+        artifacts = {"model": model}
+        try:
+            artifacts["compact"] = compile_model(model)
+        except ValueError as e:
+            logger.info(f"Pas de modèle compilé pour {type(model).__name__} : {e}")
+        for name, artifact in artifacts.items():
+            dump(artifact, os.path.join(tmp, f"{name}.joblib"))
+        _write_json(os.path.join(tmp, METADATA_FILE), {
+            "version": version,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "model_name": type(model).__name__,
+            "features": features,
+            "fingerprint": fingerprint,
+            "metrics": metrics,
+            "artifacts": list(artifacts),
+            **extra,
+        })
+        os.replace(tmp, self._path(version))
+        logger.info(f"Modèle {type(model).__name__} enregistré en version {version}.")
+
+        if promote:
+            self.promote(version)
+        return version
+
+    def add_artifact(self, version: str, name: str, artifact) -> None:
+        """Ajoute à une version un autre artefact (ex. le modèle compilé, servi en priorité)."""
+        path = self._path(version, f"{name}.joblib")
+        dump(artifact, path + ".tmp")
+        os.replace(path + ".tmp", path)
+
+        metadata = self.metadata(version)
+        if name not in metadata["artifacts"]:
+            metadata["artifacts"].append(name)
+        _write_json(self._path(version, METADATA_FILE), metadata)
+
+    def promote(self, version: str) -> None:
+        """Désigne la version servie."""
+        if version not in self.versions():
+            raise ValueError(f"Version inconnue : {version}")
+        _write_json(
+            os.path.join(self.directory, PROMOTED_FILE),
+            {"version": version, "promoted_at": datetime.now().isoformat(timespec="seconds")},
+        )
+        logger.info(f"Version {version} promue.")
+
+    def promoted(self) -> str | None:
+        """Version servie (None si aucune n'a été promue)."""
+        path = os.path.join(self.directory, PROMOTED_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as fichier:
+            return json.load(fichier)["version"]
+
+    def load(self, version: str | None = None, artifact: str | None = None, mmap_mode: str | None = "r"):
+        """
+        Charge un artefact d'une version.
+
+        Avec `mmap_mode`, les tableaux NumPy gardés tels quels dans le modèle (nœuds du
+        modèle compilé, coefficients d'un modèle linéaire) ne sont pas copiés en mémoire :
+        ils sont lus dans le fichier à la demande et partagés entre les processus qui servent
+        la même version. Les arbres de scikit-learn et les boosters XGBoost sont, eux,
+        recopiés au chargement : seul l'artefact "compact" évite cette copie.
+
+        Args:
+            version (str | None): Version (la version promue si None).
+            artifact (str | None): Artefact ("model", "compact"...), le dernier ajouté si None.
+            mmap_mode (str | None): Mode memmap de `joblib.load` (None pour tout copier en mémoire).
+
+        Returns:
+            tuple[object, dict]: (modèle, métadonnées de la version).
+        """
+        version = version or self.promoted()
+        if version is None:
+            raise FileNotFoundError(f"Aucune version promue dans {self.directory}")
+        metadata = self.metadata(version)
+        artifact = artifact or metadata["artifacts"][-1]
+        return load(self._path(version, f"{artifact}.joblib"), mmap_mode=mmap_mode), metadata
+
+
+class PromotedModel:
+    """
+    Modèle servi par un processus de longue durée, remplacé quand une autre version est promue.
+
+    `get` vérifie la version promue au plus toutes les `check_interval` secondes. Une
+    nouvelle version est chargée dans un thread : les prédictions continuent avec
+    l'ancienne jusqu'à ce que la nouvelle soit prête, puis la référence est remplacée
+    d'un bloc (modèle et métadonnées ensemble). Pour les ensembles d'arbres, c'est
+    l'artefact "compact", chargé en memmap, qui est servi : l'ancienne et la nouvelle
+    version ne sont pas toutes deux copiées en mémoire pendant le remplacement.
+    """
+
+    def __init__(self, registry: ModelRegistry, check_interval: float = CHECK_INTERVAL):
+        self.registry = registry
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._loading: threading.Thread | None = None
+        self._checked_at = time.monotonic()
+        served = self._served(registry.promoted())
+        if served is None:
+            raise FileNotFoundError(f"Aucune version promue dans {registry.directory}")
+        self._current = self._load(served)
+
+    def _served(self, version: str | None) -> tuple | None:
+        """Ce qui est servi pour une version : la version et ses artefacts."""
+        if version is None:
+            return None
+        return version, tuple(self.registry.metadata(version)["artifacts"])
+
+    def _load(self, served: tuple) -> tuple[tuple, object, dict]:
+        model, metadata = self.registry.load(served[0], served[1][-1])
+        return served, model, metadata
+
+    def _swap(self, served: tuple) -> None:
+        try:
+            self._current = self._load(served)
+            logger.info(f"Version {served[0]} ({served[1][-1]}) servie.")
+        except Exception:
+            logger.exception(f"Échec du chargement de la version {served[0]}, l'ancienne reste servie.")
+        finally:
+            self._loading = None
+
+    def refresh(self, wait: bool = False) -> None:
+        """
+        Charge la version promue si elle a changé (ou si un artefact lui a été ajouté).
+
+        Args:
+            wait (bool): Attendre la fin du chargement (sinon il se fait en arrière-plan).
+        """
+        with self._lock:
+            self._checked_at = time.monotonic()
+            served = self._served(self.registry.promoted())
+            if self._loading is None and served is not None and served != self._current[0]:
+                self._loading = threading.Thread(target=self._swap, args=(served,), daemon=True)
+                self._loading.start()
+            loading = self._loading
+        if wait and loading is not None:
+            loading.join()
+
+    def get(self) -> tuple[object, dict]:
+        """Modèle servi et ses métadonnées."""
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            self.refresh()
+        _, model, metadata = self._current
+        return model, metadata
+
+    @property
+    def version(self) -> str:
+        return self._current[0][0]
@@ -0,0 +1,338 @@
+"""Module pour mettre à jour le modèle sauvegardé avec les matchs ajoutés depuis son
+dernier entraînement, sans relancer la recherche d'hyperparamètres
+"""
+
+import json
+import logging
+import math
+import os
+from datetime import date
+from joblib import dump, load
+from sklearn.base import clone
+from sklearn.metrics import accuracy_score
+import numpy as np
+import polars as pl
+import xgboost as xgb
+from src.models.matrix import feature_matrix
+from src.models.out_of_core import BoosterClassifier, ScaledSGDClassifier, train_sgd, train_xgboost
+
+logger = logging.getLogger(__name__)
+
+MODEL_PATH = "data/best_model.joblib"
+MANIFEST_PATH = "data/best_model.json"
+
+# Colonnes du dataset propre qui ne sont pas des variables du modèle
+NON_FEATURE_COLUMNS = ["player1_name", "player2_name", "date"]
+
+# Arbres ajoutés au minimum à chaque mise à jour incrémentale
+MIN_EXTRA_ESTIMATORS = 10
+# Réentraînement complet au-delà de cet âge, de ce nombre de mises à jour
+# ou de cette baisse de précision sur les nouveaux matchs
+FULL_RETRAIN_DAYS = 30
+MAX_INCREMENTAL_UPDATES = 14
+ACCURACY_TOLERANCE = 0.05
+
+_FULL_MODES = ("search", "full")
+# Format des dates du dataset propre
+DATE_FORMAT = "%d.%m.%y"
+
+
+def features_and_target(df: pl.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Sépare les variables du modèle et la cible, comme pour la recherche (voir `train_test`).
+
+    Args:
+        df (pl.DataFrame): Dataset propre.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: (X, y).
+    """
+    matrix = feature_matrix(df.drop([column for column in NON_FEATURE_COLUMNS if column in df.columns]))
+    return matrix.X, matrix.y
+
+
+def match_dates(df: pl.DataFrame) -> pl.Expr:
+    """Colonne "date" en pl.Date (le dataset propre la garde au format 'DD.MM.YY')."""
+    if df.schema["date"] == pl.String:
+        return pl.col("date").str.strptime(pl.Date, format=DATE_FORMAT)
+    return pl.col("date")
+
+
+def _match_keys() -> pl.Expr:
+    """Identifiant d'une ligne le même jour : les deux joueurs, dans l'ordre de la ligne."""
+    return pl.concat_str("player1_name", "player2_name", separator=" vs ")
+
+
+def load_manifest(path: str = MANIFEST_PATH) -> dict:
+    """Historique des versions du modèle (vide si le fichier n'existe pas)."""
+    if not os.path.exists(path):
+        return {"versions": []}
+    with open(path, "r", encoding="utf-8") as fichier:
+        return json.load(fichier)
+
+
+def save_manifest(manifest: dict, path: str = MANIFEST_PATH) -> None:
+    with open(path + ".tmp", "w", encoding="utf-8") as fichier:
+        json.dump(manifest, fichier, ensure_ascii=False, indent=4)
+    os.replace(path + ".tmp", path)
+
+
+def _base_params(model) -> dict:
+    """Hyperparamètres simples du modèle, pour refaire un entraînement complet à l'identique."""
+    if not hasattr(model, "get_params"):
+        return {}
+    return {
+        key: value
+        for key, value in model.get_params(deep=False).items()
+        if isinstance(value, (bool, int, float, str)) and key != "warm_start"
+    }
+
+
+def record_version(
+    manifest: dict,
+    df: pl.DataFrame,
+    mode: str,
+    model,
+    accuracy: float | None = None,
+    accuracy_new_rows: float | None = None,
+    today: date | None = None,
+) -> dict:
+    """
+    Ajoute une version au manifeste : quelles données le modèle a vues et comment.
+
+    Args:
+        manifest (dict): Manifeste, modifié sur place.
+        df (pl.DataFrame): Dataset vu par le modèle (avec la colonne "date").
+        mode (str): 'search' (recherche complète), 'full' (réentraînement complet)
+            ou 'incremental'.
+        model: Modèle entraîné.
+        accuracy (float | None): Précision de référence, mesurée sur le jeu de test de la recherche.
+        accuracy_new_rows (float | None): Précision de la version précédente sur les nouveaux matchs.
+        today (date | None): Date de l'entraînement (aujourd'hui si None).
+
+    Returns:
+        dict: Version ajoutée.
+    """
+    versions = manifest["versions"]
+    last_date = df.select(match_dates(df).max()).item() if df.height else None
+    entry = {
+        "version": len(versions) + 1,
+        "mode": mode,
+        "trained_on": (today or date.today()).isoformat(),
+        "model_name": type(model).__name__,
+        "n_rows": df.height,
+        "last_date": last_date.isoformat() if last_date is not None else None,
+        "accuracy": accuracy,
+        "accuracy_new_rows": accuracy_new_rows,
+    }
+    # Lignes déjà vues à la dernière date : d'autres matchs du même jour peuvent arriver ensuite
+    if last_date is not None and {"player1_name", "player2_name"} <= set(df.columns):
+        entry["last_date_matches"] = sorted(
+            df.filter(match_dates(df) == last_date).select(_match_keys()).to_series().to_list()
+        )
+    if mode in _FULL_MODES:
+        entry["params"] = _base_params(model)
+    versions.append(entry)
+    return entry
+
+
+def new_rows(df: pl.DataFrame, manifest: dict) -> pl.DataFrame:
+    """
+    Matchs que la dernière version du modèle n'a pas vus : ceux postérieurs à sa dernière
+    date, et ceux de cette date absents de ses lignes (`last_date_matches`, voir `record_version`).
+    """
+    if not manifest["versions"] or manifest["versions"][-1]["last_date"] is None:
+        return df
+    last = manifest["versions"][-1]
+    last_date = date.fromisoformat(last["last_date"])
+    if "last_date_matches" not in last:
+        return df.filter(match_dates(df) > last_date)
+    same_day = (match_dates(df) == last_date) & ~_match_keys().is_in(last["last_date_matches"])
+    return df.filter((match_dates(df) > last_date) | same_day)
+
+
+def _last_full_version(manifest: dict) -> dict | None:
+    full = [entry for entry in manifest["versions"] if entry["mode"] in _FULL_MODES]
+    return full[-1] if full else None
+
+
+def full_retrain_reason(
+    manifest: dict, today: date, accuracy_new_rows: float | None = None
+) -> str | None:
+    """
+    Vérifie si une mise à jour incrémentale suffit ou s'il faut tout réentraîner.
+
+    Args:
+        manifest (dict): Manifeste du modèle.
+        today (date): Date du jour.
+        accuracy_new_rows (float | None): Précision du modèle actuel sur les nouveaux matchs.
+
+    Returns:
+        str | None: Raison du réentraînement complet, ou None si l'incrémental suffit.
+    """
+    last_full = _last_full_version(manifest)
+    if last_full is None:
+        return "aucun entraînement complet connu"
+
+    age = (today - date.fromisoformat(last_full["trained_on"])).days
+    if age >= FULL_RETRAIN_DAYS:
+        return f"dernier entraînement complet il y a {age} jours"
+
+    nb_updates = len(manifest["versions"]) - manifest["versions"].index(last_full) - 1
+    if nb_updates >= MAX_INCREMENTAL_UPDATES:
+        return f"{nb_updates} mises à jour incrémentales depuis le dernier entraînement complet"
+
+    reference = last_full.get("accuracy")
+    if (
+        accuracy_new_rows is not None
+        and reference is not None
+        and accuracy_new_rows < reference - ACCURACY_TOLERANCE
+    ):
+        return f"précision sur les nouveaux matchs en baisse ({accuracy_new_rows:.4f} < {reference:.4f})"
+    return None
+
+
+def supports_incremental(model) -> bool:
+    """Le modèle peut-il apprendre les nouveaux matchs sans repartir de zéro ?"""
+    if isinstance(model, xgb.XGBClassifier) or hasattr(model, "partial_fit"):
+        return True
+    return hasattr(model, "estimators_") and "warm_start" in model.get_params()
+
+
+def extra_estimators(n_estimators: int, n_new: int, n_seen: int) -> int:
+    """Arbres à ajouter : proportionnels à la part de nouveaux matchs, au moins `MIN_EXTRA_ESTIMATORS`."""
+    return max(MIN_EXTRA_ESTIMATORS, math.ceil(n_estimators * n_new / max(n_seen, 1)))
+
+
+def incremental_fit(model, X_new: np.ndarray, y_new: np.ndarray, n_seen: int):
+    """
+    Met à jour un modèle entraîné avec les nouveaux matchs uniquement.
+
+    - XGBoost : boosting poursuivi à partir du booster existant.
+    - XGBoost hors mémoire (`BoosterClassifier`) : arbres ajoutés avec `partial_fit`.
+    - Forêts et gradient boosting de scikit-learn : arbres ajoutés avec `warm_start`.
+    - Modèles avec `partial_fit` : une passe sur les nouvelles lignes.
+
+    Args:
+        model: Modèle entraîné (voir `supports_incremental`), modifié sur place.
+        X_new (np.ndarray): Variables des nouveaux matchs.
+        y_new (np.ndarray): Cibles des nouveaux matchs.
+        n_seen (int): Nombre de matchs déjà vus par le modèle.
+
+    Returns:
+        Le modèle mis à jour.
+    """
+    if isinstance(model, xgb.XGBClassifier):
+        booster = model.get_booster()
+        n_estimators = booster.num_boosted_rounds()
+        extra = extra_estimators(n_estimators, len(y_new), n_seen)
+        model.set_params(n_estimators=extra)
+        model.fit(X_new, y_new, xgb_model=booster)
+        # Comme pour les forêts, n_estimators compte tous les arbres du booster
+        model.set_params(n_estimators=n_estimators + extra)
+        return model
+
+    if isinstance(model, BoosterClassifier):
+        extra = extra_estimators(model.booster_.num_boosted_rounds(), len(y_new), n_seen)
+        return model.partial_fit(X_new, y_new, num_boost_round=extra)
+
+    if "warm_start" in model.get_params() and hasattr(model, "estimators_"):
+        n_estimators = len(model.estimators_)
+        extra = extra_estimators(n_estimators, len(y_new), n_seen)
+        model.set_params(warm_start=True, n_estimators=n_estimators + extra)
+        model.fit(X_new, y_new)
+        model.set_params(warm_start=False)
+        return model
+
+    return model.partial_fit(X_new, y_new)
+
+
+def _search_params(manifest: dict) -> dict:
+    """Hyperparamètres du dernier entraînement complet (vide s'il n'y en a pas)."""
+    last_full = _last_full_version(manifest)
+    return last_full["params"] if last_full is not None else {}
+
+
+def _full_fit(model, manifest: dict, X: np.ndarray, y: np.ndarray):
+    """Réentraîne le modèle sur tout le dataset, avec les hyperparamètres de la recherche."""
+    return clone(model).set_params(**_search_params(manifest)).fit(X, y)
+
+
+def _out_of_core_fit(model, manifest: dict, dataset_path: str, features: list[str]):
+    """
+    Réentraîne un modèle hors mémoire (voir `out_of_core`) en relisant le dataset Parquet
+    par paquets, avec les hyperparamètres de la recherche.
+    """
+    params = {**model.get_params(), **_search_params(manifest)}
+    seed = params.pop("seed")
+    trainer = train_xgboost if isinstance(model, BoosterClassifier) else train_sgd
+    return trainer(dataset_path, seed, features=features, **params)
+
+
+def retrain(
+    df: pl.DataFrame,
+    model_path: str = MODEL_PATH,
+    manifest_path: str = MANIFEST_PATH,
+    today: date | None = None,
+    force_full: bool = False,
+    dataset_path: str | None = None,
+) -> dict | None:
+    """
+    Met à jour le modèle sauvegardé avec les matchs ajoutés depuis sa dernière version.
+
+    La mise à jour est incrémentale, sauf si `full_retrain_reason` demande un
+    réentraînement complet (âge, nombre de mises à jour, baisse de précision) ou si
+    le modèle ne le permet pas : le modèle est alors réentraîné sur tout le dataset
+    avec les mêmes hyperparamètres. La recherche d'hyperparamètres reste dans `models.py`.
+
+    Args:
+        df (pl.DataFrame): Dataset propre complet (avec la colonne "date").
+        model_path (str): Modèle sauvegardé.
+        manifest_path (str): Manifeste des versions (voir `record_version`).
+        today (date | None): Date du jour (aujourd'hui si None).
+        force_full (bool): Forcer un réentraînement complet.
+        dataset_path (str | None): Dataset propre au format Parquet. Les modèles hors mémoire
+            y sont réentraînés paquet par paquet, sans charger tout le dataset en une matrice.
+
+    Returns:
+        dict | None: Version ajoutée, ou None s'il n'y a aucun nouveau match.
+    """
+    today = today or date.today()
+    model = load(model_path)
+    manifest = load_manifest(manifest_path)
+
+    new = new_rows(df, manifest)
+    if new.is_empty():
+        logger.info("Aucun nouveau match depuis la dernière version du modèle.")
+        return None
+
+    X_new, y_new = features_and_target(new)
+    accuracy_new = float(accuracy_score(y_new, model.predict(X_new)))
+    logger.info(f"{new.height} nouveaux matchs, précision du modèle actuel : {accuracy_new:.4f}")
+
+    reason = "demandé" if force_full else full_retrain_reason(manifest, today, accuracy_new)
+    if reason is None and not supports_incremental(model):
+        reason = f"pas de mise à jour incrémentale pour {type(model).__name__}"
+
+    if reason is None:
+        n_seen = df.height - new.height
+        model = incremental_fit(model, X_new, y_new, n_seen)
+        mode = "incremental"
+    else:
+        logger.info(f"Réentraînement complet : {reason}.")
+        if dataset_path is not None and isinstance(model, (BoosterClassifier, ScaledSGDClassifier)):
+            features = [column for column in df.columns if column not in (*NON_FEATURE_COLUMNS, "target")]
+            model = _out_of_core_fit(model, manifest, dataset_path, features)
+        else:
+            model = _full_fit(model, manifest, *features_and_target(df))
+        mode = "full"
+
+    dump(model, model_path + ".tmp")
+    os.replace(model_path + ".tmp", model_path)
+    last_full = _last_full_version(manifest)
+    reference = last_full.get("accuracy") if last_full is not None else None
+    entry = record_version(manifest, df, mode, model, reference, accuracy_new, today)
+    save_manifest(manifest, manifest_path)
+
+    logger.info(f"Version {entry['version']} du modèle enregistrée ({mode}).")
+    return entry
@@ -0,0 +1,342 @@
+"""Module pour suivre la forme récente des joueurs (moyennes à décroissance exponentielle
+et fenêtre des derniers matchs), match après match
+"""
+
+import logging
+from datetime import date
+import numpy as np
+import polars as pl
+
+logger = logging.getLogger(__name__)
+
+# Statistiques suivies : nom de la feature -> (clé dans stats_matchs, statistique en ratio "X/Y (Z%)")
+FORM_STATS = {
+    "first_serve_pct": ("premier_service", True),
+    "first_serve_won_pct": ("pnts_gagnes_ps", True),
+    "second_serve_won_pct": ("pnts_gagnes_ss", True),
+    "return_points_won_pct": ("retours_gagnes", True),
+    "break_point_won_pct": ("balles_break_gagnees", True),
+    "double_fautes": ("double_fautes", False),
+    "aces": ("aces", False),
+}
+
+# Le taux de victoire est suivi comme une statistique de plus (victoires / matchs)
+FORM_VALUES = ["win_rate", *FORM_STATS]
+
+# Demi-vie (en jours) des moyennes exponentielles et taille de la fenêtre des derniers matchs
+HALF_LIFE_DAYS = 180.0
+WINDOW = 10
+
+
+def form_keys(window: int = WINDOW) -> list[str]:
+    """
+    Noms des features produites par `RollingForm.snapshot`.
+
+    Args:
+        window (int): Taille de la fenêtre des derniers matchs.
+
+    Returns:
+        list[str]: "form_<stat>" (décroissance exponentielle), "last<window>_<stat>"
+        (derniers matchs) et "form_matches" (nombre de matchs pondéré).
+    """
+    return (
+        [f"form_{name}" for name in FORM_VALUES]
+        + [f"last{window}_{name}" for name in FORM_VALUES]
+        + ["form_matches"]
+    )
+
+
+def stat_values(stats: dict | None, won: bool) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Convertit les statistiques d'un joueur sur un match en couples (numérateur, dénominateur).
+
+    Args:
+        stats (dict | None): Statistiques du joueur (voir stats_matchs.json), ou None si absentes.
+        won (bool): Le joueur a gagné le match.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Numérateurs et dénominateurs alignés sur `FORM_VALUES`.
+        Une statistique absente ou illisible a un dénominateur nul et n'est pas comptée.
+    """
+    numerators = np.zeros(len(FORM_VALUES))
+    denominators = np.zeros(len(FORM_VALUES))
+    numerators[0], denominators[0] = float(won), 1.0
+    if not stats:
+        return numerators, denominators
+
+    for i, (key, ratio) in enumerate(FORM_STATS.values(), start=1):
+        value = stats.get(key, "NA")
+        if value == "NA":
+            continue
+        try:
+            if ratio:
+                numerator, denominator = map(int, value.split(" ")[0].split("/"))
+            else:
+                numerator, denominator = int(value), 1
+        except (AttributeError, ValueError):
+            continue
+        numerators[i], denominators[i] = numerator, denominator
+
+    return numerators, denominators
+
+
+class RollingForm:
+    """
+    Forme récente de chaque joueur, mise à jour en O(1) à chaque match.
+
+    Deux accumulateurs sont gardés par joueur et par statistique :
+    - des sommes à décroissance exponentielle (demi-vie `half_life` jours) du
+      numérateur et du dénominateur, datées du dernier match du joueur ;
+    - un tampon circulaire des `window` derniers matchs et ses sommes courantes,
+      corrigées du match qui sort de la fenêtre.
+
+    L'état peut être lu à n'importe quelle date (`snapshot`) et sauvegardé pour
+    être complété plus tard avec les nouveaux matchs seulement. La forme d'avant-match
+    de chaque match identifié reste disponible (`pre_match`), y compris après rechargement.
+    """
+
+    def __init__(
+        self,
+        half_life: float = HALF_LIFE_DAYS,
+        window: int = WINDOW,
+        capacity: int = 1024,
+    ):
+        self.half_life = half_life
+        self.window = window
+        self.players: dict[str, int] = {}
+        self.seen_matches: set[str] = set()
+        # Forme d'avant-match (vainqueur, perdant) par match, alignée sur `form_keys`
+        self.history: dict[str, np.ndarray] = {}
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int) -> None:
+        n = len(FORM_VALUES)
+        self.last_day = np.zeros(capacity, dtype=np.int64)
+        self.decayed_matches = np.zeros(capacity)
+        self.decayed_num = np.zeros((capacity, n))
+        self.decayed_den = np.zeros((capacity, n))
+        self.window_num = np.zeros((capacity, self.window, n))
+        self.window_den = np.zeros((capacity, self.window, n))
+        self.window_sum_num = np.zeros((capacity, n))
+        self.window_sum_den = np.zeros((capacity, n))
+        self.window_pos = np.zeros(capacity, dtype=np.int64)
+
+    def _index(self, player: str) -> int:
+        """Renvoie l'indice du joueur, en l'ajoutant si besoin."""
+        index = self.players.get(player)
+        if index is not None:
+            return index
+
+        index = len(self.players)
+        if index == len(self.last_day):
+            self._grow()
+        self.players[player] = index
+        return index
+
+    def _grow(self) -> None:
+        """Double la capacité des tableaux."""
+        old = {name: getattr(self, name) for name in self._arrays()}
+        self._allocate(2 * len(self.last_day))
+        for name, values in old.items():
+            getattr(self, name)[: len(values)] = values
+
+    @staticmethod
+    def _arrays() -> tuple[str, ...]:
+        return (
+            "last_day",
+            "decayed_matches",
+            "decayed_num",
+            "decayed_den",
+            "window_num",
+            "window_den",
+            "window_sum_num",
+            "window_sum_den",
+            "window_pos",
+        )
+
+    def _decay(self, index: int, day: int) -> float:
+        """Facteur d'oubli entre le dernier match du joueur et `day`."""
+        elapsed = max(day - int(self.last_day[index]), 0)
+        return 0.5 ** (elapsed / self.half_life)
+
+    def _update_player(
+        self, index: int, day: int, numerators: np.ndarray, denominators: np.ndarray
+    ) -> None:
+        decay = self._decay(index, day)
+        self.decayed_num[index] = self.decayed_num[index] * decay + numerators
+        self.decayed_den[index] = self.decayed_den[index] * decay + denominators
+        self.decayed_matches[index] = self.decayed_matches[index] * decay + 1.0
+        self.last_day[index] = max(day, int(self.last_day[index]))
+
+        # Le match le plus ancien de la fenêtre est écrasé par le nouveau
+        slot = self.window_pos[index] % self.window
+        self.window_sum_num[index] += numerators - self.window_num[index, slot]
+        self.window_sum_den[index] += denominators - self.window_den[index, slot]
+        self.window_num[index, slot] = numerators
+        self.window_den[index, slot] = denominators
+        self.window_pos[index] += 1
+
+    def _features(self, index: int | None, day: int) -> dict:
+        if index is None:
+            return dict.fromkeys(form_keys(self.window), 0.0)
+
+        decayed = _ratios(self.decayed_num[index], self.decayed_den[index])
+        recent = _ratios(self.window_sum_num[index], self.window_sum_den[index])
+        features = {f"form_{name}": value for name, value in zip(FORM_VALUES, decayed)}
+        features.update(
+            {f"last{self.window}_{name}": value for name, value in zip(FORM_VALUES, recent)}
+        )
+        features["form_matches"] = float(self.decayed_matches[index] * self._decay(index, day))
+        return features
+
+    def snapshot(self, player: str, at: date) -> dict:
+        """
+        Renvoie la forme d'un joueur à une date donnée, d'après les matchs déjà reçus.
+
+        Args:
+            player (str): Nom du joueur.
+            at (date): Date de lecture (les sommes exponentielles sont vieillies jusqu'à elle).
+
+        Returns:
+            dict: Features listées par `form_keys` (0 si le joueur est inconnu).
+        """
+        return self._features(self.players.get(player), at.toordinal())
+
+    def update(
+        self,
+        winner: str,
+        loser: str,
+        match_date: date,
+        winner_stats: dict | None = None,
+        loser_stats: dict | None = None,
+        match_id: str | None = None,
+    ) -> dict | None:
+        """
+        Met à jour la forme des deux joueurs avec un match.
+
+        Args:
+            winner (str): Nom du vainqueur.
+            loser (str): Nom du perdant.
+            match_date (date): Date du match.
+            winner_stats (dict | None): Statistiques du vainqueur sur ce match.
+            loser_stats (dict | None): Statistiques du perdant sur ce match.
+            match_id (str | None): Identifiant du match (ex. son lien), pour ignorer les doublons.
+
+        Returns:
+            dict | None: Forme des deux joueurs avant le match ({"winner": ..., "loser": ...}),
+            ou None si le match était déjà pris en compte.
+        """
+        if match_id is not None:
+            if match_id in self.seen_matches:
+                return None
+            self.seen_matches.add(match_id)
+
+        day = match_date.toordinal()
+        w, l = self._index(winner), self._index(loser)
+        pre_match = {"winner": self._features(w, day), "loser": self._features(l, day)}
+        self._update_player(w, day, *stat_values(winner_stats, True))
+        self._update_player(l, day, *stat_values(loser_stats, False))
+        if match_id is not None:
+            self.history[match_id] = np.array(
+                [list(pre_match["winner"].values()), list(pre_match["loser"].values())]
+            )
+        return pre_match
+
+    def pre_match(self, match_id: str) -> dict | None:
+        """Forme avant un match déjà pris en compte (voir `update`), ou None s'il est inconnu."""
+        values = self.history.get(match_id)
+        if values is None:
+            return None
+        keys = form_keys(self.window)
+        return {
+            "winner": dict(zip(keys, values[0].tolist())),
+            "loser": dict(zip(keys, values[1].tolist())),
+        }
+
+    def update_from_stream(self, matches: pl.DataFrame, stats_matches: dict) -> dict:
+        """
+        Applique une suite de matchs, dans l'ordre chronologique.
+
+        Args:
+            matches (pl.DataFrame): Matchs triés par date avec les colonnes
+                "lien_detail_match", "date" (pl.Date), "winner" et "loser".
+            stats_matches (dict): Statistiques des matchs (voir stats_matchs.json).
+
+        Returns:
+            dict: Forme d'avant-match (voir `update`) indexée par lien des nouveaux matchs.
+        """
+        stats_by_link = {
+            match["lien_match"]: (match.get("joueur_gagnant"), match.get("joueur_perdant"))
+            for match in stats_matches.values()
+        }
+
+        pre_match = {}
+        for lien, match_date, winner, loser in matches.select(
+            "lien_detail_match", "date", "winner", "loser"
+        ).iter_rows():
+            winner_stats, loser_stats = stats_by_link.get(lien, (None, None))
+            features = self.update(
+                winner, loser, match_date, winner_stats, loser_stats, match_id=lien
+            )
+            if features is not None:
+                pre_match[lien] = features
+
+        logger.info(f"Forme des joueurs mise à jour avec {len(pre_match)} nouveaux matchs.")
+        return pre_match
+
+    def save(self, file_path: str) -> None:
+        """
+        Sauvegarde l'état des accumulateurs dans un fichier .npz.
+
+        Args:
+            file_path (str): Chemin du fichier de sortie.
+        """
+        n = len(self.players)
+        np.savez_compressed(
+            file_path,
+            players=np.array(list(self.players), dtype=str),
+            half_life=np.array(self.half_life),
+            window=np.array(self.window),
+            seen_matches=np.array(sorted(self.seen_matches), dtype=str),
+            history_links=np.array(list(self.history), dtype=str),
+            history_values=np.array(list(self.history.values())).reshape(
+                -1, 2, len(form_keys(self.window))
+            ),
+            **{name: getattr(self, name)[:n] for name in self._arrays()},
+        )
+        logger.info(f"Forme des joueurs sauvegardée dans {file_path}.")
+
+    @classmethod
+    def load(cls, file_path: str) -> "RollingForm":
+        """
+        Recharge un état sauvegardé avec `save`.
+
+        Args:
+            file_path (str): Chemin du fichier .npz.
+
+        Returns:
+            RollingForm: Accumulateurs prêts à recevoir de nouveaux matchs.
+        """
+        with np.load(file_path) as data:
+            players = data["players"].tolist()
+            form = cls(
+                half_life=float(data["half_life"]),
+                window=int(data["window"]),
+                capacity=max(1, len(players)),
+            )
+            form.players = {player: i for i, player in enumerate(players)}
+            for name in cls._arrays():
+                getattr(form, name)[: len(players)] = data[name]
+            form.seen_matches = set(data["seen_matches"].tolist())
+            # Les fichiers antérieurs à l'historique n'en ont pas
+            if "history_links" in data:
+                form.history = dict(zip(data["history_links"].tolist(), data["history_values"]))
+        return form
+
+
+def _ratios(numerators: np.ndarray, denominators: np.ndarray) -> list[float]:
+    """Ratios numérateur / dénominateur (0 si le dénominateur est nul)."""
+    ratios = np.divide(
+        numerators, denominators, out=np.zeros(len(numerators)), where=denominators > 0
+    )
+    return ratios.tolist()
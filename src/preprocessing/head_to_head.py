@@ -0,0 +1,220 @@
+"""Module pour calculer les confrontations directes et la difficulté du calendrier
+à partir d'une matrice creuse joueur x joueur
+"""
+
+import logging
+import numpy as np
+import polars as pl
+from scipy import sparse
+
+logger = logging.getLogger(__name__)
+
+HEAD_TO_HEAD_KEYS = [
+    "h2h_wins",
+    "h2h_losses",
+    "avg_opponent_ranking",
+    "strength_of_schedule",
+]
+
+# Classement attribué aux adversaires absents du classement ATP
+UNRANKED_RANK = 1000
+
+
+class HeadToHead:
+    """
+    Historique des matchs sous forme de matrice CSR joueur x joueur découpée par date.
+
+    Chaque case non vide (vainqueur, perdant) de la matrice pointe vers la liste triée
+    des dates de leurs matchs : le nombre de victoires avant une date s'obtient par
+    recherche dichotomique, sans reconstruire de matrice. Les cumuls par joueur
+    (classement et taux de victoire des adversaires) suivent le même principe.
+    Toutes les requêtes sont vectorisées.
+    """
+
+    def __init__(
+        self,
+        matches: pl.DataFrame,
+        rankings: dict[str, int],
+        unranked_rank: int = UNRANKED_RANK,
+    ):
+        """
+        Args:
+            matches (pl.DataFrame): Matchs avec les colonnes "winner", "loser" et "date" (pl.Date),
+                et éventuellement "winner_ranking" et "loser_ranking" : classement de chaque
+                joueur à la date du match, prioritaire sur `rankings` quand il est connu.
+            rankings (dict[str, int]): Classement ATP de chaque joueur.
+            unranked_rank (int): Classement des joueurs absents de `rankings`.
+        """
+        names = pl.concat([matches["winner"], matches["loser"]]).unique().sort().to_list()
+        self.players = {name: i for i, name in enumerate(names)}
+        n = len(names)
+
+        winners = self._indices(matches["winner"].to_list())
+        losers = self._indices(matches["loser"].to_list())
+        days = matches["date"].to_numpy().astype("datetime64[D]").astype(np.int64)
+        self.first_day = int(days.min()) if len(days) else 0
+        # Largeur d'une plage de dates : une clé encode (indice, jour) en un seul entier
+        self.span = (int(days.max()) - self.first_day + 2) if len(days) else 1
+        days = days - self.first_day
+
+        # Matrice des paires (vainqueur, perdant) : valeur = numéro de paire + 1
+        pair_keys = winners * n + losers
+        unique_pairs, pair_ids = np.unique(pair_keys, return_inverse=True)
+        self.pairs = sparse.csr_matrix(
+            (
+                np.arange(1, len(unique_pairs) + 1, dtype=np.int64),
+                (unique_pairs // max(n, 1), unique_pairs % max(n, 1)),
+            ),
+            shape=(n, n),
+        )
+        self.pair_keys = np.sort(pair_ids * self.span + days)
+
+        # Classement de chaque joueur au moment du match, à défaut celui de `rankings`
+        rankings_np = np.array(
+            [rankings.get(name, unranked_rank) for name in names], dtype=np.float64
+        )
+        winner_rankings = _match_rankings(matches, "winner_ranking", rankings_np[winners])
+        loser_rankings = _match_rankings(matches, "loser_ranking", rankings_np[losers])
+
+        # Une ligne par (joueur, match), triée par joueur puis date
+        players = np.concatenate([winners, losers])
+        opponents = np.concatenate([losers, winners])
+        event_days = np.concatenate([days, days])
+        won = np.concatenate([np.ones(len(days)), np.zeros(len(days))])
+        order = np.lexsort((event_days, players))
+        self.player_keys = (players * self.span + event_days)[order]
+        self.cum_wins = _cumsum(won[order])
+        opponent_rankings = np.concatenate([loser_rankings, winner_rankings])
+        self.cum_opponent_ranking = _cumsum(opponent_rankings[order])
+
+        # Taux de victoire de chaque adversaire au moment où il a été affronté
+        opponent_matches, opponent_wins = self._counts_before(
+            opponents[order], event_days[order]
+        )
+        opponent_win_rates = np.divide(
+            opponent_wins,
+            opponent_matches,
+            out=np.zeros(len(order)),
+            where=opponent_matches > 0,
+        )
+        self.cum_opponent_win_rate = _cumsum(opponent_win_rates)
+
+    def __len__(self) -> int:
+        return len(self.players)
+
+    def _indices(self, names: list[str]) -> np.ndarray:
+        """Indices des joueurs (-1 si inconnu)."""
+        return np.array([self.players.get(name, -1) for name in names], dtype=np.int64)
+
+    def _days(self, cutoffs: list) -> np.ndarray:
+        """Dates limites converties en position dans la plage de dates."""
+        days = np.array(cutoffs, dtype="datetime64[D]").astype(np.int64) - self.first_day
+        return np.clip(days, 0, self.span - 1)
+
+    def _range(self, keys: np.ndarray, idx: np.ndarray, days: np.ndarray):
+        """Bornes [start, end) des entrées de `idx` antérieures à `days` dans `keys`."""
+        start = np.searchsorted(keys, idx * self.span, side="left")
+        end = np.searchsorted(keys, idx * self.span + days, side="left")
+        return start, end
+
+    def _counts_before(self, idx: np.ndarray, days: np.ndarray):
+        """Nombre de matchs et de victoires des joueurs `idx` avant `days`."""
+        start, end = self._range(self.player_keys, idx, days)
+        return (end - start).astype(np.float64), self.cum_wins[end] - self.cum_wins[start]
+
+    def win_matrix(self, cutoff) -> sparse.csr_matrix:
+        """
+        Construit la matrice des victoires avant une date.
+
+        Args:
+            cutoff (date): Date limite (exclue).
+
+        Returns:
+            sparse.csr_matrix: `wins[i, j]` = victoires du joueur i sur le joueur j.
+        """
+        coo = self.pairs.tocoo()
+        pair_ids = coo.data - 1
+        start, end = self._range(
+            self.pair_keys, pair_ids, np.full(len(pair_ids), self._days([cutoff])[0])
+        )
+        return sparse.csr_matrix(
+            ((end - start).astype(np.float64), (coo.row, coo.col)), shape=self.pairs.shape
+        )
+
+    def _wins_before(
+        self, winners: np.ndarray, losers: np.ndarray, days: np.ndarray
+    ) -> np.ndarray:
+        """Victoires de `winners` sur `losers` avant `days` (0 pour les joueurs inconnus)."""
+        known = (winners >= 0) & (losers >= 0)
+        pair_ids = np.zeros(len(winners), dtype=np.int64)
+        if known.any():
+            pair_ids[known] = self.pairs[winners[known], losers[known]].A1
+        start, end = self._range(self.pair_keys, pair_ids - 1, days)
+        return np.where(pair_ids > 0, end - start, 0)
+
+    def features(
+        self, players: list[str], opponents: list[str], cutoffs: list
+    ) -> pl.DataFrame:
+        """
+        Calcule les features de confrontation pour des triplets (joueur, adversaire, date),
+        en ne comptant que les matchs strictement antérieurs à la date.
+
+        Args:
+            players (list[str]): Joueurs.
+            opponents (list[str]): Adversaires, alignés avec `players`.
+            cutoffs (list): Dates limites (date), alignées avec `players`.
+
+        Returns:
+            pl.DataFrame: Une ligne par triplet avec les colonnes :
+                - "h2h_wins" (int) : Victoires du joueur contre l'adversaire.
+                - "h2h_losses" (int) : Défaites du joueur contre l'adversaire.
+                - "avg_opponent_ranking" (float) : Classement moyen des adversaires affrontés.
+                - "strength_of_schedule" (float) : Taux de victoire moyen des adversaires
+                  affrontés, au moment du match.
+        """
+        player_idx = self._indices(players)
+        opponent_idx = self._indices(opponents)
+        days = self._days(cutoffs)
+
+        # Les joueurs inconnus n'ont aucun match : leurs features restent à 0
+        start, end = self._range(self.player_keys, player_idx, days)
+        start, end = np.where(player_idx >= 0, start, 0), np.where(player_idx >= 0, end, 0)
+        nb_matches = (end - start).astype(np.float64)
+        has_matches = nb_matches > 0
+
+        def mean_before(cumul: np.ndarray) -> np.ndarray:
+            return np.divide(
+                cumul[end] - cumul[start],
+                nb_matches,
+                out=np.zeros(len(players)),
+                where=has_matches,
+            )
+
+        logger.info(f"Features de confrontation calculées pour {len(players)} requêtes.")
+        return pl.DataFrame(
+            {
+                "h2h_wins": self._wins_before(player_idx, opponent_idx, days),
+                "h2h_losses": self._wins_before(opponent_idx, player_idx, days),
+                "avg_opponent_ranking": mean_before(self.cum_opponent_ranking),
+                "strength_of_schedule": mean_before(self.cum_opponent_win_rate),
+            },
+            schema={
+                "h2h_wins": pl.Int64,
+                "h2h_losses": pl.Int64,
+                "avg_opponent_ranking": pl.Float64,
+                "strength_of_schedule": pl.Float64,
+            },
+        )
+
+
+def _cumsum(values: np.ndarray) -> np.ndarray:
+    """Somme cumulée précédée d'un 0 : la somme de [i, j) vaut cumul[j] - cumul[i]."""
+    return np.concatenate([[0.0], np.cumsum(values)])
+
+
+def _match_rankings(matches: pl.DataFrame, column: str, default: np.ndarray) -> np.ndarray:
+    """Classements d'une colonne de `matches`, complétés par `default` là où ils manquent."""
+    if column not in matches.columns:
+        return default
+    values = matches[column].cast(pl.Float64).to_numpy()
+    return np.where(np.isnan(values), default, values)
@@ -0,0 +1,150 @@
+"""Module pour lire et écrire les fichiers JSON du scraping élément par élément
+"""
+
+import json
+import logging
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1 << 16
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+class _Buffer:
+    """
+    Fenêtre glissante sur un fichier texte, rechargée à la demande.
+    """
+
+    def __init__(self, fichier, chunk_size: int):
+        self.fichier = fichier
+        self.chunk_size = chunk_size
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, min_size: int = 1) -> None:
+        """Lit la suite du fichier jusqu'à avoir au moins `min_size` caractères disponibles."""
+        self.text = self.text[self.pos :]
+        self.pos = 0
+        while len(self.text) < min_size and not self.eof:
+            chunk = self.fichier.read(max(self.chunk_size, min_size - len(self.text)))
+            if not chunk:
+                self.eof = True
+            self.text += chunk
+
+    def next_char(self) -> str:
+        """Renvoie le prochain caractère non blanc sans le consommer ('' en fin de fichier)."""
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if self.eof:
+                return ""
+            self.fill()
+
+    def expect(self, char: str) -> None:
+        """Consomme `char` ou lève une erreur de décodage."""
+        if self.next_char() != char:
+            raise json.JSONDecodeError(f"'{char}' attendu", self.text, self.pos)
+        self.pos += 1
+
+    def decode(self) -> Any:
+        """Décode la prochaine valeur JSON complète, en lisant la suite du fichier si besoin."""
+        self.next_char()
+        needed = max(len(self.text) - self.pos, self.chunk_size)
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, self.pos)
+                # Un nombre en fin de fenêtre peut être tronqué : il faut voir le caractère suivant
+                if end < len(self.text) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            needed *= 2
+            self.fill(needed)
+
+
+def iter_json_items(
+    file_path: str, chunk_size: int = CHUNK_SIZE
+) -> Iterator[tuple[str | int, Any]]:
+    """
+    Parcourt un fichier JSON dont la racine est un objet ou une liste, un élément à la fois.
+
+    Seul l'élément en cours est décodé en mémoire : un joueur de detail_joueurs.json,
+    un match de stats_matchs.json, etc.
+
+    Args:
+        file_path (str): Chemin du fichier JSON.
+        chunk_size (int): Nombre de caractères lus à chaque accès au fichier.
+
+    Yields:
+        tuple[str | int, Any]: (clé, valeur) pour un objet, (indice, valeur) pour une liste.
+    """
+    with open(file_path, "r", encoding="utf-8") as fichier:
+        buffer = _Buffer(fichier, chunk_size)
+        racine = buffer.next_char()
+        if racine not in ("{", "["):
+            raise json.JSONDecodeError("objet ou liste attendu", buffer.text, buffer.pos)
+        fin = "}" if racine == "{" else "]"
+        buffer.pos += 1
+
+        index = 0
+        if buffer.next_char() == fin:
+            return
+        while True:
+            if racine == "{":
+                key = buffer.decode()
+                buffer.expect(":")
+            else:
+                key = index
+            yield key, buffer.decode()
+            index += 1
+
+            if buffer.next_char() == fin:
+                return
+            buffer.expect(",")
+
+
+def write_json_items(
+    file_path: str, items: Iterable[tuple[str, Any]] | Iterable[Any], as_list: bool = False
+) -> int:
+    """
+    Écrit un fichier JSON élément par élément, avec la même mise en forme que
+    `json.dump(..., ensure_ascii=False, indent=4)`.
+
+    Args:
+        file_path (str): Chemin du fichier JSON à écrire.
+        items (Iterable): Couples (clé, valeur) pour un objet, valeurs pour une liste.
+        as_list (bool): Écrit une liste plutôt qu'un objet.
+
+    Returns:
+        int: Nombre d'éléments écrits.
+    """
+    ouverture, fermeture = ("[", "]") if as_list else ("{", "}")
+    count = 0
+
+    with open(file_path, "w", encoding="utf-8") as fichier:
+        fichier.write(ouverture)
+        for item in items:
+            if as_list:
+                entree = _dumps(item)
+            else:
+                key, value = item
+                entree = f"{_dumps(key)}: {_dumps(value)}"
+            fichier.write(("," if count else "") + "\n    " + entree)
+            count += 1
+        fichier.write(("\n" if count else "") + fermeture)
+
+    logger.info(f"{count} éléments écrits dans {file_path}.")
+    return count
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, indent=4).replace("\n", "\n    ")
@@ -3,17 +3,85 @@
 
 import polars as pl
 import numpy as np
-import json
+import pyarrow as pa
+import pyarrow.parquet as pq
 import logging
-import random
+import os
+from collections.abc import Iterator
 from datetime import datetime
+from itertools import batched
 from tqdm import tqdm
+from src.preprocessing.form import WINDOW, RollingForm, form_keys
+from src.preprocessing.head_to_head import HEAD_TO_HEAD_KEYS, HeadToHead
+from src.preprocessing.json_stream import iter_json_items
+from src.preprocessing.rankings import RANKING_COLUMNS, join_rankings_asof
+from src.preprocessing.ratings import EloRatings
+from src.preprocessing.scores import (
+    summarize_matches,
+    win_rate_counts,
+    win_rates_asof,
+    win_rates_from_counts,
+)
+from src.preprocessing.tournaments import (
+    add_tournament_metadata,
+    build_tournament_table,
+    tournament_category,
+)
 
 logger = logging.getLogger(__name__)
 
+SURFACES = ["dure", "terre battue", "gazon", "salle", "carpet", "acryl"]
+
+PERFORMANCE_STATS_KEYS = [
+    "avg_first_serve_pct",
+    "avg_first_serve_won_pct",
+    "avg_second_serve_won_pct",
+    "avg_return_points_won_pct",
+    "avg_break_point_won_pct",
+    "avg_double_fautes",
+    "avg_aces",
+]
+
+# Indicatrices de surface du dataset clean : nom de colonne -> surface
+SURFACE_DUMMIES = {
+    "surface_dure": "dure",
+    "surface_salle": "salle",
+    "surface_terre_batue": "terre battue",
+    "surface_gazon": "gazon",
+}
+
+# Features de différence joueur 1 - joueur 2 : nom de colonne -> feature
+DIFF_FEATURES = {
+    "ranking_diff": "ranking",
+    "points_diff": "points",
+    "win_rate_diff": "win_rate",
+    "win_rate_diff_3_sets": "win_rate_3_sets",
+    "win_rate_tiebreak_diff": "win_rate_tiebreak",
+    "aces_diff": "avg_aces",
+    "double_faults_diff": "avg_double_fautes",
+    "win_rate_dure_diff": "win_rate_dure",
+    "win_rate_terre_diff": "win_rate_terre battue",
+    "win_rate_gazon_diff": "win_rate_gazon",
+    "win_rate_salle_diff": "win_rate_salle",
+    "elo_diff": "elo",
+    "elo_surface_diff": "elo_surface",
+    "h2h_diff": "h2h_wins",
+    "opponent_ranking_diff": "avg_opponent_ranking",
+    "strength_of_schedule_diff": "strength_of_schedule",
+    "form_win_rate_diff": "form_win_rate",
+    "recent_win_rate_diff": "last10_win_rate",
+    "form_return_points_diff": "form_return_points_won_pct",
+}
+
+# Colonnes du dataset clean qui ne sont pas des entrées du modèle
+NON_FEATURE_COLUMNS = ["player1_name", "player2_name", "date", "target"]
+
+# Nombre de lignes par row group du dataset brut
+RAW_DATASET_BATCH_SIZE = 1024
+
 
 def create_player_features(
-    player_data, matches, stats_matches_data, current_match
+    player_data, matches, stats_matches_data, current_match, win_rates=None
 ) -> dict:
     """
     Génère les caractéristiques d'un joueur à partir des données et statistiques disponibles.
@@ -23,6 +91,8 @@ def create_player_features(
         matches (list): Historique des matchs.
         stats_matches_data (list): Statistiques détaillées des matchs.
         current_match (dict): Détails du match en cours (ex. date, surface).
+        win_rates (dict | None): Taux de victoire déjà calculés pour ce joueur à cette date
+            (voir `build_win_rates_lookup`). Calculés à partir de `matches` si absents.
 
     Returns:
         dict: Caractéristiques du joueur (données de base, taux de victoire, 
@@ -41,7 +111,8 @@ def create_player_features(
         before_match_date = current_match["date"]
         recent_matches = filter_matches_before_date(matches, before_match_date)
 
-        win_rates = calculate_win_rates(recent_matches)
+        if win_rates is None:
+            win_rates = calculate_win_rates(recent_matches)
         player_features.update(win_rates)
 
         surface_stats = calculate_surface_stats(recent_matches)
@@ -89,7 +160,8 @@ def filter_matches_before_date(matches, current_match_date) -> list:
 
 def calculate_win_rates(matches) -> dict:
     """
-    Calcule les taux de victoire globaux.
+    Calcule les taux de victoire globaux, sur les matchs en 3 sets ou plus
+    et sur les matchs comportant au moins un tie-break.
 
     Args:
         matches (list): Liste des matchs.
@@ -101,40 +173,47 @@ def calculate_win_rates(matches) -> dict:
         logger.warning("Aucun match disponible pour calculer les taux de victoire.")
         return {"win_rate": 0, "win_rate_3_sets": 0, "win_rate_tiebreak": 0}
 
-    # Calcul des statistiques si des matchs existent
-    victories = sum(1 for m in matches if m["resultat"] == "victoire")
-    total_matches = len(matches)
-    tiebreak_matches = sum(
-        1
-        for m in matches
-        if any(("7-6" or "6-7") in set_score for set_score in m["score"].split(", "))
-    )
-    three_set_matches = sum(1 for m in matches if len(m["score"].split(", ")) >= 3)
-
-    win_rates = {
-        "win_rate": victories / total_matches,
-        "win_rate_3_sets": sum(
-            1
-            for m in matches
-            if len(m["score"].split(", ")) >= 3 and m["resultat"] == "victoire"
-        )
-        / max(1, three_set_matches),
-        "win_rate_tiebreak": sum(
-            1
-            for m in matches
-            if (
-                any("7-6" in set_score for set_score in m["score"].split(", "))
-                and m["resultat"] == "victoire"
-            )
-            or (
-                any("6-7" in set_score for set_score in m["score"].split(", "))
-                and m["resultat"] == "défaite"
-            )
+    summary = summarize_matches(
+        pl.DataFrame(
+            {
+                "score": [m["score"] for m in matches],
+                "resultat": [m["resultat"] for m in matches],
+            }
         )
-        / max(1, tiebreak_matches),
-    }
+    )
+    counts = summary.select(win_rate_counts())
+    return counts.select(win_rates_from_counts()).row(0, named=True)
+
+
+def build_win_rates_lookup(detail_joueurs: dict) -> dict:
+    """
+    Calcule en une seule passe les taux de victoire de chaque joueur avant chacune de ses dates de match.
+
+    Args:
+        detail_joueurs (dict): Dictionnaire contenant les détails des joueurs et leurs matchs.
+
+    Returns:
+        dict: Taux de victoire (voir `calculate_win_rates`) indexés par (nom du joueur, date 'DD.MM.YY').
+    """
+    rows = [
+        {
+            "player": player_name,
+            "date": match["date"],
+            "score": match["score"],
+            "resultat": match["resultat"],
+        }
+        for player_name, player_details in detail_joueurs.items()
+        for match in player_details["matchs"]
+        if "date" in match
+    ]
+    if not rows:
+        return {}
 
-    return win_rates
+    table = win_rates_asof(summarize_matches(pl.DataFrame(rows)))
+    return {
+        (row.pop("player"), row.pop("date")): row
+        for row in table.iter_rows(named=True)
+    }
 
 
 def calculate_surface_stats(matches) -> dict:
@@ -152,11 +231,9 @@ def calculate_surface_stats(matches) -> dict:
             - "win_rate_<surface>" (float) : Taux de victoires (0 si aucun match joué).
     """
 
-
-    surfaces = ["dure", "terre battue", "gazon", "salle", "carpet", "acryl"]
     stats = {}
 
-    for surface in surfaces:
+    for surface in SURFACES:
         if not matches:
             logger.warning("Aucun match disponible pour calculer les taux de victoire.")
             stats[f"win_rate_{surface}"] = 0.0
@@ -261,15 +338,7 @@ def calculate_performance_stats(
         logger.warning(
             f"Aucun match trouvé pour {player_name} avant {current_match_date.strftime('%d.%m.%y')}"
         )
-        averages = {
-            "avg_first_serve_pct": 0.0,
-            "avg_first_serve_won_pct": 0.0,
-            "avg_second_serve_won_pct": 0.0,
-            "avg_return_points_won_pct": 0.0,
-            "avg_break_point_won_pct": 0.0,
-            "avg_double_fautes": 0.0,
-            "avg_aces": 0.0,
-        }
+        averages = {key: 0.0 for key in PERFORMANCE_STATS_KEYS}
     else:
         averages = {
             "avg_first_serve_pct": calculate_average_stat_ratio(
@@ -395,7 +464,8 @@ def prepare_match_data(player1_data: dict, player2_data: dict, match_info: dict)
     features.update(
         {
             "surface": match_info["type_terrain"],
-            "tournament_category": get_tournament_category(match_info["tournoi"]),
+            "tournament_category": match_info.get("tournament_category")
+            or get_tournament_category(match_info["tournoi"]),
             "url_match": match_info["lien_detail_match"],
         }
     )
@@ -417,59 +487,119 @@ def get_tournament_category(tournament_name) -> int:
     Returns:
         int: La catégorie du tournoi (4 = Grand Slam, 3 = Masters ou ATP Finals, 2 = ATP 500, 1 = ATP 250).
     """
-    tournament_name = tournament_name.lower()
+    return tournament_category(tournament_name)
 
-    if any(
-        grand_slam in tournament_name
-        for grand_slam in ["australian open", "roland garros", "wimbledon", "u.s. open"]
-    ):
-        return 4
-
-    elif "atp finals" in tournament_name or "laver cup" in tournament_name:
-        return 3
-
-    elif any(
-        masters in tournament_name
-        for masters in [
-            "indian wells",
-            "miami",
-            "monte carlo",
-            "madrid",
-            "rome",
-            "canada",
-            "cincinnati",
-            "shanghai",
-            "paris",
-        ]
-    ):
-        return 3
-
-    elif any(
-        atp_500 in tournament_name
-        for atp_500 in [
-            "rotterdam",
-            "dubai",
-            "acapulco",
-            "barcelona",
-            "queen",
-            "halle",
-            "hamburg",
-            "beijing",
-            "tokyo",
-            "vienna",
-            "basel",
-        ]
-    ):
-        return 2
 
-    else:
-        return 1
+def iter_stats_matches(stats_match_file: str) -> Iterator[tuple[str, dict]]:
+    """
+    Parcourt un fichier de statistiques des matchs un match à la fois, en remplaçant
+    les valeurs vides par 'NA' au passage.
+
+    Args:
+        stats_match_file (str): Le chemin vers le fichier JSON contenant les données des matchs.
+
+    Yields:
+        tuple[str, dict]: L'identifiant du match et ses statistiques nettoyées.
+    """
+    for id_match, match in iter_json_items(stats_match_file):
+        yield id_match, replace_empty_values_with_na(match)
+
+
+def iter_match_links(detail_joueurs_file: str) -> Iterator[str]:
+    """
+    Parcourt le fichier des détails des joueurs un joueur à la fois et renvoie les liens de leurs matchs.
+
+    Args:
+        detail_joueurs_file (str): Le chemin vers le fichier JSON contenant les détails des joueurs.
+
+    Yields:
+        str: Lien vers le détail d'un match (un même lien peut apparaître pour les deux joueurs).
+    """
+    for _, joueur in iter_json_items(detail_joueurs_file):
+        for match in joueur["matchs"]:
+            yield match["lien_detail_match"]
+
+
+def select_match_links(
+    detail_joueurs_file: str,
+    joueurs_file: str,
+    stored_links: set[str] | None = None,
+    date_min: datetime | None = None,
+    date_max: datetime | None = None,
+) -> tuple[list[str], dict[str, int]]:
+    """
+    Sélectionne les liens de matchs dont les statistiques peuvent finir dans le dataset.
+
+    Un match est gardé dès qu'un des deux joueurs est dans joueurs.json : même quand
+    l'adversaire n'est pas suivi et qu'il ne donne pas de ligne d'entraînement, ses
+    statistiques entrent dans les moyennes et la forme du joueur suivi (voir
+    `filter_previous_matches`). On écarte les matchs entre deux joueurs non suivis,
+    ceux hors de la fenêtre de dates et ceux déjà récupérés.
+    Les fichiers sont lus élément par élément (voir `iter_json_items`).
+
+    Args:
+        detail_joueurs_file (str): Le chemin vers le fichier JSON contenant les détails des joueurs.
+        joueurs_file (str): Le chemin vers le fichier JSON contenant les données des joueurs.
+        stored_links (set[str] | None): Liens dont les statistiques sont déjà enregistrées.
+        date_min (datetime | None): Date du plus ancien match à garder (incluse).
+        date_max (datetime | None): Date du plus récent match à garder (incluse).
+
+    Returns:
+        tuple[list[str], dict[str, int]]: Les liens à récupérer, dans l'ordre du fichier, et le
+        nombre de liens distincts par motif : "total", "joueur_non_suivi", "hors_fenetre",
+        "deja_stocke" et "a_recuperer".
+    """
+    stored_links = stored_links or set()
+    tracked = {joueur["nom_joueur"] for _, joueur in iter_json_items(joueurs_file)}
+
+    # Un lien vu chez les deux joueurs garde le motif le plus favorable
+    priorities = ["joueur_non_suivi", "hors_fenetre", "deja_stocke", "a_recuperer"]
+    reasons: dict[str, str] = {}
+    for player_name, joueur in iter_json_items(detail_joueurs_file):
+        for match in joueur["matchs"]:
+            lien = match.get("lien_detail_match", "NA")
+            if lien == "NA":
+                continue
+
+            opponent = match["nom_opposant"]
+            match_date = datetime.strptime(match["date"], "%d.%m.%y") if "date" in match else None
+            if player_name not in tracked and opponent not in tracked:
+                reason = "joueur_non_suivi"
+            elif match_date is None or (
+                (date_min is not None and match_date < date_min)
+                or (date_max is not None and match_date > date_max)
+            ):
+                reason = "hors_fenetre"
+            elif lien in stored_links:
+                reason = "deja_stocke"
+            else:
+                reason = "a_recuperer"
+
+            if lien not in reasons or priorities.index(reason) > priorities.index(reasons[lien]):
+                reasons[lien] = reason
+
+    report = {"total": len(reasons), **dict.fromkeys(priorities, 0)}
+    for reason in reasons.values():
+        report[reason] += 1
+
+    links = [lien for lien, reason in reasons.items() if reason == "a_recuperer"]
+    logger.info(
+        f"{report['a_recuperer']} matchs à récupérer sur {report['total']} : "
+        f"{report['total'] - report['a_recuperer']} requêtes évitées "
+        f"({report['joueur_non_suivi']} joueurs non suivis, {report['hors_fenetre']} hors fenêtre, "
+        f"{report['deja_stocke']} déjà stockés)."
+    )
+    return links, report
 
 
 def load_data(joueurs_file: str, detail_joueurs_file: str, stats_match_file: str):
     """
     Charge les données depuis les fichiers JSON avec gestion explicite de l'encodage.
 
+    Les fichiers sont lus élément par élément (voir `iter_json_items`) : le texte
+    complet des fichiers n'est jamais chargé en mémoire, et les valeurs vides des
+    statistiques sont remplacées par 'NA' à la lecture.
+
     Args:
         joueurs_file (str): Le chemin vers le fichier JSON contenant les données des joueurs.
         detail_joueurs_file (str): Le chemin vers le fichier JSON contenant les détails des joueurs.
@@ -477,40 +607,297 @@ def load_data(joueurs_file: str, detail_joueurs_file: str, stats_match_file: str
 
     Returns:
         tuple: Un tuple contenant les trois jeux de données chargés à partir des fichiers :
-               - `joueurs_data` (dict) : Données des joueurs.
+               - `joueurs_data` (list) : Données des joueurs.
                - `detail_joueurs` (dict) : Détails des joueurs.
                - `stats_matches` (dict) : Statistiques des matchs.
     """
     logger.info("Chargement des données.")
 
-    with open(joueurs_file, "r", encoding="utf-8") as f:
-        joueurs_data = json.load(f)
-    with open(detail_joueurs_file, "r", encoding="utf-8") as f:
-        detail_joueurs = json.load(f)
-    with open(stats_match_file, "r", encoding="utf-8") as f:
-        stats_matches = json.load(f)
+    joueurs_data = [joueur for _, joueur in iter_json_items(joueurs_file)]
+    detail_joueurs = dict(iter_json_items(detail_joueurs_file))
+    stats_matches = dict(iter_stats_matches(stats_match_file))
 
     logger.info("Données chargées avec succès.")
     return joueurs_data, detail_joueurs, stats_matches
 
 
+def build_match_stream(detail_joueurs: dict) -> pl.DataFrame:
+    """
+    Construit la liste normalisée des matchs : un match par lien, trié par date.
 
-def create_training_dataset(
-    joueurs_data: list, detail_joueurs: dict, stats_matches: dict
-) -> pl.DataFrame:
+    Args:
+        detail_joueurs (dict): Dictionnaire contenant les détails des joueurs et leurs matchs.
+
+    Returns:
+        pl.DataFrame: Matchs avec les colonnes "lien_detail_match", "date" (pl.Date),
+        "winner", "loser", "surface", "tournoi" et "score".
     """
-    Crée un dataset d'entraînement à partir des données avec suivi de progression.
+    rows = [
+        {
+            "lien_detail_match": match["lien_detail_match"],
+            "date": match["date"],
+            "winner": player_name if match["resultat"] == "victoire" else match["nom_opposant"],
+            "loser": match["nom_opposant"] if match["resultat"] == "victoire" else player_name,
+            "surface": match["type_terrain"],
+            "tournoi": match["tournoi"],
+            "score": match["score"],
+        }
+        for player_name, player_details in detail_joueurs.items()
+        for match in player_details["matchs"]
+        if "date" in match and match.get("lien_detail_match", "NA") != "NA"
+    ]
+    schema = {
+        "lien_detail_match": pl.String,
+        "date": pl.String,
+        "winner": pl.String,
+        "loser": pl.String,
+        "surface": pl.String,
+        "tournoi": pl.String,
+        "score": pl.String,
+    }
+
+    return (
+        pl.DataFrame(rows, schema=schema)
+        .unique(subset="lien_detail_match", keep="first", maintain_order=True)
+        .with_columns(pl.col("date").str.strptime(pl.Date, format="%d.%m.%y"))
+        .sort("date", "lien_detail_match")
+    )
+
+
+def build_ratings_lookup(match_stream: pl.DataFrame, ratings: EloRatings) -> dict:
+    """
+    Fait passer les matchs dans le moteur Elo et indexe les classements d'avant-match.
+
+    Seuls les matchs inconnus du moteur sont appliqués : ceux d'un état rechargé
+    (voir `load_incremental_state`) reprennent les classements gardés dans son historique.
+
+    Args:
+        match_stream (pl.DataFrame): Matchs triés par date (voir `build_match_stream`).
+        ratings (EloRatings): Moteur Elo, mis à jour sur place.
+
+    Returns:
+        dict: Classements d'avant-match (voir `EloRatings.update`) indexés par lien du match.
+    """
+    ratings.update_from_stream(match_stream)
+    pre_match = {lien: ratings.pre_match(lien) for lien in match_stream["lien_detail_match"]}
+    return {lien: values for lien, values in pre_match.items() if values is not None}
+
+
+def load_incremental_state(
+    match_stream: pl.DataFrame, ratings_file: str, form_file: str
+) -> tuple[EloRatings, RollingForm]:
+    """
+    Recharge les classements Elo et la forme sauvegardés pour n'appliquer que les nouveaux matchs.
+
+    On repart d'un état vide si un fichier manque, s'il ne garde pas l'historique
+    d'avant-match, ou si un nouveau match est antérieur au dernier match déjà pris en compte
+    (les états ne s'appliquent que dans l'ordre chronologique).
+
+    Args:
+        match_stream (pl.DataFrame): Matchs triés par date (voir `build_match_stream`).
+        ratings_file (str): Classements Elo sauvegardés (voir `EloRatings.save`).
+        form_file (str): Forme sauvegardée (voir `RollingForm.save`).
+
+    Returns:
+        tuple[EloRatings, RollingForm]: Moteur Elo et accumulateurs de forme.
+    """
+    if not (os.path.exists(ratings_file) and os.path.exists(form_file)):
+        logger.info("Aucun état sauvegardé : calcul des classements Elo et de la forme depuis le début.")
+        return EloRatings(), RollingForm()
+
+    ratings, form = EloRatings.load(ratings_file), RollingForm.load(form_file)
+    if set(ratings.history) != ratings.seen_matches or set(form.history) != form.seen_matches:
+        logger.warning("État sauvegardé sans historique d'avant-match : calcul depuis le début.")
+        return EloRatings(), RollingForm()
+
+    known = pl.col("lien_detail_match").is_in(list(ratings.seen_matches & form.seen_matches))
+    last_known = match_stream.filter(known)["date"].max()
+    first_new = match_stream.filter(~known)["date"].min()
+    if last_known is not None and first_new is not None and first_new < last_known:
+        logger.warning(
+            f"Nouveau match du {first_new} antérieur au dernier match pris en compte "
+            f"({last_known}) : calcul depuis le début."
+        )
+        return EloRatings(), RollingForm()
+
+    logger.info(f"État rechargé : {len(ratings.seen_matches)} matchs déjà pris en compte.")
+    return ratings, form
+
+
+def parse_rankings(joueurs_data: list) -> dict[str, int]:
+    """
+    Extrait le classement ATP de chaque joueur.
+
+    Args:
+        joueurs_data (list): Liste des données des joueurs (rank au format "12.").
+
+    Returns:
+        dict[str, int]: Classement indexé par nom du joueur.
+    """
+    return {
+        joueur["nom_joueur"]: int(joueur["rank"].replace(".", ""))
+        for joueur in joueurs_data
+    }
+
+
+def build_head_to_head_lookup(
+    match_stream: pl.DataFrame, rankings: dict[str, int], rankings_asof: dict | None = None
+) -> dict:
+    """
+    Calcule en une passe vectorisée les features de confrontation des deux joueurs de chaque match.
+
+    Args:
+        match_stream (pl.DataFrame): Matchs triés par date (voir `build_match_stream`).
+        rankings (dict[str, int]): Classement ATP actuel de chaque joueur.
+        rankings_asof (dict | None): Classements à la date de chaque match (voir
+            `build_rankings_asof_lookup`), utilisés pour `avg_opponent_ranking` ; le
+            classement actuel ne sert que pour les joueurs sans snapshot.
+
+    Returns:
+        dict: Pour chaque lien de match, les features (voir `HeadToHead.features`)
+        du vainqueur ("winner") et du perdant ("loser") avant le match.
+    """
+    if rankings_asof:
+
+        def ranking_asof(lien: str, side: str) -> int | None:
+            snapshot = rankings_asof.get(lien, {}).get(side)
+            return snapshot["ranking"] if snapshot is not None else None
+
+        match_stream = match_stream.with_columns(
+            pl.Series(
+                f"{side}_ranking",
+                [ranking_asof(lien, side) for lien in match_stream["lien_detail_match"]],
+                dtype=pl.Float64,
+            )
+            for side in ("winner", "loser")
+        )
+    head_to_head = HeadToHead(match_stream, rankings)
+    winners, losers = match_stream["winner"].to_list(), match_stream["loser"].to_list()
+    dates = match_stream["date"].to_list()
+
+    features = head_to_head.features(winners + losers, losers + winners, dates + dates)
+    winner_rows = features.head(len(winners)).iter_rows(named=True)
+    loser_rows = features.tail(len(losers)).iter_rows(named=True)
+
+    return {
+        lien: {"winner": winner, "loser": loser}
+        for lien, winner, loser in zip(
+            match_stream["lien_detail_match"], winner_rows, loser_rows
+        )
+    }
+
+
+def build_rankings_asof_lookup(
+    match_stream: pl.DataFrame, ranking_snapshots: pl.LazyFrame
+) -> dict:
+    """
+    Retrouve, par une jointure as-of, le classement des deux joueurs de chaque match
+    dans le snapshot en vigueur à la date du match.
+
+    Args:
+        match_stream (pl.DataFrame): Matchs triés par date (voir `build_match_stream`).
+        ranking_snapshots (pl.LazyFrame): Snapshots du classement (voir `scan_ranking_snapshots`).
+
+    Returns:
+        dict: Pour chaque lien de match, "ranking", "points" et "age" du vainqueur ("winner")
+        et du perdant ("loser"), ou None pour un joueur sans snapshot à cette date.
+    """
+    sides = pl.concat(
+        [
+            match_stream.select("lien_detail_match", pl.col(side).alias("player"), "date")
+            for side in ("winner", "loser")
+        ]
+    )
+    joined = join_rankings_asof(sides, ranking_snapshots)
+    values = [
+        dict(zip(RANKING_COLUMNS, row)) if row[0] is not None else None
+        for row in joined.select(RANKING_COLUMNS).iter_rows()
+    ]
+
+    nb_missing = sum(value is None for value in values)
+    if nb_missing:
+        logger.warning(
+            f"{nb_missing} joueurs sans classement à la date du match : classement actuel utilisé."
+        )
+
+    n = match_stream.height
+    return {
+        lien: {"winner": winner, "loser": loser}
+        for lien, winner, loser in zip(
+            match_stream["lien_detail_match"], values[:n], values[n:]
+        )
+    }
+
+
+def rating_features(pre_match: dict | None, won: bool, ratings: EloRatings) -> dict:
+    """
+    Extrait les features Elo d'un joueur à partir des classements d'avant-match.
+
+    Args:
+        pre_match (dict | None): Classements d'avant-match (voir `EloRatings.update`).
+        won (bool): Le joueur a gagné le match.
+        ratings (EloRatings): Moteur Elo, pour le classement initial si le match est inconnu.
+
+    Returns:
+        dict: Features "elo" et "elo_surface".
+    """
+    if pre_match is None:
+        return {"elo": ratings.initial_rating, "elo_surface": ratings.initial_rating}
+    side = "winner" if won else "loser"
+    return {"elo": pre_match[f"{side}_elo"], "elo_surface": pre_match[f"{side}_elo_surface"]}
+
+
+def iter_training_rows(
+    joueurs_data: list,
+    detail_joueurs: dict,
+    stats_matches: dict,
+    ratings: EloRatings | None = None,
+    form: RollingForm | None = None,
+    ranking_snapshots: pl.LazyFrame | None = None,
+) -> Iterator[dict]:
+    """
+    Génère une à une les lignes du dataset d'entraînement, sans les accumuler en mémoire.
 
     Args:
         joueurs_data (list): Liste des données des joueurs.
         detail_joueurs (dict): Dictionnaire contenant les détails des joueurs et leurs matchs.
         stats_matches (dict): Dictionnaire contenant les statistiques des matchs.
-
-    Returns:
-        pl.DataFrame: DataFrame contenant les features des matchs avec la cible (1 ou 0 pour la victoire/perte).
+        ratings (EloRatings | None): Moteur Elo vide ou rechargé (voir `load_incremental_state`),
+            mis à jour sur place avec les nouveaux matchs (pour être sauvegardé ensuite).
+            Un moteur temporaire est utilisé si absent.
+        form (RollingForm | None): Accumulateurs de forme, mis à jour sur place de la
+            même façon. Des accumulateurs temporaires sont utilisés si absents.
+        ranking_snapshots (pl.LazyFrame | None): Snapshots datés du classement (voir
+            `scan_ranking_snapshots`). Si présents, le classement, les points et l'âge de chaque
+            joueur sont ceux en vigueur à la date du match plutôt que ceux de `joueurs_data`.
+
+    Yields:
+        dict: Features d'un match avec la cible (1 ou 0 pour la victoire/perte) et la date.
     """
-    logger.info("Début de la création du dataset d'entraînement.")
-    dataset = []
+    win_rates_lookup = build_win_rates_lookup(detail_joueurs)
+    match_stream = build_match_stream(detail_joueurs)
+    if ratings is None:
+        ratings = EloRatings()
+    ratings_lookup = build_ratings_lookup(match_stream, ratings)
+    rankings_lookup = (
+        build_rankings_asof_lookup(match_stream, ranking_snapshots)
+        if ranking_snapshots is not None
+        else {}
+    )
+    head_to_head_lookup = build_head_to_head_lookup(
+        match_stream, parse_rankings(joueurs_data), rankings_lookup
+    )
+    if form is None:
+        form = RollingForm()
+    form.update_from_stream(match_stream, stats_matches)
+    form_lookup = {lien: form.pre_match(lien) for lien in match_stream["lien_detail_match"]}
+    form_lookup = {lien: values for lien, values in form_lookup.items() if values is not None}
+    no_form = dict.fromkeys(form_keys(form.window), 0.0)
+    tournament_categories = dict(
+        add_tournament_metadata(match_stream, build_tournament_table(match_stream))
+        .select("lien_detail_match", "tournament_category")
+        .iter_rows()
+    )
 
     for player_name, player_details in tqdm(
         detail_joueurs.items(), desc="Traitement des joueurs", unit="joueur"
@@ -539,13 +926,13 @@ def create_training_dataset(
                 logger.warning(f"Adversaire non trouvé : {opponent_name}")
                 continue
 
-            opponent_details = next(
+            opponent_key, opponent_details = next(
                 (
-                    details
+                    (name, details)
                     for name, details in detail_joueurs.items()
                     if details["profil"]["nom"] == opponent_name
                 ),
-                None,
+                (None, None),
             )
             if not opponent_details:
                 logger.warning(f"Détails manquants pour l'adversaire : {opponent_name}")
@@ -553,17 +940,50 @@ def create_training_dataset(
 
             try:
                 player_features = create_player_features(
-                    player_base, player_details["matchs"], stats_matches, match
+                    player_base,
+                    player_details["matchs"],
+                    stats_matches,
+                    match,
+                    win_rates_lookup.get((player_name, match["date"])),
                 )
 
                 opponent_features = create_player_features(
-                    opponent_base, opponent_details["matchs"], stats_matches, match
+                    opponent_base,
+                    opponent_details["matchs"],
+                    stats_matches,
+                    match,
+                    win_rates_lookup.get((opponent_key, match["date"])),
+                )
+
+                pre_match = ratings_lookup.get(match["lien_detail_match"])
+                won = match["resultat"] == "victoire"
+                player_features.update(rating_features(pre_match, won, ratings))
+                opponent_features.update(rating_features(pre_match, not won, ratings))
+
+                no_history = dict.fromkeys(HEAD_TO_HEAD_KEYS, 0)
+                head_to_head = head_to_head_lookup.get(
+                    match["lien_detail_match"], {"winner": no_history, "loser": no_history}
+                )
+                player_features.update(head_to_head["winner" if won else "loser"])
+                opponent_features.update(head_to_head["loser" if won else "winner"])
+
+                recent_form = form_lookup.get(
+                    match["lien_detail_match"], {"winner": no_form, "loser": no_form}
                 )
+                player_features.update(recent_form["winner" if won else "loser"])
+                opponent_features.update(recent_form["loser" if won else "winner"])
+
+                rankings = rankings_lookup.get(match["lien_detail_match"], {})
+                player_features.update(rankings.get("winner" if won else "loser") or {})
+                opponent_features.update(rankings.get("loser" if won else "winner") or {})
 
                 match_info = {
                     "type_terrain": match["type_terrain"],
                     "tournoi": match["tournoi"],
                     "lien_detail_match": match["lien_detail_match"],
+                    "tournament_category": tournament_categories.get(
+                        match["lien_detail_match"]
+                    ),
                 }
 
                 features = prepare_match_data(
@@ -571,7 +991,6 @@ def create_training_dataset(
                 )
                 features["target"] = 1 if match["resultat"] == "victoire" else 0
                 features["date"] = match["date"]
-                dataset.append(features)
 
             except Exception as e:
                 logger.error(
@@ -579,12 +998,258 @@ def create_training_dataset(
                 )
                 continue
 
+            yield features
+
+
+def create_training_dataset(
+    joueurs_data: list, detail_joueurs: dict, stats_matches: dict
+) -> pl.DataFrame:
+    """
+    Crée un dataset d'entraînement à partir des données avec suivi de progression.
+
+    Toutes les lignes sont gardées en mémoire : pour les gros volumes,
+    utiliser `write_training_dataset`.
+
+    Args:
+        joueurs_data (list): Liste des données des joueurs.
+        detail_joueurs (dict): Dictionnaire contenant les détails des joueurs et leurs matchs.
+        stats_matches (dict): Dictionnaire contenant les statistiques des matchs.
+
+    Returns:
+        pl.DataFrame: DataFrame contenant les features des matchs avec la cible (1 ou 0 pour la victoire/perte).
+    """
+    logger.info("Début de la création du dataset d'entraînement.")
+    dataset = list(iter_training_rows(joueurs_data, detail_joueurs, stats_matches))
     logger.info("Création du dataset terminée.")
 
     df = pl.DataFrame(dataset)
     return df
 
 
+def raw_dataset_schema(window: int = WINDOW) -> pa.Schema:
+    """
+    Construit le schéma Arrow explicite du dataset brut (tennis_dataset_raw.parquet).
+
+    Args:
+        window (int): Fenêtre des features de forme (voir `RollingForm`).
+
+    Returns:
+        pa.Schema: Schéma avec les features des deux joueurs, puis celles du match.
+    """
+    player_fields = [
+        ("name", pa.string()),
+        ("age", pa.int64()),
+        ("ranking", pa.int64()),
+        ("points", pa.int64()),
+        ("win_rate", pa.float64()),
+        ("win_rate_3_sets", pa.float64()),
+        ("win_rate_tiebreak", pa.float64()),
+    ]
+    for surface in SURFACES:
+        player_fields.append((f"total_matches_{surface}", pa.int64()))
+        player_fields.append((f"win_rate_{surface}", pa.float64()))
+    player_fields += [
+        (key, pa.float64()) for key in PERFORMANCE_STATS_KEYS
+    ]
+    player_fields += [("elo", pa.float64()), ("elo_surface", pa.float64())]
+    player_fields += [
+        ("h2h_wins", pa.int64()),
+        ("h2h_losses", pa.int64()),
+        ("avg_opponent_ranking", pa.float64()),
+        ("strength_of_schedule", pa.float64()),
+    ]
+    player_fields += [(key, pa.float64()) for key in form_keys(window)]
+
+    fields = [
+        pa.field(f"{player}_{key}", dtype)
+        for player in ("player1", "player2")
+        for key, dtype in player_fields
+    ]
+    fields += [
+        pa.field("surface", pa.string()),
+        pa.field("tournament_category", pa.int64()),
+        pa.field("url_match", pa.string()),
+        pa.field("target", pa.int64()),
+        pa.field("date", pa.string()),
+    ]
+    return pa.schema(fields)
+
+
+def write_training_dataset(
+    joueurs_data: list,
+    detail_joueurs: dict,
+    stats_matches: dict,
+    output_file: str,
+    batch_size: int = RAW_DATASET_BATCH_SIZE,
+    ratings: EloRatings | None = None,
+    form: RollingForm | None = None,
+    ranking_snapshots: pl.LazyFrame | None = None,
+) -> int:
+    """
+    Écrit le dataset d'entraînement en Parquet au fil de l'eau.
+
+    Les lignes sont regroupées en record batches Arrow de `batch_size` lignes,
+    chacun écrit comme un row group : la mémoire utilisée ne dépend que de
+    `batch_size`, pas de la taille du dataset.
+
+    Args:
+        joueurs_data (list): Liste des données des joueurs.
+        detail_joueurs (dict): Dictionnaire contenant les détails des joueurs et leurs matchs.
+        stats_matches (dict): Dictionnaire contenant les statistiques des matchs.
+        output_file (str): Chemin du fichier Parquet de sortie.
+        batch_size (int): Nombre de lignes par row group.
+        ratings (EloRatings | None): Moteur Elo à mettre à jour (voir `iter_training_rows`).
+        form (RollingForm | None): Accumulateurs de forme à mettre à jour (voir `iter_training_rows`),
+            dont la fenêtre fixe les colonnes de forme du schéma.
+        ranking_snapshots (pl.LazyFrame | None): Snapshots datés du classement (voir `iter_training_rows`).
+
+    Returns:
+        int: Nombre de lignes écrites.
+    """
+    logger.info("Début de l'écriture du dataset d'entraînement.")
+    if form is None:
+        form = RollingForm()
+    schema = raw_dataset_schema(form.window)
+    nb_rows = 0
+
+    with pq.ParquetWriter(output_file, schema) as writer:
+        for rows in batched(
+            iter_training_rows(
+                joueurs_data, detail_joueurs, stats_matches, ratings, form, ranking_snapshots
+            ),
+            batch_size,
+        ):
+            # `from_pylist` ignore les colonnes absentes du schéma au lieu d'échouer
+            unknown = set(rows[0]).difference(schema.names)
+            if unknown:
+                raise ValueError(f"Colonnes absentes du schéma du dataset brut : {sorted(unknown)}")
+            record_batch = pa.RecordBatch.from_pylist(list(rows), schema=schema)
+            writer.write_batch(record_batch, row_group_size=batch_size)
+            nb_rows += record_batch.num_rows
+
+    logger.info(f"Dataset écrit dans {output_file} : {nb_rows} lignes.")
+    return nb_rows
+
+
+def build_clean_dataset(raw: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Construit, sous forme de requête lazy, le dataset pour le ml à partir du dataset brut.
+
+    Les matchs présents d'un seul côté sont symétrisés, la surface est encodée
+    en indicatrices et les features de différences entre joueurs sont ajoutées.
+
+    Args:
+        raw (pl.LazyFrame): Dataset brut (voir `write_training_dataset`).
+
+    Returns:
+        pl.LazyFrame: Requête du dataset nettoyé, exécutable en streaming.
+    """
+    single_sided_urls = (
+        raw.group_by("url_match").len().filter(pl.col("len") == 1).select("url_match")
+    )
+    inverted = invert_matches(raw.join(single_sided_urls, on="url_match", how="semi"))
+
+    return add_match_features(pl.concat([raw, inverted]))
+
+
+def add_match_features(matches: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Encode la surface en indicatrices et ajoute les features de différences entre joueurs
+    (celles de `DIFF_FEATURES` dont les colonnes sont présentes).
+
+    Args:
+        matches (pl.LazyFrame): Matchs au format du dataset brut.
+
+    Returns:
+        pl.LazyFrame: Matchs au format du dataset clean.
+    """
+    columns = matches.collect_schema().names()
+    return (
+        matches.with_columns(
+            (pl.col("surface") == surface).cast(pl.Int8).alias(name)
+            for name, surface in SURFACE_DUMMIES.items()
+        )
+        .drop("url_match", "surface")
+        .drop_nulls()
+        .with_columns(
+            (pl.col(f"player1_{feature}") - pl.col(f"player2_{feature}")).alias(name)
+            for name, feature in DIFF_FEATURES.items()
+            if f"player1_{feature}" in columns
+        )
+    )
+
+
+def build_prediction_features(
+    player1: dict, player2: dict, tournament_category: int, surface: str
+) -> pl.DataFrame:
+    """
+    Construit l'entrée du modèle pour un match à venir, dans l'ordre des colonnes d'entraînement.
+
+    Args:
+        player1 (dict): Features du premier joueur, sans préfixe (ex. "ranking", "elo").
+        player2 (dict): Features du second joueur, avec les mêmes clés que `player1`.
+        tournament_category (int): Catégorie du tournoi (voir `get_tournament_category`).
+        surface (str): Surface du match (ex. "dure", "terre battue").
+
+    Returns:
+        pl.DataFrame: Une ligne avec les features du modèle.
+    """
+    row = {f"player1_{key}": value for key, value in player1.items()}
+    row.update({f"player2_{key}": value for key, value in player2.items()})
+    row.update(
+        {
+            "surface": surface,
+            "tournament_category": tournament_category,
+            "url_match": "",
+            "target": 0,
+            "date": "",
+        }
+    )
+    return add_match_features(pl.LazyFrame([row])).drop(NON_FEATURE_COLUMNS).collect()
+
+
+def build_app_dataset(clean: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Construit, sous forme de requête lazy, le dataset de l'application : les features
+    de chaque joueur lors de son dernier match.
+
+    Les colonnes player1_* et player2_* sont empilées en une vue longue (une ligne par
+    joueur et par match, colonnes nommées player1_*) puis la ligne la plus récente
+    de chaque joueur est conservée.
+
+    Args:
+        clean (pl.LazyFrame): Dataset clean, avec une colonne "date" au format 'DD.MM.YY'.
+
+    Returns:
+        pl.LazyFrame: Une ligne par joueur, avec ses colonnes player1_*.
+    """
+    columns = clean.collect_schema().names()
+    player1_columns = [col for col in columns if col.startswith("player1_")]
+
+    clean = clean.with_columns(
+        pl.col("date").str.strptime(pl.Date, format="%d.%m.%y")
+    )
+    long_view = pl.concat(
+        [
+            clean.select(*player1_columns, "date"),
+            clean.select(
+                *(
+                    pl.col(col.replace("player1_", "player2_", 1)).alias(col)
+                    for col in player1_columns
+                ),
+                "date",
+            ),
+        ]
+    )
+
+    return (
+        long_view.filter(pl.col("date") == pl.col("date").max().over("player1_name"))
+        .group_by("player1_name", maintain_order=True)
+        .first()
+        .drop("date")
+    )
+
+
 def select_percentage(df) -> float:
     """
     Cette fonction calcule le nombre de ligne à selctionner pour rééquilibrer le dataframe
@@ -612,68 +1277,95 @@ def select_percentage(df) -> float:
     return percentage
 
 
-def modify_players(df) -> pl.DataFrame:
+def swap_players_expressions(
+    columns: list[str], condition: pl.Expr | None = None
+) -> list[pl.Expr]:
     """
-    Cette fonction modifie aléatoirement un pourcentage de lignes du DataFrame où target == 1.
-    Les colonnes des joueurs 1 et 2 sont inversées sur ces lignes sélectionnées.
+    Construit les expressions qui échangent les colonnes des joueurs 1 et 2.
 
-    Parameters:
-    - df : DataFrame Polars d'entrée
-    - percentage : pourcentage de lignes à sélectionner et modifier (0-1)
+    Args:
+        columns (list[str]): Colonnes du DataFrame, dans l'ordre à conserver.
+        condition (pl.Expr | None): Si fournie, l'échange n'est fait que sur les lignes
+            où la condition est vraie.
 
     Returns:
-    - df_final : DataFrame modifié avec les lignes sélectionnées et inversées ajoutées
+        list[pl.Expr]: Une expression par colonne, nommée comme la colonne d'origine.
     """
+    expressions = []
+    for col in columns:
+        if col.startswith("player1_"):
+            other = col.replace("player1_", "player2_", 1)
+        elif col.startswith("player2_"):
+            other = col.replace("player2_", "player1_", 1)
+        else:
+            expressions.append(pl.col(col))
+            continue
 
-    # Étape 0 : Ajouter l'index des lignes
-    df_with_index = df.with_row_index()
+        if condition is None:
+            expressions.append(pl.col(other).alias(col))
+        else:
+            expressions.append(
+                pl.when(condition).then(pl.col(other)).otherwise(pl.col(col)).alias(col)
+            )
+    return expressions
 
-    # Étape 1 : Sélectionner un pourcentage de lignes avec target == 1
-    df_target_1 = df_with_index.filter(pl.col("target") == 1)
 
-    # Récupération des indices
-    index = df_target_1.select(pl.col("index")).to_numpy().flatten().tolist()
+def invert_matches(df: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Inverse les matchs en échangeant les données des deux joueurs et en inversant la cible.
 
-    # Calculer le nombre de lignes à sélectionner
-    row_selected_pct = select_percentage(df)
-    num_to_select = int(len(index) * row_selected_pct)
+    Args:
+        df (pl.LazyFrame): Matchs avec les colonnes des deux joueurs et la cible.
 
-    # Sélectionner aléatoirement les indices
-    selected_indices = random.sample(index, num_to_select)
+    Returns:
+        pl.LazyFrame: Matchs inversés, avec les mêmes colonnes et les mêmes types que `df`.
+    """
+    columns = df.collect_schema().names()
+    return df.select(swap_players_expressions(columns)).with_columns(
+        (1 - pl.col("target")).cast(df.collect_schema()["target"]).alias("target")
+    )
 
-    # Étape 2 : Sélectionner les lignes avec les indices collectés
-    df_selected = df_with_index.filter(pl.col("index").is_in(selected_indices))
 
-    # Étape 3 : Inverser les données des joueurs 1 et 2 sur la sélection dans le nouveau dataframe
-    columns_to_swap = [
-        col for col in df_selected.columns if "player1" in col or "player2" in col
-    ]
+def modify_players(df, seed: int | None = None) -> pl.DataFrame:
+    """
+    Cette fonction modifie aléatoirement un pourcentage de lignes du DataFrame où target == 1.
+    Les colonnes des joueurs 1 et 2 sont inversées sur ces lignes sélectionnées.
 
-    swap_expressions = []
-    for col in columns_to_swap:
-        if "player1" in col:
-            swap_expressions.append(
-                pl.col(col).alias(col.replace("player1", "player2"))
-            )
-        elif "player2" in col:
-            swap_expressions.append(
-                pl.col(col).alias(col.replace("player2", "player1"))
-            )
+    Parameters:
+    - df : DataFrame Polars d'entrée
+    - seed : graine du tirage aléatoire des lignes
 
-    # Appliquer les modifications sur le DataFrame sélectionné
-    df_selected_swapped = df_selected.with_columns(swap_expressions)
+    Returns:
+    - df_final : DataFrame modifié avec les lignes sélectionnées inversées
+    """
+    # Calculer le nombre de lignes à sélectionner
+    row_selected_pct = select_percentage(df)
+    num_to_select = int(df.filter(pl.col("target") == 1).height * row_selected_pct)
 
-    df_selected_swapped = df_selected_swapped.with_columns(
-        pl.lit(0).cast(pl.Int64).alias("target")
+    # Tirage aléatoire : rang de chaque ligne target == 1 dans une permutation
+    random_rank = (
+        pl.int_range(pl.len()).shuffle(seed=seed).over(pl.col("target") == 1)
+    )
+    selected = (pl.col("target") == 1) & (random_rank < num_to_select)
+
+    return (
+        df.with_row_index()
+        .with_columns(selected.alias("_selected"))
+        .select(
+            *swap_players_expressions(
+                ["index", *df.columns], condition=pl.col("_selected")
+            ),
+            pl.col("_selected"),
+        )
+        .with_columns(
+            pl.when(pl.col("_selected"))
+            .then(pl.lit(0))
+            .otherwise(pl.col("target"))
+            .cast(pl.Int64)
+            .alias("target")
+        )
+        .drop("_selected")
     )
-
-    # Étape 4 : Supprimer les lignes avec les indices récupérés dans le df initial
-    df_without_selected = df_with_index.filter(~pl.col("index").is_in(selected_indices))
-
-    # Ajouter les lignes modifiées du DataFrame sélectionné à celui d'origine
-    df_final = df_without_selected.vstack(df_selected_swapped)
-
-    return df_final
 
 
 def replace_empty_values_with_na(data):
@@ -694,23 +1386,3 @@ def replace_empty_values_with_na(data):
         return "NA"
     else:
         return data
-
-
-def invert_match(row: dict) -> dict:
-    """
-    Inverse les informations d'un match en échangeant les données des deux joueurs et en inversant la cible.
-
-    Args:
-        row (dict): Une ligne représentant un match, incluant les caractéristiques des deux joueurs et la cible.
-
-    Returns:
-        dict: Une nouvelle ligne avec les données des joueurs inversées et la cible modifiée.
-    """
-    inverted_row = row.copy()
-    for col in row.keys():
-        if col.startswith("player1_"):
-            inverted_row[col.replace("player1_", "player2_")] = row[col]
-        elif col.startswith("player2_"):
-            inverted_row[col.replace("player2_", "player1_")] = row[col]
-    inverted_row["target"] = 1 - row["target"]
-    return inverted_row
@@ -0,0 +1,180 @@
+"""Module pour historiser le classement ATP en snapshots datés et retrouver,
+pour chaque match, le classement en vigueur à sa date
+"""
+
+import logging
+import os
+from datetime import date
+import polars as pl
+
+logger = logging.getLogger(__name__)
+
+RANKINGS_DIR = "data/classements"
+RANKING_COLUMNS = ["ranking", "points", "age"]
+
+_SNAPSHOT_SCHEMA = {
+    "nom_joueur": pl.String,
+    "ranking": pl.Int32,
+    "points": pl.Int32,
+    "age": pl.Int16,
+}
+
+
+def parse_ranking_snapshot(joueurs: list) -> pl.DataFrame:
+    """
+    Convertit les joueurs du crawler de classement (joueurs.json) en table typée.
+
+    Args:
+        joueurs (list): Joueurs avec les clés "nom_joueur", "rank" ("12."),
+            "points" et "age" ("25 ans").
+
+    Returns:
+        pl.DataFrame: Une ligne par joueur avec les colonnes "nom_joueur", "ranking",
+        "points" et "age" (nulles si illisibles).
+    """
+    raw = pl.DataFrame(
+        [
+            {key: str(joueur.get(key, "NA")) for key in ("nom_joueur", "rank", "points", "age")}
+            for joueur in joueurs
+        ],
+        schema={key: pl.String for key in ("nom_joueur", "rank", "points", "age")},
+    )
+
+    def number(column: str) -> pl.Expr:
+        return pl.col(column).str.replace_all(".", "", literal=True).str.extract(r"(\d+)")
+
+    return raw.select(
+        "nom_joueur",
+        number("rank").cast(pl.Int32, strict=False).alias("ranking"),
+        number("points").cast(pl.Int32, strict=False).alias("points"),
+        pl.col("age").str.extract(r"(\d+)").cast(pl.Int16, strict=False).alias("age"),
+    ).unique(subset="nom_joueur", keep="first", maintain_order=True)
+
+
+def scan_ranking_snapshots(root: str = RANKINGS_DIR) -> pl.LazyFrame:
+    """
+    Lit les partitions de classement, une par date de snapshot.
+
+    Chaque partition ne contient que les changements par rapport à la précédente
+    (voir `write_ranking_snapshot`).
+
+    Args:
+        root (str): Dossier des partitions "snapshot_date=YYYY-MM-DD".
+
+    Returns:
+        pl.LazyFrame: Changements avec les colonnes "snapshot_date" (pl.Date),
+        "nom_joueur", "ranking", "points" et "age" (nulles si le joueur a quitté le classement).
+    """
+    schema = {"snapshot_date": pl.Date, **_SNAPSHOT_SCHEMA}
+    if not os.path.isdir(root) or not os.listdir(root):
+        return pl.LazyFrame(schema=schema)
+
+    return pl.scan_parquet(
+        os.path.join(root, "**", "*.parquet"),
+        hive_partitioning=True,
+        hive_schema={"snapshot_date": pl.Date},
+    ).select(list(schema))
+
+
+def rankings_asof(snapshots: pl.LazyFrame, at: date) -> pl.DataFrame:
+    """
+    Reconstruit le classement complet en vigueur à une date.
+
+    Args:
+        snapshots (pl.LazyFrame): Changements issus de `scan_ranking_snapshots`.
+        at (date): Date de lecture (incluse).
+
+    Returns:
+        pl.DataFrame: Une ligne par joueur classé avec les colonnes "nom_joueur",
+        "ranking", "points" et "age".
+    """
+    return (
+        snapshots.filter(pl.col("snapshot_date") <= at)
+        .sort("snapshot_date")
+        .group_by("nom_joueur")
+        .last()
+        .filter(pl.col("ranking").is_not_null())
+        .select(list(_SNAPSHOT_SCHEMA))
+        .sort("ranking")
+        .collect()
+    )
+
+
+def write_ranking_snapshot(
+    joueurs: list, snapshot_date: date, root: str = RANKINGS_DIR
+) -> int:
+    """
+    Enregistre le classement du jour sous forme de différence avec le snapshot précédent.
+
+    Seuls les joueurs nouveaux ou dont le classement, les points ou l'âge ont changé
+    sont écrits, plus une ligne vide pour chaque joueur sorti du classement. Le classement
+    en vigueur à une date est donc le dernier changement de chaque joueur avant cette date.
+
+    Args:
+        joueurs (list): Joueurs du crawler de classement (voir `parse_ranking_snapshot`).
+        snapshot_date (date): Date du classement.
+        root (str): Dossier des partitions.
+
+    Returns:
+        int: Nombre de lignes écrites.
+    """
+    snapshot = parse_ranking_snapshot(joueurs)
+    previous = rankings_asof(
+        scan_ranking_snapshots(root).filter(pl.col("snapshot_date") < snapshot_date),
+        snapshot_date,
+    )
+
+    changed = snapshot.join(
+        previous, on=list(_SNAPSHOT_SCHEMA), how="anti", join_nulls=True
+    )
+    removed = previous.join(snapshot, on="nom_joueur", how="anti").select(
+        "nom_joueur", *(pl.lit(None).alias(column) for column in RANKING_COLUMNS)
+    )
+    delta = pl.concat([changed, removed]).cast(_SNAPSHOT_SCHEMA)
+
+    partition = os.path.join(root, f"snapshot_date={snapshot_date.isoformat()}")
+    os.makedirs(partition, exist_ok=True)
+    delta.write_parquet(os.path.join(partition, "classement.parquet"))
+
+    logger.info(
+        f"Snapshot du classement du {snapshot_date} : {delta.height} changements "
+        f"sur {snapshot.height} joueurs."
+    )
+    return delta.height
+
+
+def join_rankings_asof(
+    matches: pl.DataFrame, snapshots: pl.LazyFrame, player: str = "player"
+) -> pl.DataFrame:
+    """
+    Associe à chaque (joueur, match) le classement en vigueur à la date du match.
+
+    Args:
+        matches (pl.DataFrame): Matchs avec la colonne `player` et "date" (pl.Date).
+        snapshots (pl.LazyFrame): Changements issus de `scan_ranking_snapshots`.
+        player (str): Colonne contenant le nom du joueur.
+
+    Returns:
+        pl.DataFrame: `matches` (même ordre) avec les colonnes "ranking", "points" et "age",
+        nulles si aucun snapshot n'existait encore à cette date ou si le joueur n'était pas classé.
+    """
+    right = (
+        snapshots.rename({"nom_joueur": player})
+        .with_columns(pl.col(player).cast(pl.String))
+        .sort("snapshot_date")
+    )
+    return (
+        matches.lazy()
+        .with_row_index("_row")
+        .sort("date")
+        .join_asof(
+            right,
+            left_on="date",
+            right_on="snapshot_date",
+            by=player,
+            strategy="backward",
+        )
+        .sort("_row")
+        .drop("_row", "snapshot_date")
+        .collect()
+    )
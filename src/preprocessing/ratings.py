@@ -0,0 +1,235 @@
+"""Module pour calculer des classements Elo par joueur et par surface, match après match
+"""
+
+import logging
+import numpy as np
+import polars as pl
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SURFACES = ("dure", "terre battue", "gazon", "salle", "carpet", "acryl")
+INITIAL_RATING = 1500.0
+# Classements d'avant-match renvoyés par `EloRatings.update` et gardés dans l'historique
+PRE_MATCH_KEYS = ["winner_elo", "loser_elo", "winner_elo_surface", "loser_elo_surface"]
+
+# Facteur K dynamique (plus fort pour les joueurs ayant peu de matchs) : K = 250 / (n + 5) ** 0.4
+K_SCALE = 250.0
+K_OFFSET = 5.0
+K_SHAPE = 0.4
+
+
+class EloRatings:
+    """
+    Classements Elo globaux et par surface, mis à jour en O(1) à chaque match.
+
+    L'état est gardé dans des tableaux numpy indexés par joueur, agrandis au besoin.
+    Les matchs déjà pris en compte (par identifiant) sont ignorés : on peut recharger
+    un état sauvegardé et lui passer uniquement les nouveaux matchs. Les classements
+    d'avant-match de chaque match identifié restent disponibles (`pre_match`), y compris
+    après rechargement, pour reconstruire le dataset sans rejouer l'historique.
+    """
+
+    def __init__(
+        self,
+        surfaces: tuple[str, ...] = DEFAULT_SURFACES,
+        initial_rating: float = INITIAL_RATING,
+        capacity: int = 1024,
+    ):
+        self.surfaces = tuple(surfaces)
+        self.surface_index = {surface: i for i, surface in enumerate(self.surfaces)}
+        self.initial_rating = initial_rating
+        self.players: dict[str, int] = {}
+        self.ratings = np.full(capacity, initial_rating)
+        self.surface_ratings = np.full((capacity, len(self.surfaces)), initial_rating)
+        self.nb_matches = np.zeros(capacity, dtype=np.int32)
+        self.nb_matches_surface = np.zeros((capacity, len(self.surfaces)), dtype=np.int32)
+        self.seen_matches: set[str] = set()
+        self.history: dict[str, tuple[float, ...]] = {}
+
+    def _index(self, player: str) -> int:
+        """Renvoie l'indice du joueur, en l'ajoutant si besoin."""
+        index = self.players.get(player)
+        if index is not None:
+            return index
+
+        index = len(self.players)
+        if index == len(self.ratings):
+            self._grow()
+        self.players[player] = index
+        return index
+
+    def _grow(self) -> None:
+        """Double la capacité des tableaux."""
+        capacity = len(self.ratings)
+        self.ratings = np.concatenate([self.ratings, np.full(capacity, self.initial_rating)])
+        self.surface_ratings = np.vstack(
+            [self.surface_ratings, np.full_like(self.surface_ratings, self.initial_rating)]
+        )
+        self.nb_matches = np.concatenate([self.nb_matches, np.zeros_like(self.nb_matches)])
+        self.nb_matches_surface = np.vstack(
+            [self.nb_matches_surface, np.zeros_like(self.nb_matches_surface)]
+        )
+
+    def rating(self, player: str, surface: str | None = None) -> float:
+        """
+        Renvoie le classement actuel d'un joueur.
+
+        Args:
+            player (str): Nom du joueur.
+            surface (str | None): Surface, ou None pour le classement global.
+
+        Returns:
+            float: Classement Elo (classement initial si le joueur est inconnu).
+        """
+        index = self.players.get(player)
+        if index is None:
+            return self.initial_rating
+        if surface is None or surface not in self.surface_index:
+            return float(self.ratings[index])
+        return float(self.surface_ratings[index, self.surface_index[surface]])
+
+    def update(
+        self, winner: str, loser: str, surface: str | None = None, match_id: str | None = None
+    ) -> dict | None:
+        """
+        Met à jour les classements avec le résultat d'un match.
+
+        Args:
+            winner (str): Nom du vainqueur.
+            loser (str): Nom du perdant.
+            surface (str | None): Surface du match.
+            match_id (str | None): Identifiant du match (ex. son lien), pour ignorer les doublons.
+
+        Returns:
+            dict | None: Classements avant le match ("winner_elo", "loser_elo",
+            "winner_elo_surface", "loser_elo_surface"), ou None si le match était déjà pris en compte.
+        """
+        if match_id is not None:
+            if match_id in self.seen_matches:
+                return None
+            self.seen_matches.add(match_id)
+
+        w, l = self._index(winner), self._index(loser)
+        pre_match = {
+            "winner_elo": float(self.ratings[w]),
+            "loser_elo": float(self.ratings[l]),
+            "winner_elo_surface": self.initial_rating,
+            "loser_elo_surface": self.initial_rating,
+        }
+        self._update_pair(self.ratings, self.nb_matches, w, l)
+
+        s = self.surface_index.get(surface)  # type: ignore[arg-type]
+        if s is not None:
+            pre_match["winner_elo_surface"] = float(self.surface_ratings[w, s])
+            pre_match["loser_elo_surface"] = float(self.surface_ratings[l, s])
+            self._update_pair(
+                self.surface_ratings[:, s], self.nb_matches_surface[:, s], w, l
+            )
+
+        if match_id is not None:
+            self.history[match_id] = tuple(pre_match[key] for key in PRE_MATCH_KEYS)
+        return pre_match
+
+    def pre_match(self, match_id: str) -> dict | None:
+        """Classements avant un match déjà pris en compte (voir `update`), ou None s'il est inconnu."""
+        values = self.history.get(match_id)
+        return dict(zip(PRE_MATCH_KEYS, values)) if values is not None else None
+
+    @staticmethod
+    def _update_pair(ratings: np.ndarray, nb_matches: np.ndarray, w: int, l: int) -> None:
+        expected = 1.0 / (1.0 + 10.0 ** ((ratings[l] - ratings[w]) / 400.0))
+        k_winner = K_SCALE / (nb_matches[w] + K_OFFSET) ** K_SHAPE
+        k_loser = K_SCALE / (nb_matches[l] + K_OFFSET) ** K_SHAPE
+        ratings[w] += k_winner * (1.0 - expected)
+        ratings[l] -= k_loser * (1.0 - expected)
+        nb_matches[w] += 1
+        nb_matches[l] += 1
+
+    def update_from_stream(self, matches: pl.DataFrame) -> pl.DataFrame:
+        """
+        Applique une suite de matchs, dans l'ordre chronologique.
+
+        Args:
+            matches (pl.DataFrame): Matchs triés par date avec les colonnes
+                "lien_detail_match", "winner", "loser" et "surface".
+
+        Returns:
+            pl.DataFrame: Classements avant chaque nouveau match, avec la colonne
+            "lien_detail_match" et celles renvoyées par `update`.
+        """
+        rows = []
+        for lien, winner, loser, surface in matches.select(
+            "lien_detail_match", "winner", "loser", "surface"
+        ).iter_rows():
+            pre_match = self.update(winner, loser, surface, match_id=lien)
+            if pre_match is not None:
+                rows.append({"lien_detail_match": lien, **pre_match})
+
+        logger.info(f"Classements Elo mis à jour avec {len(rows)} nouveaux matchs.")
+        return pl.DataFrame(
+            rows,
+            schema={
+                "lien_detail_match": pl.String,
+                "winner_elo": pl.Float64,
+                "loser_elo": pl.Float64,
+                "winner_elo_surface": pl.Float64,
+                "loser_elo_surface": pl.Float64,
+            },
+        )
+
+    def save(self, file_path: str) -> None:
+        """
+        Sauvegarde l'état des classements dans un fichier .npz.
+
+        Args:
+            file_path (str): Chemin du fichier de sortie.
+        """
+        n = len(self.players)
+        np.savez_compressed(
+            file_path,
+            players=np.array(list(self.players), dtype=str),
+            surfaces=np.array(self.surfaces, dtype=str),
+            initial_rating=np.array(self.initial_rating),
+            ratings=self.ratings[:n],
+            surface_ratings=self.surface_ratings[:n],
+            nb_matches=self.nb_matches[:n],
+            nb_matches_surface=self.nb_matches_surface[:n],
+            seen_matches=np.array(sorted(self.seen_matches), dtype=str),
+            history_links=np.array(list(self.history), dtype=str),
+            history_values=np.array(list(self.history.values()), dtype=np.float64).reshape(
+                -1, len(PRE_MATCH_KEYS)
+            ),
+        )
+        logger.info(f"Classements Elo sauvegardés dans {file_path}.")
+
+    @classmethod
+    def load(cls, file_path: str) -> "EloRatings":
+        """
+        Recharge un état sauvegardé avec `save`.
+
+        Args:
+            file_path (str): Chemin du fichier .npz.
+
+        Returns:
+            EloRatings: Classements prêts à recevoir de nouveaux matchs.
+        """
+        with np.load(file_path) as data:
+            players = data["players"].tolist()
+            elo = cls(
+                surfaces=tuple(data["surfaces"].tolist()),
+                initial_rating=float(data["initial_rating"]),
+                capacity=max(1, len(players)),
+            )
+            n = len(players)
+            elo.players = {player: i for i, player in enumerate(players)}
+            elo.ratings[:n] = data["ratings"]
+            elo.surface_ratings[:n] = data["surface_ratings"]
+            elo.nb_matches[:n] = data["nb_matches"]
+            elo.nb_matches_surface[:n] = data["nb_matches_surface"]
+            elo.seen_matches = set(data["seen_matches"].tolist())
+            # Les fichiers antérieurs à l'historique n'en ont pas
+            if "history_links" in data:
+                elo.history = dict(
+                    zip(data["history_links"].tolist(), map(tuple, data["history_values"].tolist()))
+                )
+        return elo
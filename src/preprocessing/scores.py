@@ -0,0 +1,174 @@
+"""Module pour parser les scores des matchs en une table par set
+"""
+
+import polars as pl
+
+# Jeux du vainqueur et du perdant d'un set, ex. "6-4" ou "7-64" (points du tie-break collés)
+SET_PATTERN = r"^(\d+)-(\d+)"
+TIEBREAK_PATTERN = r"^(7-6|6-7)"
+RETIREMENT_PATTERN = r"(?i)(ret|ab\.|abandon|w\.?o|forfait)"
+
+
+def parse_sets(matches: pl.DataFrame) -> pl.DataFrame:
+    """
+    Découpe le score de chaque match en une ligne par set, du point de vue du joueur.
+
+    Le score est écrit du point de vue du vainqueur ("7-64, 6-3"), les jeux
+    sont donc inversés pour les défaites.
+
+    Args:
+        matches (pl.DataFrame): Matchs avec au moins les colonnes "score" et "resultat".
+
+    Returns:
+        pl.DataFrame: Une ligne par set avec les colonnes :
+            - "match_index" (int) : Position du match dans `matches`.
+            - "set_number" (int) : Numéro du set (à partir de 1).
+            - "games_won" (int) : Jeux gagnés par le joueur.
+            - "games_lost" (int) : Jeux perdus par le joueur.
+            - "tiebreak" (bool) : Le set s'est joué au tie-break.
+    """
+    games_winner = pl.col("set_score").str.extract(SET_PATTERN, 1).cast(pl.Int32)
+    tiebreak = pl.col("set_score").str.contains(TIEBREAK_PATTERN)
+    games_loser = (
+        pl.when(tiebreak)
+        .then(13 - games_winner)
+        .otherwise(pl.col("set_score").str.extract(SET_PATTERN, 2).cast(pl.Int32))
+    )
+
+    return (
+        matches.lazy()
+        .select(
+            pl.int_range(pl.len(), dtype=pl.UInt32).alias("match_index"),
+            (pl.col("resultat") == "victoire").alias("won"),
+            pl.col("score").fill_null("").str.split(", ").alias("set_score"),
+        )
+        .explode("set_score")
+        .with_columns(pl.col("set_score").str.strip_chars())
+        .filter(pl.col("set_score").str.contains(SET_PATTERN))
+        .with_columns(
+            pl.col("match_index").cum_count().over("match_index").alias("set_number"),
+            pl.when(pl.col("won")).then(games_winner).otherwise(games_loser).alias("games_won"),
+            pl.when(pl.col("won")).then(games_loser).otherwise(games_winner).alias("games_lost"),
+            tiebreak.alias("tiebreak"),
+        )
+        .select("match_index", "set_number", "games_won", "games_lost", "tiebreak")
+        .collect()
+    )
+
+
+def summarize_matches(matches: pl.DataFrame) -> pl.DataFrame:
+    """
+    Ajoute aux matchs les informations tirées de leur score.
+
+    Args:
+        matches (pl.DataFrame): Matchs avec au moins les colonnes "score" et "resultat".
+
+    Returns:
+        pl.DataFrame: `matches` avec en plus les colonnes :
+            - "won" (bool) : Le joueur a gagné le match.
+            - "nb_sets" (int) : Nombre de sets joués.
+            - "has_tiebreak" (bool) : Au moins un set s'est joué au tie-break.
+            - "retired" (bool) : Match terminé sur abandon ou forfait.
+    """
+    per_match = (
+        parse_sets(matches)
+        .group_by("match_index")
+        .agg(
+            pl.len().cast(pl.Int32).alias("nb_sets"),
+            pl.col("tiebreak").any().alias("has_tiebreak"),
+        )
+    )
+
+    return (
+        matches.with_columns(
+            pl.int_range(pl.len(), dtype=pl.UInt32).alias("match_index")
+        )
+        .join(per_match, on="match_index", how="left")
+        .with_columns(
+            (pl.col("resultat") == "victoire").alias("won"),
+            pl.col("nb_sets").fill_null(0),
+            pl.col("has_tiebreak").fill_null(False),
+            pl.col("score").fill_null("").str.contains(RETIREMENT_PATTERN).alias("retired"),
+        )
+        .sort("match_index")
+        .drop("match_index")
+    )
+
+
+def win_rate_counts() -> list[pl.Expr]:
+    """
+    Agrégations de comptage nécessaires au calcul des taux de victoire.
+
+    Returns:
+        list[pl.Expr]: Expressions à utiliser dans un `group_by(...).agg(...)`
+        sur une table produite par `summarize_matches`.
+    """
+    three_sets = pl.col("nb_sets") >= 3
+    return [
+        pl.len().alias("nb_matches"),
+        pl.col("won").sum().alias("nb_wins"),
+        three_sets.sum().alias("nb_3_sets"),
+        (three_sets & pl.col("won")).sum().alias("nb_wins_3_sets"),
+        pl.col("has_tiebreak").sum().alias("nb_tiebreak"),
+        (pl.col("has_tiebreak") & pl.col("won")).sum().alias("nb_wins_tiebreak"),
+    ]
+
+
+def win_rates_from_counts() -> list[pl.Expr]:
+    """
+    Convertit les comptages de `win_rate_counts` en taux de victoire.
+
+    Returns:
+        list[pl.Expr]: Expressions "win_rate", "win_rate_3_sets" et "win_rate_tiebreak".
+    """
+    return [
+        pl.when(pl.col("nb_matches") > 0)
+        .then(pl.col("nb_wins") / pl.col("nb_matches"))
+        .otherwise(0.0)
+        .alias("win_rate"),
+        (pl.col("nb_wins_3_sets") / pl.max_horizontal(1, pl.col("nb_3_sets"))).alias(
+            "win_rate_3_sets"
+        ),
+        (
+            pl.col("nb_wins_tiebreak") / pl.max_horizontal(1, pl.col("nb_tiebreak"))
+        ).alias("win_rate_tiebreak"),
+    ]
+
+
+def win_rates_asof(summary: pl.DataFrame, by: str = "player") -> pl.DataFrame:
+    """
+    Calcule, pour chaque joueur et chaque date de match, les taux de victoire
+    sur les matchs strictement antérieurs à cette date.
+
+    Args:
+        summary (pl.DataFrame): Table issue de `summarize_matches` avec les colonnes
+            `by` et "date" (au format 'DD.MM.YY').
+        by (str): Colonne identifiant le joueur.
+
+    Returns:
+        pl.DataFrame: Une ligne par (joueur, date) avec les colonnes `by`, "date",
+        "win_rate", "win_rate_3_sets" et "win_rate_tiebreak".
+    """
+    counts = [
+        "nb_matches",
+        "nb_wins",
+        "nb_3_sets",
+        "nb_wins_3_sets",
+        "nb_tiebreak",
+        "nb_wins_tiebreak",
+    ]
+
+    return (
+        summary.lazy()
+        .group_by(by, "date")
+        .agg(win_rate_counts())
+        .with_columns(
+            pl.col("date").str.strptime(pl.Date, format="%d.%m.%y").alias("parsed_date")
+        )
+        .sort(by, "parsed_date")
+        .with_columns(
+            (pl.col(count).cum_sum() - pl.col(count)).over(by) for count in counts
+        )
+        .select(by, "date", *win_rates_from_counts())
+        .collect()
+    )
@@ -0,0 +1,164 @@
+"""Module pour construire la table des tournois (nom normalisé, catégorie, surface, dates)
+à partir des valeurs `tournoi` du scraping
+"""
+
+import logging
+import re
+from functools import lru_cache
+import polars as pl
+
+logger = logging.getLogger(__name__)
+
+# Catégories, de la plus haute à la plus basse : la première qui correspond l'emporte.
+# Les mots-clés sont cherchés comme mots entiers dans "<nom> <ville>" (voir `normalize_tournament_name`).
+TOURNAMENT_KEYWORDS = {
+    4: ["australian open", r"roland garros", "wimbledon", r"u\.?s\.? open"],
+    3: [
+        "atp finals",
+        "laver cup",
+        "indian wells",
+        "miami",
+        "monte carlo",
+        "madrid",
+        "rome",
+        "canada",
+        "montreal",
+        "toronto",
+        "cincinnati",
+        "shanghai",
+        # La ville seule désigne aussi Roland Garros, les JO ou des challengers
+        "paris masters",
+        "paribas masters",
+        "paris bercy",
+    ],
+    2: [
+        "rotterdam",
+        "dubai",
+        "acapulco",
+        "barcelona",
+        r"queen'?s",
+        "halle",
+        "hamburg",
+        "beijing",
+        "tokyo",
+        "vienna",
+        "basel",
+    ],
+}
+DEFAULT_CATEGORY = 1
+
+# Épreuves jouées dans les mêmes villes mais hors circuit principal (challengers, JO, ...)
+MINOR_EVENTS_PATTERN = r"\b(challenger|itf|futures?|olympi\w*|davis cup|united cup|exhibition)\b"
+
+_CATEGORY_PATTERNS = [
+    (category, re.compile(r"\b(" + "|".join(keywords) + r")\b"))
+    for category, keywords in TOURNAMENT_KEYWORDS.items()
+]
+_MINOR_EVENTS = re.compile(MINOR_EVENTS_PATTERN)
+
+
+def normalize_tournament_name(tournament_name: str) -> str:
+    """
+    Normalise un nom de tournoi du scraping, ex. "Shanghai Rolex Masters - Shanghai / $10.2M"
+    devient "shanghai rolex masters shanghai".
+
+    Args:
+        tournament_name (str): Valeur `tournoi` du scraping (nom, ville et dotation).
+
+    Returns:
+        str: Nom et ville en minuscules, sans la dotation ni la ponctuation de séparation.
+    """
+    name = tournament_name.split(" / ")[0].lower()
+    name = re.sub(r"[-–,]", " ", name)
+    return " ".join(name.split())
+
+
+@lru_cache(maxsize=None)
+def tournament_category(tournament_name: str) -> int:
+    """
+    Détermine la catégorie d'un tournoi à partir de son nom (résultat mis en cache par nom).
+
+    Args:
+        tournament_name (str): Nom du tournoi, brut ou normalisé.
+
+    Returns:
+        int: La catégorie du tournoi (4 = Grand Slam, 3 = Masters ou ATP Finals, 2 = ATP 500, 1 = ATP 250).
+    """
+    name = normalize_tournament_name(tournament_name)
+    if _MINOR_EVENTS.search(name):
+        return DEFAULT_CATEGORY
+
+    for category, pattern in _CATEGORY_PATTERNS:
+        if pattern.search(name):
+            return category
+    return DEFAULT_CATEGORY
+
+
+def build_tournament_table(matches: pl.DataFrame) -> pl.DataFrame:
+    """
+    Construit la table des tournois : une ligne par valeur `tournoi` distincte.
+
+    La catégorie n'est calculée qu'une fois par tournoi, puis jointe aux matchs
+    (voir `add_tournament_metadata`).
+
+    Args:
+        matches (pl.DataFrame): Matchs avec les colonnes "tournoi", "surface" et "date" (pl.Date).
+
+    Returns:
+        pl.DataFrame: Une ligne par tournoi avec les colonnes :
+            - "tournoi" (str) : Valeur brute du scraping.
+            - "tournament_name" (str) : Nom normalisé.
+            - "tournament_category" (int) : Catégorie (voir `tournament_category`).
+            - "tournament_surface" (str) : Surface la plus fréquente.
+            - "typical_month" (int) : Mois où le tournoi se joue le plus souvent.
+            - "first_date", "last_date" (date) : Premier et dernier match connus.
+    """
+    tournaments = (
+        matches.lazy()
+        .filter(pl.col("tournoi").is_not_null())
+        .group_by("tournoi")
+        .agg(
+            pl.col("surface").drop_nulls().mode().first().alias("tournament_surface"),
+            pl.col("date").dt.month().mode().first().cast(pl.Int64).alias("typical_month"),
+            pl.col("date").min().alias("first_date"),
+            pl.col("date").max().alias("last_date"),
+        )
+        .sort("tournoi")
+        .collect()
+    )
+    names = tournaments["tournoi"].to_list()
+
+    logger.info(f"Table des tournois construite : {len(names)} tournois.")
+    return tournaments.select(
+        "tournoi",
+        pl.Series(
+            "tournament_name", [normalize_tournament_name(name) for name in names], pl.String
+        ),
+        pl.Series(
+            "tournament_category", [tournament_category(name) for name in names], pl.Int64
+        ),
+        "tournament_surface",
+        "typical_month",
+        "first_date",
+        "last_date",
+    )
+
+
+def add_tournament_metadata(matches: pl.DataFrame, tournaments: pl.DataFrame) -> pl.DataFrame:
+    """
+    Ajoute aux matchs la catégorie et le nom normalisé de leur tournoi, par jointure.
+
+    Args:
+        matches (pl.DataFrame): Matchs avec la colonne "tournoi".
+        tournaments (pl.DataFrame): Table issue de `build_tournament_table`.
+
+    Returns:
+        pl.DataFrame: `matches` avec les colonnes "tournament_name" et "tournament_category"
+        (catégorie par défaut pour les tournois absents de la table).
+    """
+    return matches.join(
+        tournaments.select("tournoi", "tournament_name", "tournament_category"),
+        on="tournoi",
+        how="left",
+        coalesce=True,
+    ).with_columns(pl.col("tournament_category").fill_null(DEFAULT_CATEGORY))
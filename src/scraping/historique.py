@@ -0,0 +1,201 @@
+"""Module pour récupérer l'historique complet des matchs d'un joueur, saison par saison
+"""
+
+import json
+import logging
+import os
+import re
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from bs4 import BeautifulSoup
+import src.scraping.scrap_page_joueur as spj
+
+logger = logging.getLogger(__name__)
+
+# Page des matchs d'une saison : lien du profil suivi de l'année
+URL_SAISON = "{lien_joueur}{annee}/"
+
+
+@dataclass(frozen=True)
+class TacheSaison:
+    nom_joueur: str
+    lien_joueur: str
+    annee: str
+
+    @property
+    def url(self) -> str:
+        return URL_SAISON.format(lien_joueur=self.lien_joueur, annee=self.annee)
+
+    def chemin(self, dossier: str) -> str:
+        """Fichier de checkpoint de la tâche : <dossier>/<joueur>/<annee>.json."""
+        slug = re.sub(r"[^a-z0-9]+", "-", self.nom_joueur.lower()).strip("-")
+        return os.path.join(dossier, slug, f"{self.annee}.json")
+
+
+def annees_disponibles(statistiques: dict) -> list[str]:
+    """
+    Liste les saisons d'un joueur à partir de ses statistiques annuelles.
+
+    Args:
+        statistiques (dict): Statistiques issues de `genere_statistiques_agregrees`
+            (clés du type '2023_sommaire').
+
+    Returns:
+        list[str]: Années, de la plus récente à la plus ancienne.
+    """
+    annees = {cle.split("_")[0] for cle in statistiques if cle.split("_")[0].isdigit()}
+    return sorted(annees, reverse=True)
+
+
+def generer_taches(
+    detail_joueurs: Iterable[tuple[str, dict]],
+    liens_joueurs: dict[str, str],
+    dossier: str,
+    annees: set[str] | None = None,
+) -> list[TacheSaison]:
+    """
+    Découpe la récupération de l'historique en tâches (joueur, saison) restant à faire.
+
+    Args:
+        detail_joueurs (Iterable[tuple[str, dict]]): Couples (nom, détails) de detail_joueurs.json.
+        liens_joueurs (dict[str, str]): Lien du profil de chaque joueur (joueurs.json).
+        dossier (str): Dossier des checkpoints : les tâches déjà faites sont ignorées.
+        annees (set[str] | None): Saisons à récupérer (toutes si None).
+
+    Returns:
+        list[TacheSaison]: Tâches restantes.
+    """
+    taches = []
+    for nom_joueur, detail in detail_joueurs:
+        lien_joueur = liens_joueurs.get(nom_joueur)
+        if not lien_joueur:
+            continue
+        for annee in annees_disponibles(detail.get("statistiques", {})):
+            tache = TacheSaison(nom_joueur, lien_joueur, annee)
+            if (annees is None or annee in annees) and not os.path.exists(tache.chemin(dossier)):
+                taches.append(tache)
+    return taches
+
+
+def extraire_matchs_saison(html: str) -> list[dict]:
+    """
+    Extrait les matchs d'une page de saison.
+
+    Args:
+        html (str): Contenu de la page.
+
+    Returns:
+        list[dict]: Matchs au même format que dans detail_joueurs.json.
+    """
+    page = BeautifulSoup(html, features="lxml")
+    tables = page.find_all("table", attrs={"class": "table_pmatches"})
+    if not tables:
+        return []
+    lignes = tables[-1].find_all("tr")
+    return [match.__dict__ for match in spj.genere_derniers_matchs(lignes)]
+
+
+def executer_tache(tache: TacheSaison, telecharger: Callable[[str], str], dossier: str) -> int:
+    """
+    Récupère les matchs d'une saison et les écrit dans le fichier de checkpoint de la tâche.
+
+    Le fichier est écrit dans un fichier temporaire puis renommé : une tâche
+    interrompue n'est jamais considérée comme faite.
+
+    Args:
+        tache (TacheSaison): Tâche à exécuter.
+        telecharger (Callable[[str], str]): Fonction qui renvoie le HTML d'une URL.
+        dossier (str): Dossier des checkpoints.
+
+    Returns:
+        int: Nombre de matchs récupérés.
+    """
+    matchs = extraire_matchs_saison(telecharger(tache.url))
+
+    chemin = tache.chemin(dossier)
+    os.makedirs(os.path.dirname(chemin), exist_ok=True)
+    with open(chemin + ".tmp", "w", encoding="utf-8") as fichier:
+        json.dump(
+            {"nom_joueur": tache.nom_joueur, "annee": tache.annee, "matchs": matchs},
+            fichier,
+            ensure_ascii=False,
+            indent=4,
+        )
+    os.replace(chemin + ".tmp", chemin)
+    return len(matchs)
+
+
+def executer_taches(
+    taches: list[TacheSaison],
+    telecharger: Callable[[str], str],
+    dossier: str,
+    max_workers: int = 4,
+) -> dict[str, int]:
+    """
+    Exécute les tâches en parallèle. Une tâche en erreur n'est pas marquée comme faite
+    et sera reprise au prochain lancement.
+
+    Args:
+        taches (list[TacheSaison]): Tâches à exécuter (voir `generer_taches`).
+        telecharger (Callable[[str], str]): Fonction qui renvoie le HTML d'une URL.
+        dossier (str): Dossier des checkpoints.
+        max_workers (int): Nombre de téléchargements simultanés.
+
+    Returns:
+        dict[str, int]: Nombre de tâches "terminees" et "en_erreur", et de "matchs" récupérés.
+    """
+    rapport = {"terminees": 0, "en_erreur": 0, "matchs": 0}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(executer_tache, tache, telecharger, dossier): tache
+            for tache in taches
+        }
+        for future in as_completed(futures):
+            tache = futures[future]
+            try:
+                rapport["matchs"] += future.result()
+                rapport["terminees"] += 1
+                logger.info(f"Saison {tache.annee} de {tache.nom_joueur} récupérée.")
+            except Exception as e:
+                rapport["en_erreur"] += 1
+                logger.error(f"Erreur pour la saison {tache.annee} de {tache.nom_joueur} : {e}")
+    return rapport
+
+
+def fusionner_historique(detail_joueurs: dict, dossier: str) -> int:
+    """
+    Ajoute aux matchs de detail_joueurs les matchs des saisons récupérées,
+    sans doublon (même lien de match).
+
+    Args:
+        detail_joueurs (dict): Détails des joueurs, modifiés sur place.
+        dossier (str): Dossier des checkpoints.
+
+    Returns:
+        int: Nombre de matchs ajoutés.
+    """
+    if not os.path.isdir(dossier):
+        return 0
+
+    nb_ajouts = 0
+    for racine, _, fichiers in os.walk(dossier):
+        for nom_fichier in sorted(fichiers):
+            if not nom_fichier.endswith(".json"):
+                continue
+            with open(os.path.join(racine, nom_fichier), "r", encoding="utf-8") as fichier:
+                saison = json.load(fichier)
+
+            joueur = detail_joueurs.get(saison["nom_joueur"])
+            if joueur is None:
+                continue
+            connus = {match["lien_detail_match"] for match in joueur["matchs"]}
+            for match in saison["matchs"]:
+                lien = match["lien_detail_match"]
+                if lien != "NA" and lien not in connus:
+                    connus.add(lien)
+                    joueur["matchs"].append(match)
+                    nb_ajouts += 1
+
+    logger.info(f"{nb_ajouts} matchs ajoutés depuis l'historique.")
+    return nb_ajouts
@@ -0,0 +1,85 @@
+from datetime import date, timedelta
+import numpy as np
+import polars as pl
+import pytest
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from src.models.backtest import backtest, score_predictions, walk_forward_folds
+from src.models.cache import CVCache
+
+DEBUT = date(2022, 1, 1)
+
+
+def matchs(n=400):
+    X, y = make_classification(n_samples=n, n_features=5, random_state=3)
+    df = pl.DataFrame(X, schema=[f"f{i}" for i in range(X.shape[1])])
+    # Dates au format du dataset propre, dans le désordre
+    dates = [(DEBUT + timedelta(days=2 * i)).strftime("%d.%m.%y") for i in range(n)]
+    return df.with_columns(
+        pl.Series("target", y),
+        pl.Series("date", dates[::-1]),
+        pl.lit("A").alias("player1_name"),
+        pl.lit("B").alias("player2_name"),
+        pl.Series("surface_dure", [i % 2 for i in range(n)]),
+        pl.Series("surface_terre_batue", [1 - i % 2 for i in range(n)]),
+        pl.Series("tournament_category", [i % 3 for i in range(n)]),
+    )
+
+
+def test_walk_forward_folds():
+    dates = np.array([DEBUT + timedelta(days=i) for i in range(0, 800, 5)], dtype="datetime64[D]")
+    folds = walk_forward_folds(dates, test_days=90, min_train_days=365)
+
+    assert folds[0][0] == np.searchsorted(dates, dates[0] + np.timedelta64(365, "D"))
+    assert folds[-1][1] == len(dates)
+    for (_, end), (start, _) in zip(folds, folds[1:]):
+        assert end == start
+    for start, end in folds:
+        assert dates[start - 1] < dates[start] and (dates[end - 1] - dates[start]) < np.timedelta64(90, "D")
+
+
+def test_score_predictions():
+    predictions = pl.DataFrame({"proba": [0.9, 0.2, 0.6, 0.5], "target": [1, 0, 0, 1], "g": [0, 0, 1, 1]})
+    summary = score_predictions(predictions).row(0, named=True)
+
+    assert summary["n"] == 4
+    assert summary["accuracy"] == pytest.approx(0.5)
+    assert summary["brier"] == pytest.approx((0.01 + 0.04 + 0.36 + 0.25) / 4)
+    assert summary["log_loss"] == pytest.approx(-np.mean(np.log([0.9, 0.8, 0.4, 0.5])))
+    assert score_predictions(predictions, "g")["accuracy"].to_list() == [1.0, 0.0]
+
+
+def test_backtest_parallele_comme_sequentiel(tmp_path):
+    df = matchs()
+    sequentiel = backtest(df, LogisticRegression(), n_jobs=1)
+    parallele = backtest(df, LogisticRegression(), n_jobs=2)
+
+    predictions = sequentiel['predictions']
+    assert predictions.height == sequentiel['summary']['n'] > 0
+    assert predictions["date"].is_sorted()
+    assert set(predictions["surface"]) == {"dure", "terre battue"}
+    assert sequentiel['by_category'].height == 3
+    np.testing.assert_allclose(predictions["proba"], parallele['predictions']["proba"])
+
+    cache = CVCache(str(tmp_path))
+    premier = backtest(df, LogisticRegression(), cache=cache)
+    assert cache.misses == sequentiel['folds'].height and cache.hits == 0
+    second = backtest(df, LogisticRegression(), cache=cache)
+    assert cache.hits == sequentiel['folds'].height
+    np.testing.assert_allclose(premier['predictions']["proba"], second['predictions']["proba"])
+
+
+def test_backtest_warm_start():
+    resultats = backtest(matchs(), RandomForestClassifier(n_estimators=20, random_state=1), mode="warm_start")
+    assert 0.5 < resultats['summary']['accuracy'] <= 1
+
+    with pytest.raises(ValueError):
+        backtest(matchs(), LogisticRegression(), mode="inconnu")
+
+
+def test_backtest_rapports_hors_variables_retenues():
+    # Sélection sans la surface ni la catégorie : les rapports les gardent
+    resultats = backtest(matchs(), LogisticRegression(), n_jobs=1, features=["f0", "f1", "f2"])
+    assert set(resultats['predictions']["surface"]) == {"dure", "terre battue"}
+    assert resultats['by_category'].height == 3
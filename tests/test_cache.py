@@ -0,0 +1,67 @@
+import os
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+from src.models.cache import CVCache, candidate_key, dataset_fingerprint, file_fingerprint
+from src.models.models_selector import SEED, cross_validate_models, find_best_model, train_test
+from tests.test_models_selector import MODELES_TEST, donnees
+
+
+def test_candidate_key():
+    X, y = np.arange(12.0).reshape(6, 2), np.array([0, 1] * 3)
+    empreinte = dataset_fingerprint(X, y)
+    modele = LogisticRegression(max_iter=1000)
+
+    cle = candidate_key(empreinte, modele, {'C': 1}, folds=5)
+    assert cle == candidate_key(empreinte, LogisticRegression(max_iter=1000, n_jobs=4), {'C': 1}, folds=5)
+    assert cle != candidate_key(empreinte, modele, {'C': 0.1}, folds=5)
+    assert cle != candidate_key(empreinte, modele, {'C': 1}, folds=3)
+    assert cle != candidate_key(empreinte, DecisionTreeClassifier(), {}, folds=5)
+    assert cle != candidate_key(dataset_fingerprint(X, 1 - y), modele, {'C': 1}, folds=5)
+
+
+def test_file_fingerprint(tmp_path):
+    chemin = tmp_path / "dataset.parquet"
+    chemin.write_bytes(b"abc" * 1000)
+    empreinte = file_fingerprint(str(chemin), chunk_size=100)
+    assert empreinte == file_fingerprint(str(chemin))
+    chemin.write_bytes(b"abd" * 1000)
+    assert file_fingerprint(str(chemin)) != empreinte
+
+
+def test_relance_sans_nouveau_fit(tmp_path):
+    X_train, _, y_train, _ = train_test(donnees(), SEED)
+    cache = CVCache(str(tmp_path))
+    premier = cross_validate_models(MODELES_TEST, X_train, y_train, n_jobs=1, cache=cache)
+    assert cache.hits == 0
+
+    cache = CVCache(str(tmp_path))
+    second = cross_validate_models(MODELES_TEST, X_train, y_train, n_jobs=1, cache=cache)
+    assert cache.misses == 0
+    assert second == {
+        name: [(params, list(scores)) for params, scores in candidats]
+        for name, candidats in premier.items()
+    }
+
+    results = find_best_model(donnees(), SEED, n_jobs=1, models=MODELES_TEST, cache=cache)
+    relance = find_best_model(donnees(), SEED, n_jobs=1, models=MODELES_TEST, cache=cache)
+    assert relance['accuracy'] == results['accuracy']
+    # Les modèles repris du cache gardent la durée de leur entraînement
+    for name, profile in relance['profiles'].items():
+        assert profile['fit_seconds'] == results['profiles'][name]['fit_seconds']
+
+
+def test_eviction_lru(tmp_path):
+    cache = CVCache(str(tmp_path), max_bytes=10**6)
+    for i in range(3):
+        cache.put_scores(f"cle{i}", [float(i)] * 5)
+        os.utime(tmp_path / f"cle{i}.json", ns=(i * 10**9, i * 10**9))
+    assert cache.get_scores("cle0") == [0.0] * 5
+
+    taille = cache.size()
+    cache.max_bytes = taille - 1
+    assert cache.evict() == 1
+    # cle0 vient d'être lue : c'est cle1 la moins récemment utilisée
+    assert cache.get_scores("cle1") is None
+    assert cache.get_scores("cle0") is not None
+    assert cache.size() <= cache.max_bytes
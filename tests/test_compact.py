@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+import xgboost as xgb
+from sklearn.datasets import make_classification
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.tree import DecisionTreeClassifier
+from src.models.compact import CompactEnsemble, compile_model
+from src.models.out_of_core import BoosterClassifier
+
+
+def donnees():
+    X, y = make_classification(n_samples=500, n_features=8, random_state=1)
+    return X.astype(np.float32), y
+
+
+@pytest.mark.parametrize(
+    "modele",
+    [
+        RandomForestClassifier(n_estimators=30, max_depth=6, random_state=1),
+        GradientBoostingClassifier(n_estimators=30, random_state=1),
+        xgb.XGBClassifier(n_estimators=30, max_depth=4),
+    ],
+)
+def test_memes_probabilites(modele, tmp_path):
+    X, y = donnees()
+    modele.fit(X, y)
+    compact = compile_model(modele)
+
+    np.testing.assert_allclose(compact.predict_proba(X), modele.predict_proba(X), atol=1e-5)
+    assert compact.n_features_in_ == 8
+
+    compact.save(tmp_path / "modele.npz")
+    recharge = CompactEnsemble.load(tmp_path / "modele.npz")
+    np.testing.assert_array_equal(recharge.predict_proba(X[:10]), compact.predict_proba(X[:10]))
+
+
+def test_valeurs_manquantes_et_booster():
+    X, y = donnees()
+    X[::7, 2] = np.nan
+    modele = BoosterClassifier(max_depth=3, num_boost_round=20).fit(X, y)
+
+    np.testing.assert_allclose(compile_model(modele).predict_proba(X), modele.predict_proba(X), atol=1e-5)
+
+
+def test_elagage_des_arbres_constants():
+    X, y = donnees()
+    modele = RandomForestClassifier(n_estimators=20, max_depth=3, random_state=1).fit(X, y)
+    # Un arbre réduit à une feuille ne fait qu'ajouter une constante
+    modele.estimators_[0] = DecisionTreeClassifier(min_samples_split=len(X) + 1).fit(X, y)
+    compact = compile_model(modele)
+
+    assert compact.n_trees == 19
+    np.testing.assert_allclose(compact.predict_proba(X), modele.predict_proba(X), atol=1e-6)
+    assert compile_model(modele, prune_tol=1.0).n_trees == 0
+
+    with pytest.raises(ValueError):
+        compile_model(KNeighborsClassifier().fit(X, y))
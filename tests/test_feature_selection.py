@@ -0,0 +1,67 @@
+import numpy as np
+import polars as pl
+from sklearn.ensemble import RandomForestClassifier
+from src.models.feature_selection import (
+    apply_feature_schema,
+    evaluate_feature_sets,
+    load_feature_schema,
+    propose_feature_sets,
+    save_feature_schema,
+    select_feature_set,
+    selection_split,
+)
+from src.models.models_selector import SEED, train_test
+
+MODELE = RandomForestClassifier(n_estimators=20, max_depth=5, random_state=1)
+
+
+def dataset(n=600):
+    rng = np.random.default_rng(1)
+    signal = rng.normal(size=n)
+    return pl.DataFrame(
+        {
+            "player1_name": ["A"] * n,
+            "ranking_diff": signal,
+            # Copie presque exacte de ranking_diff
+            "points_diff": signal * 2 + rng.normal(scale=0.01, size=n),
+            "bruit": rng.normal(size=n),
+            "win_rate_tiebreak_diff": np.zeros(n),
+            "target": (signal + rng.normal(scale=0.3, size=n) > 0).astype(int),
+        }
+    )
+
+
+def test_propose_feature_sets():
+    sets = propose_feature_sets(dataset(), model=MODELE)
+
+    assert sets["toutes"] == ["ranking_diff", "points_diff", "bruit", "win_rate_tiebreak_diff"]
+    # Constante retirée, une seule des deux variables corrélées gardée
+    assert len(sets["sans_redondance"]) == 2
+    assert "bruit" in sets["sans_redondance"]
+    assert "bruit" not in sets["top_50"]
+
+
+def test_evaluation_et_schema(tmp_path):
+    df = dataset()
+    report = evaluate_feature_sets(df, propose_feature_sets(df, model=MODELE), model=MODELE)
+    assert {"accuracy", "fit_seconds", "predict_p99_ms", "predict_batch_ms"} <= set(report[0])
+
+    selected = select_feature_set(report, tolerance=0.05)
+    assert selected["n_features"] < 4
+
+    chemin = str(tmp_path / "features.json")
+    assert load_feature_schema(chemin) is None
+    save_feature_schema(selected["features"], chemin, report)
+    schema = load_feature_schema(chemin)
+    assert apply_feature_schema(df, schema).columns == [*schema, "player1_name", "target"]
+    assert apply_feature_schema(df, None).columns == df.columns
+
+
+def test_selection_sans_le_jeu_de_test():
+    df = dataset().drop("player1_name")
+    _, X_test, _, _ = train_test(df, SEED)
+    X_fit, X_val, _, _ = selection_split(df, SEED)
+
+    test = set(X_test[:, 0].tolist())
+    assert len(X_fit) + len(X_val) + len(X_test) == df.height
+    assert test.isdisjoint(X_fit[:, 0].tolist()) and test.isdisjoint(X_val[:, 0].tolist())
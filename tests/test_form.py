@@ -0,0 +1,79 @@
+from datetime import date
+import polars as pl
+import pytest
+from src.preprocessing.form import RollingForm, form_keys, stat_values
+
+
+STATS = {"premier_service": "30/50 (60%)", "aces": "5", "double_fautes": "NA"}
+
+
+def test_stat_values():
+    numerators, denominators = stat_values(STATS, won=True)
+
+    assert (numerators[0], denominators[0]) == (1.0, 1.0)
+    assert (numerators[1], denominators[1]) == (30.0, 50.0)
+    assert (numerators[-1], denominators[-1]) == (5.0, 1.0)
+    # double_fautes absente : non comptée
+    assert denominators[-2] == 0.0
+
+
+def test_update_renvoie_la_forme_avant_match():
+    form = RollingForm()
+    pre_match = form.update("A", "B", date(2024, 1, 1), STATS, None, match_id="m1")
+
+    assert pre_match["winner"] == dict.fromkeys(form_keys(), 0.0)
+    assert form.update("A", "B", date(2024, 1, 1), match_id="m1") is None
+
+    snapshot = form.snapshot("A", date(2024, 1, 1))
+    assert snapshot["form_win_rate"] == 1.0
+    assert snapshot["form_first_serve_pct"] == pytest.approx(0.6)
+    assert snapshot["last10_aces"] == 5.0
+    assert form.snapshot("B", date(2024, 1, 1))["last10_first_serve_pct"] == 0.0
+    assert form.snapshot("Inconnu", date(2024, 1, 1)) == dict.fromkeys(form_keys(), 0.0)
+
+
+def test_decroissance_exponentielle():
+    form = RollingForm(half_life=10)
+    form.update("A", "B", date(2024, 1, 1))
+    form.update("B", "A", date(2024, 1, 11))
+
+    snapshot = form.snapshot("A", date(2024, 1, 21))
+    # La victoire a 10 jours de plus que la défaite : elle pèse moitié moins
+    assert snapshot["form_win_rate"] == pytest.approx(0.5 / 1.5)
+    assert snapshot["last10_win_rate"] == pytest.approx(0.5)
+    assert snapshot["form_matches"] == pytest.approx(0.5 * 1.5)
+
+
+def test_fenetre_des_derniers_matchs():
+    form = RollingForm(window=3)
+    for day, won in enumerate([True, True, False, False, False], start=1):
+        winner, loser = ("A", "B") if won else ("B", "A")
+        form.update(winner, loser, date(2024, 1, day))
+
+    assert form.snapshot("A", date(2024, 2, 1))["last3_win_rate"] == 0.0
+    assert form.snapshot("B", date(2024, 2, 1))["last3_win_rate"] == 1.0
+
+
+def test_update_from_stream_et_sauvegarde(tmp_path):
+    matches = pl.DataFrame(
+        {
+            "lien_detail_match": ["m1", "m2"],
+            "date": [date(2024, 1, 1), date(2024, 2, 1)],
+            "winner": ["A", "B"],
+            "loser": ["B", "A"],
+        }
+    )
+    stats_matches = {
+        "match_1": {"lien_match": "m1", "joueur_gagnant": STATS, "joueur_perdant": STATS},
+    }
+    form = RollingForm(capacity=1)
+    pre_match = form.update_from_stream(matches, stats_matches)
+
+    assert list(pre_match) == ["m1", "m2"]
+    assert pre_match["m2"]["loser"]["form_aces"] == 5.0
+
+    form.save(tmp_path / "form.npz")
+    reloaded = RollingForm.load(tmp_path / "form.npz")
+    assert reloaded.snapshot("A", date(2024, 3, 1)) == form.snapshot("A", date(2024, 3, 1))
+    assert reloaded.update_from_stream(matches, stats_matches) == {}
+    assert reloaded.pre_match("m2") == pre_match["m2"]
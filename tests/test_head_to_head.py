@@ -0,0 +1,73 @@
+from datetime import date
+import polars as pl
+import pytest
+from src.preprocessing.head_to_head import HeadToHead, UNRANKED_RANK
+
+
+def historique():
+    return pl.DataFrame(
+        {
+            "winner": ["A", "B", "A", "C"],
+            "loser": ["B", "A", "C", "A"],
+            "date": [date(2024, 1, 1), date(2024, 2, 1), date(2024, 3, 1), date(2024, 3, 1)],
+        }
+    )
+
+
+def test_features_ne_comptent_que_les_matchs_anterieurs():
+    h2h = HeadToHead(historique(), {"A": 1, "B": 2, "C": 3})
+    features = h2h.features(
+        ["A", "A", "B", "A"],
+        ["B", "B", "A", "C"],
+        [date(2024, 1, 1), date(2024, 3, 1), date(2024, 3, 1), date(2024, 3, 1)],
+    )
+
+    assert features["h2h_wins"].to_list() == [0, 1, 1, 0]
+    assert features["h2h_losses"].to_list() == [0, 1, 1, 0]
+    # A a affronté B (classé 2) deux fois avant le 01.03
+    assert features["avg_opponent_ranking"].to_list()[1] == pytest.approx(2.0)
+    # B n'avait aucun match le 01.01, puis 0 victoire sur 1 match le 01.02
+    assert features["strength_of_schedule"].to_list()[1] == pytest.approx(0.0)
+
+
+def test_strength_of_schedule_utilise_le_taux_au_moment_du_match():
+    h2h = HeadToHead(historique(), {"A": 1, "B": 2, "C": 3})
+    features = h2h.features(["B"], ["C"], [date(2024, 12, 31)])
+
+    # B a affronté A le 01.01 (aucun match) et le 01.02 (1 victoire sur 1)
+    assert features["strength_of_schedule"].item() == pytest.approx(0.5)
+    assert features["avg_opponent_ranking"].item() == pytest.approx(1.0)
+
+
+def test_joueurs_inconnus_et_non_classes():
+    h2h = HeadToHead(historique(), {"A": 1})
+    features = h2h.features(["Inconnu", "B"], ["A", "Inconnu"], [date(2025, 1, 1)] * 2)
+
+    assert features.row(0) == (0, 0, 0.0, 0.0)
+    assert features["h2h_wins"][1] == 0
+    # B et C sont absents du classement
+    features = h2h.features(["A"], ["C"], [date(2025, 1, 1)])
+    assert features["avg_opponent_ranking"].item() == pytest.approx(UNRANKED_RANK)
+
+
+def test_win_matrix():
+    h2h = HeadToHead(historique(), {})
+    wins = h2h.win_matrix(date(2024, 3, 1))
+    a, b, c = (h2h.players[name] for name in "ABC")
+
+    assert wins[a, b] == 1 and wins[b, a] == 1
+    assert wins[a, c] == 0
+    assert h2h.win_matrix(date(2025, 1, 1))[a, c] == 1
+    assert len(h2h) == 3
+
+
+def test_classement_a_la_date_du_match():
+    # B était 50e lors du premier match, puis 2e ; le classement de C est inconnu à cette date
+    matchs = historique().with_columns(
+        pl.Series("winner_ranking", [1, 50, 1, None], dtype=pl.Float64),
+        pl.Series("loser_ranking", [50, 1, None, 1], dtype=pl.Float64),
+    )
+    h2h = HeadToHead(matchs, {"A": 1, "B": 2, "C": 3})
+    features = h2h.features(["A", "A"], ["B", "C"], [date(2024, 3, 1), date(2025, 1, 1)])
+
+    assert features["avg_opponent_ranking"].to_list() == pytest.approx([50.0, (50 + 50 + 3 + 3) / 4])
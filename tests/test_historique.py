@@ -0,0 +1,62 @@
+from src.scraping.historique import (
+    TacheSaison,
+    annees_disponibles,
+    executer_taches,
+    fusionner_historique,
+    generer_taches,
+)
+
+LIEN_MATCH = "https://www.tennisendirect.net/atp/match/jannik-sinner-VS-novak-djokovic/shanghai-rolex-masters-shanghai-2024/"
+PAGE_SAISON = f"""
+<table class="table_pmatches">
+    <tr class="tour_head pair">
+        <td class="w50" align="center">13.10.24</td>
+        <td class="w50" align="center">Finale</td>
+        <td class="w130"><a href="https://www.tennisendirect.net/atp/jannik-sinner/" title="">Jannik Sinner</a></td><td class="w130"><b>Novak Djokovic</b></td>
+        <td class="w130">7-6<sup>4</sup>, 6-3  </td>
+        <td class="w16"><img src="https://www.tennisendirect.net/styles/images/ko.gif" width="15" height="15" alt="défaite" /></td>
+        <td class="w50" align="center"><a href="{LIEN_MATCH}" title="détail du match">détail du match</a></td>
+        <td rowspan="6" class="w200"><a href="https://www.tennisendirect.net/hommes/shanghai-rolex-masters-shanghai-2024/" title="Shanghai Rolex Masters - Shanghai / $10.2M">Shanghai </a></td>
+        <td rowspan="6" class="w40 surf_1">dure</td>
+    </tr>
+</table>
+"""
+DETAIL_JOUEURS = {
+    "Novak Djokovic": {
+        "profil": {"nom": "Novak Djokovic"},
+        "statistiques": {"2024_sommaire": "30-5", "2024_dure": "20-3", "2023_sommaire": "50-10"},
+        "matchs": [],
+    },
+    "Inconnu": {"profil": {"nom": "Inconnu"}, "statistiques": {"2024_sommaire": "1-0"}, "matchs": []},
+}
+LIENS = {"Novak Djokovic": "https://www.tennisendirect.net/atp/novak-djokovic/"}
+
+
+def test_annees_disponibles():
+    assert annees_disponibles(DETAIL_JOUEURS["Novak Djokovic"]["statistiques"]) == ["2024", "2023"]
+
+
+def test_taches_checkpoint_et_fusion(tmp_path):
+    dossier = str(tmp_path / "historique")
+    taches = generer_taches(DETAIL_JOUEURS.items(), LIENS, dossier)
+    assert [tache.annee for tache in taches] == ["2024", "2023"]
+    assert taches[0].url == "https://www.tennisendirect.net/atp/novak-djokovic/2024/"
+
+    def telecharger(url):
+        if url.endswith("2023/"):
+            raise ConnectionError("timeout")
+        return PAGE_SAISON
+
+    rapport = executer_taches(taches, telecharger, dossier, max_workers=2)
+    assert rapport == {"terminees": 1, "en_erreur": 1, "matchs": 1}
+    # Seule la saison en erreur reste à faire
+    assert generer_taches(DETAIL_JOUEURS.items(), LIENS, dossier) == [
+        TacheSaison("Novak Djokovic", LIENS["Novak Djokovic"], "2023")
+    ]
+
+    detail_joueurs = {nom: {**detail, "matchs": []} for nom, detail in DETAIL_JOUEURS.items()}
+    assert fusionner_historique(detail_joueurs, dossier) == 1
+    assert fusionner_historique(detail_joueurs, dossier) == 0
+    match = detail_joueurs["Novak Djokovic"]["matchs"][0]
+    assert match["lien_detail_match"] == LIEN_MATCH
+    assert match["tournoi"] == "Shanghai Rolex Masters - Shanghai / $10.2M"
@@ -0,0 +1,49 @@
+from src.models.journal import SearchJournal
+from src.models.models_selector import SEED, cross_validate_models, train_test
+from tests.test_models_selector import MODELES_TEST, donnees
+
+
+def test_journal_ligne_tronquee(tmp_path):
+    chemin = str(tmp_path / "journal.jsonl")
+    journal = SearchJournal(chemin)
+    journal.append("a", "LogisticRegression", {"C": 1}, 1.0, [0.5, 0.75], 0.1)
+    with open(chemin, "a", encoding="utf-8") as fichier:
+        fichier.write('{"key": "b", "sco')
+
+    repris = SearchJournal(chemin)
+    assert len(repris) == 1
+    assert repris.get("a") == [0.5, 0.75]
+    assert repris.get("b") is None
+
+    # L'entrée ajoutée après la reprise ne doit pas se retrouver sur la ligne tronquée
+    repris.append("c", "LogisticRegression", {"C": 2}, 1.0, [0.25], 0.1)
+    relu = SearchJournal(chemin)
+    assert relu.get("a") == [0.5, 0.75]
+    assert relu.get("c") == [0.25]
+
+    repris.clear()
+    assert len(SearchJournal(chemin)) == 0
+
+
+def test_reprise_apres_interruption(tmp_path):
+    X_train, _, y_train, _ = train_test(donnees(), SEED)
+    chemin = str(tmp_path / "journal.jsonl")
+    complet = cross_validate_models(
+        MODELES_TEST, X_train, y_train, n_jobs=1, journal=SearchJournal(chemin)
+    )
+    nb_candidats = sum(len(candidats) for candidats in complet.values())
+
+    # Recherche interrompue : seules les premières lignes du journal ont été écrites
+    with open(chemin, "r", encoding="utf-8") as fichier:
+        lignes = fichier.readlines()
+    assert len(lignes) == nb_candidats
+    with open(chemin, "w", encoding="utf-8") as fichier:
+        fichier.writelines(lignes[:2])
+
+    journal = SearchJournal(chemin)
+    repris = cross_validate_models(MODELES_TEST, X_train, y_train, n_jobs=1, journal=journal)
+    assert len(journal) == nb_candidats
+    assert repris == {
+        name: [(params, [float(score) for score in scores]) for params, scores in candidats]
+        for name, candidats in complet.items()
+    }
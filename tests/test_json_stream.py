@@ -0,0 +1,73 @@
+import json
+import pytest
+from src.preprocessing.json_stream import iter_json_items, write_json_items
+from src.preprocessing.preprocessing import iter_match_links, iter_stats_matches, load_data
+
+
+DONNEES = {
+    "match_1": {"lien_match": "https://a", "joueur_gagnant": {"aces": "12", "double_fautes": ""}},
+    "match_2": {"lien_match": "https://b", "joueur_gagnant": {"aces": -3.5e2, "ok": True, "rien": None}},
+    "match_3": {"lien_match": "https://é", "liste": [1, 22, 333], "vide": {}},
+}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 1 << 16])
+def test_iter_json_items_objet(tmp_path, chunk_size):
+    fichier = tmp_path / "stats.json"
+    fichier.write_text(json.dumps(DONNEES, ensure_ascii=False, indent=4), encoding="utf-8")
+
+    assert dict(iter_json_items(str(fichier), chunk_size)) == DONNEES
+
+
+@pytest.mark.parametrize("contenu, attendu", [("[]", []), ("{}", []), ('[1, "a", {"b": 2}]', [(0, 1), (1, "a"), (2, {"b": 2})])])
+def test_iter_json_items_cas_limites(tmp_path, contenu, attendu):
+    fichier = tmp_path / "donnees.json"
+    fichier.write_text(contenu, encoding="utf-8")
+
+    assert list(iter_json_items(str(fichier), chunk_size=1)) == attendu
+
+
+def test_iter_json_items_fichier_tronque(tmp_path):
+    fichier = tmp_path / "donnees.json"
+    fichier.write_text('{"a": 1, "b": [1, 2', encoding="utf-8")
+
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_items(str(fichier)))
+
+
+def test_write_json_items_meme_format_que_json_dump(tmp_path):
+    fichier = tmp_path / "stats.json"
+    write_json_items(str(fichier), DONNEES.items())
+
+    assert fichier.read_text(encoding="utf-8") == json.dumps(DONNEES, ensure_ascii=False, indent=4)
+
+
+def test_iter_stats_matches_remplace_les_vides(tmp_path):
+    fichier = tmp_path / "stats.json"
+    fichier.write_text(json.dumps(DONNEES), encoding="utf-8")
+
+    stats = dict(iter_stats_matches(str(fichier)))
+
+    assert stats["match_1"]["joueur_gagnant"]["double_fautes"] == "NA"
+    assert stats["match_2"] == DONNEES["match_2"]
+
+
+def test_iter_match_links_et_load_data(tmp_path):
+    joueurs = [{"nom_joueur": "Player 1"}, {"nom_joueur": "Player 2"}]
+    detail = {
+        "Player 1": {"matchs": [{"lien_detail_match": "https://a"}, {"lien_detail_match": "https://b"}]},
+        "Player 2": {"matchs": [{"lien_detail_match": "https://a"}]},
+    }
+    chemins = {}
+    for nom, contenu in [("joueurs", joueurs), ("detail", detail), ("stats", DONNEES)]:
+        chemins[nom] = tmp_path / f"{nom}.json"
+        chemins[nom].write_text(json.dumps(contenu), encoding="utf-8")
+
+    assert list(iter_match_links(str(chemins["detail"]))) == ["https://a", "https://b", "https://a"]
+
+    joueurs_data, detail_joueurs, stats_matches = load_data(
+        str(chemins["joueurs"]), str(chemins["detail"]), str(chemins["stats"])
+    )
+    assert joueurs_data == joueurs
+    assert detail_joueurs == detail
+    assert stats_matches["match_3"] == DONNEES["match_3"]
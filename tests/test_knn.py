@@ -0,0 +1,34 @@
+import numpy as np
+from sklearn.model_selection import GridSearchCV, ParameterGrid, StratifiedKFold
+from sklearn.datasets import make_classification
+from src.models.knn import ScaledKNNClassifier
+from src.models.models_selector import SEED, cross_validate_models, train_test
+from tests.test_models_selector import donnees
+
+GRILLE = {'n_neighbors': [3, 5, 7], 'weights': ['uniform', 'distance']}
+
+
+def test_score_candidates_comme_des_fits_separes():
+    X, y = make_classification(n_samples=200, n_features=6, random_state=SEED)
+    X[:, 0] *= 1000
+    train, test = np.arange(150), np.arange(150, 200)
+    candidats = list(ParameterGrid(GRILLE))
+
+    scores = ScaledKNNClassifier().score_candidates(candidats, X, y, train, test, inner_jobs=1)
+
+    for params, (score, duree) in zip(candidats, scores):
+        modele = ScaledKNNClassifier(**params).fit(X[train], y[train])
+        assert score == modele.score(X[test], y[test])
+        assert duree >= 0
+
+
+def test_recherche_knn_comme_grid_search():
+    X_train, _, y_train, _ = train_test(donnees(), SEED)
+    modeles = {'KNN': {'model': ScaledKNNClassifier(), 'param_grid': GRILLE}}
+
+    results = cross_validate_models(modeles, X_train, y_train, n_jobs=1)
+    grid = GridSearchCV(ScaledKNNClassifier(), GRILLE, cv=StratifiedKFold(5)).fit(X_train, y_train)
+
+    np.testing.assert_allclose(
+        [np.mean(scores) for _, scores in results['KNN']], grid.cv_results_['mean_test_score']
+    )
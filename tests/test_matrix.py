@@ -0,0 +1,39 @@
+import numpy as np
+import polars as pl
+from sklearn.model_selection import train_test_split
+from src.models.matrix import feature_matrix, shared_arrays
+from src.models.models_selector import SEED, train_test
+from tests.test_models_selector import donnees
+
+
+def test_feature_matrix():
+    df = pl.DataFrame({"a": [1, 2, 3], "b": [0.5, 1.5, 2.5], "target": [0, 1, 0]})
+    matrix = feature_matrix(df)
+
+    assert matrix.X.dtype == np.float32
+    assert matrix.X.flags.c_contiguous
+    assert matrix.feature_names == ["a", "b"]
+    assert matrix.X.tolist() == [[1, 0.5], [2, 1.5], [3, 2.5]]
+    assert matrix.y.tolist() == [0, 1, 0]
+
+
+def test_train_test_meme_decoupage():
+    df = donnees()
+    X_train, X_test, y_train, y_test = train_test(df, SEED)
+    # X_train et X_test partagent une seule matrice
+    assert X_train.base is X_test.base
+
+    X = df.drop("target").to_numpy()
+    y = df["target"].to_numpy()
+    attendu = train_test_split(X, y, test_size=0.2, random_state=SEED)
+    for obtenu, reference in zip((X_train, X_test, y_train, y_test), attendu):
+        np.testing.assert_allclose(obtenu, reference, rtol=1e-6)
+
+
+def test_shared_arrays():
+    X = np.arange(12, dtype=np.float32).reshape(4, 3)
+    with shared_arrays(X, X[:, 0]) as (X_shared, colonne):
+        assert isinstance(X_shared, np.memmap)
+        assert not X_shared.flags.writeable
+        np.testing.assert_array_equal(X_shared, X)
+        np.testing.assert_array_equal(colonne, X[:, 0])
@@ -0,0 +1,107 @@
+import numpy as np
+import polars as pl
+from sklearn.datasets import make_classification
+from sklearn.model_selection import GridSearchCV, ParameterGrid
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+from src.models.models_selector import (
+    SEED,
+    candidate_label,
+    cross_validate_models,
+    find_best_model,
+    near_best_candidates,
+    split_cpu_budget,
+    train_test,
+)
+
+MODELES_TEST = {
+    'LogisticRegression': {
+        'model': LogisticRegression(random_state=SEED, max_iter=1000),
+        'param_grid': {'C': [0.01, 1], 'solver': ['liblinear']},
+    },
+    'DecisionTreeClassifier': {
+        'model': DecisionTreeClassifier(random_state=SEED),
+        'param_grid': {'max_depth': [2, 5], 'min_samples_split': [2, 20]},
+    },
+}
+
+
+def donnees():
+    X, y = make_classification(n_samples=300, n_features=6, random_state=SEED)
+    df = pl.DataFrame(X, schema=[f"f{i}" for i in range(X.shape[1])])
+    return df.with_columns(pl.Series("target", y))
+
+
+def test_split_cpu_budget():
+    assert split_cpu_budget(8, 1) == (8, 1)
+    assert split_cpu_budget(8, 3) == (2, 3)
+    assert split_cpu_budget(2, 4) == (1, 2)
+
+
+def test_cross_validate_models_comme_grid_search():
+    X_train, _, y_train, _ = train_test(donnees(), SEED)
+    results = cross_validate_models(MODELES_TEST, X_train, y_train, n_jobs=2)
+
+    for name, config in MODELES_TEST.items():
+        grid = GridSearchCV(config['model'], config['param_grid'], cv=5, scoring='accuracy')
+        grid.fit(X_train, y_train)
+        means = [np.mean(scores) for _, scores in results[name]]
+        assert [params for params, _ in results[name]] == grid.cv_results_['params']
+        np.testing.assert_allclose(means, grid.cv_results_['mean_test_score'])
+
+
+def test_find_best_model():
+    results = find_best_model(donnees(), SEED, n_jobs=2, models=MODELES_TEST)
+
+    assert set(results) == {'model_name', 'best_model', 'accuracy', 'profiles', 'pareto_front'}
+    assert results['model_name'] in results['profiles']
+    assert results['model_name'].split(" (")[0] in MODELES_TEST
+    assert 0.5 < results['accuracy'] <= 1
+    # Au moins le meilleur candidat de chaque modèle est profilé
+    assert {label.split(" (")[0] for label in results['profiles']} == set(MODELES_TEST)
+
+
+def test_near_best_candidates():
+    cv_results = {
+        'RandomForestClassifier': [
+            ({'n_estimators': 100}, [0.81, 0.82, 0.79, 0.81, 0.81]),
+            ({'n_estimators': 800}, [0.81, 0.83, 0.79, 0.81, 0.81]),
+            ({'n_estimators': 10}, [0.60, 0.62, 0.58, 0.60, 0.60]),
+        ],
+        'LogisticRegression': [({'C': 1}, [0.7] * 5), ({'C': 10}, [0.7] * 5)],
+    }
+    # Le candidat à 100 arbres est dans le bruit du meilleur, pas celui à 10 arbres ;
+    # à scores identiques, l'ordre de la grille est gardé
+    assert near_best_candidates(cv_results) == [
+        ('RandomForestClassifier', {'n_estimators': 800}),
+        ('RandomForestClassifier', {'n_estimators': 100}),
+        ('LogisticRegression', {'C': 1}),
+        ('LogisticRegression', {'C': 10}),
+    ]
+    assert candidate_label('LogisticRegression', {'solver': 'liblinear', 'C': 1}) == (
+        "LogisticRegression (C=1, solver=liblinear)"
+    )
+
+
+def test_strategies_de_recherche():
+    X_train, _, y_train, _ = train_test(donnees(), SEED)
+    grilles = {name: len(list(ParameterGrid(config['param_grid']))) for name, config in MODELES_TEST.items()}
+
+    halving = cross_validate_models(MODELES_TEST, X_train, y_train, n_jobs=1, strategy='halving', factor=2)
+    # 4 candidats -> 2 gardés pour le tour à plein budget ; 2 candidats -> un seul tour
+    assert len(halving['DecisionTreeClassifier']) == 2
+    assert len(halving['LogisticRegression']) == 2
+
+    tpe = cross_validate_models(
+        MODELES_TEST, X_train, y_train, n_jobs=1, strategy='tpe', n_trials=3, seed=SEED
+    )
+    assert {name: len(candidates) for name, candidates in tpe.items()} == {
+        name: min(3, n) for name, n in grilles.items()
+    }
+    assert all(len(scores) == 5 for candidates in tpe.values() for _, scores in candidates)
+
+
+def test_find_best_model_meme_format_pour_chaque_strategie():
+    for strategy in ('halving', 'tpe'):
+        results = find_best_model(donnees(), SEED, n_jobs=1, models=MODELES_TEST, strategy=strategy)
+        assert set(results) == {'model_name', 'best_model', 'accuracy', 'profiles', 'pareto_front'}
@@ -0,0 +1,116 @@
+from datetime import timedelta
+import numpy as np
+from joblib import dump, load
+import src.models.retrain as retrain_module
+from src.models.out_of_core import (
+    OUT_OF_CORE_MODELS,
+    ScaledSGDClassifier,
+    find_best_model_out_of_core,
+    iter_batches,
+    train_sgd,
+    train_xgboost,
+)
+from src.models.retrain import (
+    features_and_target,
+    record_version,
+    retrain,
+    save_manifest,
+    supports_incremental,
+)
+from tests.test_retrain import DEBUT, dataset
+
+
+def parquet(tmp_path, n=1000):
+    chemin = str(tmp_path / "dataset.parquet")
+    dataset(n).write_parquet(chemin, row_group_size=100)
+    return chemin
+
+
+def test_iter_batches_decoupage_stable(tmp_path):
+    chemin = parquet(tmp_path)
+    train = [X for X, _ in iter_batches(chemin, 1, "train", batch_size=100)]
+    test = [X for X, _ in iter_batches(chemin, 1, "test", batch_size=100)]
+
+    assert all(X.dtype == np.float32 and X.shape[1] == 5 for X in train + test)
+    assert sum(len(X) for X in train) + sum(len(X) for X in test) == 1000
+    assert 100 < sum(len(X) for X in test) < 300
+    relu = [X for X, _ in iter_batches(chemin, 1, "test", batch_size=100)]
+    assert all(np.array_equal(a, b) for a, b in zip(test, relu))
+
+
+def test_find_best_model_out_of_core(tmp_path):
+    chemin = parquet(tmp_path)
+    modeles = {
+        'XGBoost': {**OUT_OF_CORE_MODELS['XGBoost'], 'num_boost_round': 20},
+        'SGDClassifier': OUT_OF_CORE_MODELS['SGDClassifier'],
+    }
+    results = find_best_model_out_of_core(chemin, 1, modeles, batch_size=100)
+
+    assert set(results) == {'model_name', 'best_model', 'accuracy', 'profiles', 'pareto_front'}
+    assert results['accuracy'] > 0.7
+    assert set(results['profiles']) == set(modeles)
+    assert {'accuracy', 'fit_seconds', 'predict_p99_ms', 'size_mb'} <= set(results['profiles']['XGBoost'])
+    assert results['pareto_front'] and set(results['pareto_front']) <= set(modeles)
+
+    dump(results['best_model'], tmp_path / "model.joblib")
+    modele = load(tmp_path / "model.joblib")
+    X, _ = next(iter_batches(chemin, 1, "test", batch_size=100))
+    proba = modele.predict_proba(X)
+    assert proba.shape == (len(X), 2)
+    np.testing.assert_allclose(proba.sum(axis=1), 1, rtol=1e-6)
+
+
+def test_reentrainement_complet_des_modeles_hors_memoire(tmp_path, monkeypatch):
+    chemin = parquet(tmp_path)
+    df = dataset(350)
+    model_path, manifest_path = str(tmp_path / "model.joblib"), str(tmp_path / "model.json")
+
+    for trainer, params in ((train_xgboost, {'max_depth': 3, 'num_boost_round': 20}), (train_sgd, {'epochs': 2})):
+        modele = trainer(chemin, 1, 100, None, **params)
+        dump(modele, model_path)
+        manifest = {"versions": []}
+        record_version(manifest, df.head(300), "search", modele, accuracy=0.8, today=DEBUT)
+        save_manifest(manifest, manifest_path)
+
+        version = retrain(df, model_path, manifest_path, today=DEBUT + timedelta(days=1), force_full=True)
+        assert version["mode"] == "full"
+        reentraine = load(model_path)
+        assert type(reentraine) is type(modele)
+        assert reentraine.get_params() == modele.get_params()
+        assert reentraine.predict_proba(features_and_target(df)[0]).shape == (350, 2)
+
+    # Avec le fichier Parquet, le réentraînement complet le relit par paquets
+    def sans_matrice_complete(*args):
+        raise AssertionError("dataset chargé en une seule matrice")
+
+    monkeypatch.setattr(retrain_module, "_full_fit", sans_matrice_complete)
+    version = retrain(
+        dataset(400), model_path, manifest_path, today=DEBUT + timedelta(days=2), force_full=True,
+        dataset_path=chemin,
+    )
+    assert version["mode"] == "full"
+    reentraine = load(model_path)
+    assert isinstance(reentraine, ScaledSGDClassifier) and reentraine.epochs == 2
+    X, y = next(iter_batches(chemin, 1, "test", batch_size=100))
+    assert (reentraine.predict(X) == y).mean() > 0.6
+
+
+def test_mise_a_jour_incrementale_des_modeles_hors_memoire(tmp_path):
+    chemin = parquet(tmp_path)
+    df = dataset(350)
+    model_path, manifest_path = str(tmp_path / "model.joblib"), str(tmp_path / "model.json")
+
+    booster = train_xgboost(chemin, 1, 100, None, max_depth=3, num_boost_round=20)
+    sgd = train_sgd(chemin, 1, 100, None, epochs=2)
+    for modele in (booster, sgd):
+        assert supports_incremental(modele)
+        dump(modele, model_path)
+        manifest = {"versions": []}
+        record_version(manifest, df.head(300), "search", modele, accuracy=0.0, today=DEBUT)
+        save_manifest(manifest, manifest_path)
+
+        version = retrain(df, model_path, manifest_path, today=DEBUT + timedelta(days=1), dataset_path=chemin)
+        assert version["mode"] == "incremental"
+        if modele is booster:
+            # Arbres ajoutés au booster existant (au moins MIN_EXTRA_ESTIMATORS)
+            assert load(model_path).booster_.num_boosted_rounds() == 30
@@ -6,7 +6,12 @@ from src.preprocessing.preprocessing import (
     calculate_average_stat_absolue,
     get_tournament_category,
     modify_players,
-    replace_empty_values_with_na
+    replace_empty_values_with_na,
+    raw_dataset_schema,
+    write_training_dataset,
+    build_clean_dataset,
+    build_app_dataset,
+    build_prediction_features,
 )
 import pytest
 
@@ -180,3 +185,289 @@ def test_pipeline_integration():
 
     assert modified_df.shape[0] == 2, "Échec : le dataset modifié devrait contenir deux lignes"
     assert set(modified_df["target"]) == {1, 0}, "Échec : les cibles devraient inclure 1 et 0"
+
+
+def donnees_deux_joueurs():
+    joueurs_data = [
+        {"nom_joueur": "Player 1", "age": "25 ans", "rank": "1.", "points": "9000"},
+        {"nom_joueur": "Player 2", "age": "30 ans", "rank": "2.", "points": "8000"},
+    ]
+    lien_1 = "https://www.tennisendirect.net/atp/match/p1-VS-p2/open-2024/"
+    lien_2 = "https://www.tennisendirect.net/atp/match/p2-VS-p1/cup-2024/"
+    matchs_1 = [
+        {"date": "10.10.24", "nom_opposant": "Player 2", "score": "7-64, 6-3", "resultat": "victoire",
+         "lien_detail_match": lien_1, "tournoi": "Australian Open", "type_terrain": "dure"},
+        {"date": "01.09.24", "nom_opposant": "Player 2", "score": "6-4, 3-6, 6-2", "resultat": "défaite",
+         "lien_detail_match": lien_2, "tournoi": "Unknown Cup", "type_terrain": "terre battue"},
+    ]
+    matchs_2 = [
+        {"date": "10.10.24", "nom_opposant": "Player 1", "score": "7-64, 6-3", "resultat": "défaite",
+         "lien_detail_match": lien_1, "tournoi": "Australian Open", "type_terrain": "dure"},
+        {"date": "01.09.24", "nom_opposant": "Player 1", "score": "6-4, 3-6, 6-2", "resultat": "victoire",
+         "lien_detail_match": lien_2, "tournoi": "Unknown Cup", "type_terrain": "terre battue"},
+    ]
+    detail_joueurs = {
+        "Player 1": {"profil": {"nom": "Player 1"}, "matchs": matchs_1},
+        "Player 2": {"profil": {"nom": "Player 2"}, "matchs": matchs_2},
+    }
+    stats_joueur = {
+        "premier_service": "30/50 (60%)", "pnts_gagnes_ps": "20/30 (67%)",
+        "pnts_gagnes_ss": "10/20 (50%)", "balles_break_gagnees": "2/5 (40%)",
+        "retours_gagnes": "20/50 (40%)", "total_points_gagnes": "60/100 (60%)",
+        "double_fautes": "2", "aces": "5",
+    }
+    stats_matches = {
+        "match_1": {
+            "lien_match": lien_1,
+            "joueur_gagnant": {"nom_joueur": "Player 1", **stats_joueur},
+            "joueur_perdant": {"nom_joueur": "Player 2", **stats_joueur},
+        },
+        "match_2": {
+            "lien_match": lien_2,
+            "joueur_gagnant": {"nom_joueur": "Player 2", **stats_joueur},
+            "joueur_perdant": {"nom_joueur": "Player 1", **stats_joueur},
+        },
+    }
+    return joueurs_data, detail_joueurs, stats_matches
+
+
+def test_write_training_dataset(tmp_path):
+    import polars as pl
+    import pyarrow.parquet as pq
+
+    joueurs_data, detail_joueurs, stats_matches = donnees_deux_joueurs()
+    output_file = tmp_path / "tennis_dataset_raw.parquet"
+
+    nb_rows = write_training_dataset(
+        joueurs_data, detail_joueurs, stats_matches, str(output_file), batch_size=3
+    )
+
+    assert nb_rows == 4
+    fichier = pq.ParquetFile(output_file)
+    assert fichier.schema_arrow == raw_dataset_schema()
+    assert fichier.num_row_groups == 2
+
+    df = pl.read_parquet(output_file)
+    attendu = create_training_dataset(joueurs_data, detail_joueurs, stats_matches)
+    assert df.select(attendu.columns).cast(attendu.schema).equals(attendu)
+
+
+def test_build_clean_dataset(tmp_path):
+    import polars as pl
+
+    joueurs_data, detail_joueurs, stats_matches = donnees_deux_joueurs()
+    raw_file = tmp_path / "tennis_dataset_raw.parquet"
+    write_training_dataset(joueurs_data, detail_joueurs, stats_matches, str(raw_file))
+    raw = pl.scan_parquet(raw_file).filter(pl.col("player1_name") == "Player 1")
+
+    df = build_clean_dataset(raw).collect(streaming=True)
+
+    assert df.shape[0] == 4, "Échec : chaque match doit apparaître des deux côtés"
+    assert df.group_by("date").agg(pl.col("target").sum())["target"].to_list() == [1, 1]
+    assert (df["ranking_diff"] == df["player1_ranking"] - df["player2_ranking"]).all()
+    assert (df["win_rate_tiebreak_diff"] == df["player1_win_rate_tiebreak"] - df["player2_win_rate_tiebreak"]).all()
+    assert df["player1_age"].dtype == pl.Int64
+    assert "url_match" not in df.columns and "surface" not in df.columns
+
+
+def test_modify_players_equilibre():
+    import polars as pl
+
+    df = pl.DataFrame(
+        {
+            "player1_name": [f"A{i}" for i in range(10)],
+            "player2_name": [f"B{i}" for i in range(10)],
+            "target": [1] * 8 + [0] * 2,
+        }
+    )
+    modified_df = modify_players(df, seed=1)
+
+    assert modified_df["target"].sum() == 5
+    inverses = modified_df.filter(pl.col("player1_name").str.starts_with("B"))
+    assert inverses.shape[0] == 3 and (inverses["target"] == 0).all()
+    assert modified_df.equals(modify_players(df, seed=1))
+
+
+def test_build_app_dataset():
+    import polars as pl
+
+    clean = pl.DataFrame(
+        {
+            "player1_name": ["A", "B", "A"],
+            "player1_ranking": [1, 2, 3],
+            "player2_name": ["B", "C", "C"],
+            "player2_ranking": [10, 20, 30],
+            "target": [1, 0, 1],
+            "date": ["01.01.24", "05.01.24", "03.01.24"],
+        }
+    )
+
+    df = build_app_dataset(clean.lazy()).collect().sort("player1_name")
+
+    assert df.columns == ["player1_name", "player1_ranking"]
+    assert df.rows() == [("A", 3), ("B", 2), ("C", 20)]
+
+
+def test_build_prediction_features():
+    joueurs_data, detail_joueurs, stats_matches = donnees_deux_joueurs()
+    clean = build_clean_dataset(create_training_dataset(joueurs_data, detail_joueurs, stats_matches).lazy()).collect()
+    ligne = clean.row(0, named=True)
+    player1 = {key.removeprefix("player1_"): value for key, value in ligne.items() if key.startswith("player1_")}
+    player2 = {key.removeprefix("player2_"): value for key, value in ligne.items() if key.startswith("player2_")}
+    surface = "dure" if ligne["surface_dure"] else "terre battue"
+
+    features = build_prediction_features(player1, player2, ligne["tournament_category"], surface)
+
+    attendu = clean.head(1).drop("player1_name", "player2_name", "date", "target")
+    assert features.columns == attendu.columns
+    assert features.rows() == attendu.rows()
+
+
+def test_write_training_dataset_classement_asof(tmp_path):
+    import datetime
+    import polars as pl
+    from src.preprocessing.rankings import scan_ranking_snapshots, write_ranking_snapshot
+
+    joueurs_data, detail_joueurs, stats_matches = donnees_deux_joueurs()
+    root = str(tmp_path / "classements")
+    ancien_classement = [
+        {"nom_joueur": "Player 1", "rank": "10.", "points": "2000", "age": "24 ans"},
+        {"nom_joueur": "Player 2", "rank": "20.", "points": "1000", "age": "29 ans"},
+    ]
+    write_ranking_snapshot(ancien_classement, datetime.date(2024, 8, 1), root)
+    write_ranking_snapshot(joueurs_data, datetime.date(2024, 10, 1), root)
+    output_file = tmp_path / "tennis_dataset_raw.parquet"
+
+    write_training_dataset(
+        joueurs_data,
+        detail_joueurs,
+        stats_matches,
+        str(output_file),
+        ranking_snapshots=scan_ranking_snapshots(root),
+    )
+
+    df = pl.read_parquet(output_file).sort("date", "player1_name")
+    lignes = df.select("date", "player1_name", "player1_ranking", "player1_age").rows()
+    assert lignes == [
+        ("01.09.24", "Player 1", 10, 24),
+        ("01.09.24", "Player 2", 20, 29),
+        ("10.10.24", "Player 1", 1, 25),
+        ("10.10.24", "Player 2", 2, 30),
+    ]
+    # Adversaire affronté le 01.09, quand il était classé 20e (et non 2e aujourd'hui)
+    opposition = df.filter(pl.col("date") == "10.10.24").select(
+        "player1_name", "player1_avg_opponent_ranking"
+    )
+    assert opposition.rows() == [("Player 1", 20.0), ("Player 2", 10.0)]
+
+
+def test_select_match_links(tmp_path):
+    import json
+    from datetime import datetime
+    from src.preprocessing.preprocessing import select_match_links
+
+    joueurs_data, detail_joueurs, _ = donnees_deux_joueurs()
+    lien_1 = detail_joueurs["Player 1"]["matchs"][0]["lien_detail_match"]
+    lien_2 = detail_joueurs["Player 1"]["matchs"][1]["lien_detail_match"]
+    # Adversaire absent de joueurs.json : le match compte dans les moyennes de Player 1
+    detail_joueurs["Player 1"]["matchs"].append(
+        {"date": "05.10.24", "nom_opposant": "Player 3", "score": "6-1, 6-1", "resultat": "victoire",
+         "lien_detail_match": "https://p1-VS-p3", "tournoi": "Cup", "type_terrain": "dure"}
+    )
+    # Aucun des deux joueurs suivi : le match ne sert à aucune variable
+    detail_joueurs["Player 3"] = {
+        "profil": {"nom": "Player 3"},
+        "matchs": [
+            {"date": "06.10.24", "nom_opposant": "Player 4", "score": "6-1, 6-1", "resultat": "victoire",
+             "lien_detail_match": "https://p3-VS-p4", "tournoi": "Cup", "type_terrain": "dure"}
+        ],
+    }
+    joueurs_file, detail_file = tmp_path / "joueurs.json", tmp_path / "detail_joueurs.json"
+    joueurs_file.write_text(json.dumps(joueurs_data), encoding="utf-8")
+    detail_file.write_text(json.dumps(detail_joueurs), encoding="utf-8")
+
+    links, report = select_match_links(str(detail_file), str(joueurs_file))
+    assert links == [lien_1, lien_2, "https://p1-VS-p3"]
+    assert report == {"total": 4, "joueur_non_suivi": 1, "hors_fenetre": 0, "deja_stocke": 0, "a_recuperer": 3}
+
+    links, report = select_match_links(
+        str(detail_file), str(joueurs_file), stored_links={lien_1}, date_min=datetime(2024, 10, 1)
+    )
+    assert links == ["https://p1-VS-p3"]
+    assert (report["deja_stocke"], report["hors_fenetre"]) == (1, 1)
+
+
+def test_write_training_dataset_etat_incremental(tmp_path):
+    import copy
+    import polars as pl
+    from src.preprocessing.preprocessing import build_match_stream, load_incremental_state
+
+    joueurs_data, detail_joueurs, stats_matches = donnees_deux_joueurs()
+    ratings_file, form_file = str(tmp_path / "elo.npz"), str(tmp_path / "form.npz")
+    complet_file = tmp_path / "complet.parquet"
+    write_training_dataset(joueurs_data, detail_joueurs, stats_matches, str(complet_file))
+
+    # Premier passage avec le match du 01.09 seulement, états sauvegardés
+    detail_partiel = copy.deepcopy(detail_joueurs)
+    for joueur in detail_partiel.values():
+        joueur["matchs"] = [match for match in joueur["matchs"] if match["date"] == "01.09.24"]
+    ratings, form = load_incremental_state(build_match_stream(detail_partiel), ratings_file, form_file)
+    assert len(ratings.seen_matches) == 0
+    write_training_dataset(
+        joueurs_data, detail_partiel, stats_matches, str(tmp_path / "partiel.parquet"),
+        ratings=ratings, form=form,
+    )
+    ratings.save(ratings_file)
+    form.save(form_file)
+
+    # Second passage : seul le match du 10.10 est appliqué aux états rechargés
+    ratings, form = load_incremental_state(build_match_stream(detail_joueurs), ratings_file, form_file)
+    assert len(ratings.seen_matches) == len(form.seen_matches) == 1
+    incremental_file = tmp_path / "incremental.parquet"
+    write_training_dataset(
+        joueurs_data, detail_joueurs, stats_matches, str(incremental_file), ratings=ratings, form=form
+    )
+
+    assert pl.read_parquet(incremental_file).equals(pl.read_parquet(complet_file))
+
+
+def test_load_incremental_state_match_anterieur(tmp_path):
+    import copy
+    from src.preprocessing.preprocessing import build_match_stream, load_incremental_state
+
+    joueurs_data, detail_joueurs, stats_matches = donnees_deux_joueurs()
+    ratings_file, form_file = str(tmp_path / "elo.npz"), str(tmp_path / "form.npz")
+
+    # États sauvegardés avec le match du 10.10 : celui du 01.09 arrive trop tard
+    detail_partiel = copy.deepcopy(detail_joueurs)
+    for joueur in detail_partiel.values():
+        joueur["matchs"] = [match for match in joueur["matchs"] if match["date"] == "10.10.24"]
+    ratings, form = load_incremental_state(build_match_stream(detail_partiel), ratings_file, form_file)
+    ratings.update_from_stream(build_match_stream(detail_partiel))
+    form.update_from_stream(build_match_stream(detail_partiel), stats_matches)
+    ratings.save(ratings_file)
+    form.save(form_file)
+
+    ratings, form = load_incremental_state(build_match_stream(detail_joueurs), ratings_file, form_file)
+    assert len(ratings.seen_matches) == len(form.seen_matches) == 0
+
+
+def test_write_training_dataset_fenetre_de_forme(tmp_path, monkeypatch):
+    import pyarrow.parquet as pq
+    import src.preprocessing.preprocessing as pre
+    from src.preprocessing.form import RollingForm, form_keys
+
+    joueurs_data, detail_joueurs, stats_matches = donnees_deux_joueurs()
+    output_file = tmp_path / "tennis_dataset_raw.parquet"
+
+    write_training_dataset(
+        joueurs_data, detail_joueurs, stats_matches, str(output_file), form=RollingForm(window=3)
+    )
+    schema = pq.ParquetFile(output_file).schema_arrow
+    assert schema == raw_dataset_schema(3)
+    assert {f"player1_{key}" for key in form_keys(3)} <= set(schema.names)
+
+    # Une colonne produite mais absente du schéma n'est pas perdue sans erreur
+    monkeypatch.setattr(pre, "raw_dataset_schema", lambda window: raw_dataset_schema(window).remove(0))
+    with pytest.raises(ValueError, match="player1_name"):
+        write_training_dataset(joueurs_data, detail_joueurs, stats_matches, str(output_file))
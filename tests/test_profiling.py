@@ -0,0 +1,32 @@
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from src.models.profiling import pareto_front, profile_model, select_model
+
+PROFILS = {
+    'Foret': {'accuracy': 0.66, 'predict_p99_ms': 40.0, 'size_mb': 300.0},
+    'Boosting': {'accuracy': 0.655, 'predict_p99_ms': 2.0, 'size_mb': 1.0},
+    'Arbre': {'accuracy': 0.60, 'predict_p99_ms': 0.5, 'size_mb': 0.1},
+    'KNN': {'accuracy': 0.58, 'predict_p99_ms': 30.0, 'size_mb': 50.0},
+}
+
+
+def test_profile_model():
+    X = np.random.default_rng(1).normal(size=(50, 3))
+    modele = LogisticRegression().fit(X, X[:, 0] > 0)
+    profil = profile_model(modele, X, repeats=20)
+
+    assert set(profil) == {"predict_p50_ms", "predict_p99_ms", "predict_batch_ms", "size_mb"}
+    assert 0 < profil["predict_p50_ms"] <= profil["predict_p99_ms"]
+    assert 0 < profil["size_mb"] < 1
+
+
+def test_pareto_front():
+    # KNN est moins précis, plus lent et plus gros que Boosting
+    assert pareto_front(PROFILS) == ['Foret', 'Boosting', 'Arbre']
+
+
+def test_select_model():
+    assert select_model(PROFILS) == 'Foret'
+    assert select_model(PROFILS, accuracy_tolerance=0.01) == 'Boosting'
+    assert select_model(PROFILS, max_latency_ms=10, max_size_mb=0.5) == 'Arbre'
+    assert select_model(PROFILS, max_latency_ms=0.1) is None
@@ -0,0 +1,63 @@
+from datetime import date
+import polars as pl
+from src.preprocessing.rankings import (
+    join_rankings_asof,
+    parse_ranking_snapshot,
+    rankings_asof,
+    scan_ranking_snapshots,
+    write_ranking_snapshot,
+)
+
+
+SEMAINE_1 = [
+    {"nom_joueur": "A", "rank": "1.", "points": "9000", "age": "25 ans"},
+    {"nom_joueur": "B", "rank": "2.", "points": "8000", "age": "30 ans"},
+]
+SEMAINE_2 = [
+    {"nom_joueur": "A", "rank": "2.", "points": "8500", "age": "25 ans"},
+    {"nom_joueur": "C", "rank": "1.", "points": "9500", "age": "20 ans"},
+]
+
+
+def test_parse_ranking_snapshot():
+    snapshot = parse_ranking_snapshot(
+        SEMAINE_1 + [{"nom_joueur": "D", "rank": "1.234.", "points": "NA", "age": "NA"}]
+    )
+
+    assert snapshot.row(0) == ("A", 1, 9000, 25)
+    assert snapshot.row(2) == ("D", 1234, None, None)
+
+
+def test_write_ranking_snapshot_n_ecrit_que_les_changements(tmp_path):
+    root = str(tmp_path / "classements")
+
+    assert scan_ranking_snapshots(root).collect().height == 0
+    assert write_ranking_snapshot(SEMAINE_1, date(2024, 1, 1), root) == 2
+    # A change, C arrive, B sort du classement
+    assert write_ranking_snapshot(SEMAINE_2, date(2024, 1, 8), root) == 3
+    assert write_ranking_snapshot(SEMAINE_2, date(2024, 1, 15), root) == 0
+
+    snapshots = scan_ranking_snapshots(root)
+    assert rankings_asof(snapshots, date(2024, 1, 7))["nom_joueur"].to_list() == ["A", "B"]
+    assert rankings_asof(snapshots, date(2024, 1, 20)).rows() == [
+        ("C", 1, 9500, 20),
+        ("A", 2, 8500, 25),
+    ]
+
+
+def test_join_rankings_asof(tmp_path):
+    root = str(tmp_path / "classements")
+    write_ranking_snapshot(SEMAINE_1, date(2024, 1, 1), root)
+    write_ranking_snapshot(SEMAINE_2, date(2024, 1, 8), root)
+
+    matches = pl.DataFrame(
+        {
+            "player": ["A", "B", "A", "B"],
+            "date": [date(2024, 1, 9), date(2024, 1, 9), date(2023, 12, 1), date(2024, 1, 3)],
+        }
+    )
+    joined = join_rankings_asof(matches, scan_ranking_snapshots(root))
+
+    assert joined["player"].to_list() == ["A", "B", "A", "B"]
+    assert joined["ranking"].to_list() == [2, None, None, 2]
+    assert joined["points"].to_list() == [8500, None, None, 8000]
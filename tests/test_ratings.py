@@ -0,0 +1,98 @@
+import polars as pl
+import pytest
+from src.preprocessing.ratings import EloRatings, INITIAL_RATING
+from src.preprocessing.preprocessing import build_match_stream
+
+
+def flux_matchs():
+    return pl.DataFrame(
+        {
+            "lien_detail_match": ["m1", "m2", "m3", "m4"],
+            "winner": ["A", "B", "A", "C"],
+            "loser": ["B", "C", "C", "A"],
+            "surface": ["dure", "terre battue", "dure", "gazon"],
+        }
+    )
+
+
+def test_update_renvoie_le_classement_avant_match():
+    elo = EloRatings()
+    pre_match = elo.update("A", "B", "dure", match_id="m1")
+
+    assert pre_match == {
+        "winner_elo": INITIAL_RATING,
+        "loser_elo": INITIAL_RATING,
+        "winner_elo_surface": INITIAL_RATING,
+        "loser_elo_surface": INITIAL_RATING,
+    }
+    assert elo.rating("A") > INITIAL_RATING > elo.rating("B")
+    assert elo.rating("A", "dure") == elo.rating("A")
+    assert elo.rating("A", "gazon") == INITIAL_RATING
+    assert elo.rating("A") + elo.rating("B") == pytest.approx(2 * INITIAL_RATING)
+    assert elo.rating("Inconnu") == INITIAL_RATING
+
+
+def test_update_ignore_les_matchs_deja_vus():
+    elo = EloRatings()
+    elo.update("A", "B", "dure", match_id="m1")
+    rating_a = elo.rating("A")
+
+    assert elo.update("A", "B", "dure", match_id="m1") is None
+    assert elo.rating("A") == rating_a
+
+
+def test_capacite_agrandie():
+    elo = EloRatings(capacity=1)
+    for i in range(10):
+        elo.update(f"J{i}", f"J{i + 1}", "salle")
+
+    assert len(elo.players) == 11
+    assert elo.rating("J0") > INITIAL_RATING
+
+
+def test_mise_a_jour_incrementale_identique(tmp_path):
+    complet = EloRatings()
+    pre_match_complet = complet.update_from_stream(flux_matchs())
+
+    partiel = EloRatings()
+    partiel.update_from_stream(flux_matchs().head(2))
+    partiel.save(str(tmp_path / "elo.npz"))
+    recharge = EloRatings.load(str(tmp_path / "elo.npz"))
+    pre_match_nouveaux = recharge.update_from_stream(flux_matchs())
+
+    assert pre_match_nouveaux["lien_detail_match"].to_list() == ["m3", "m4"]
+    assert pre_match_nouveaux.equals(pre_match_complet.tail(2))
+    for joueur in ["A", "B", "C"]:
+        for surface in [None, "dure", "gazon"]:
+            assert recharge.rating(joueur, surface) == pytest.approx(complet.rating(joueur, surface))
+
+
+def test_build_match_stream():
+    detail_joueurs = {
+        "A": {"matchs": [
+            {"date": "05.01.24", "nom_opposant": "B", "resultat": "défaite", "lien_detail_match": "m2",
+             "type_terrain": "dure", "tournoi": "T", "score": "6-4, 6-4"},
+            {"date": "01.01.24", "nom_opposant": "B", "resultat": "victoire", "lien_detail_match": "m1",
+             "type_terrain": "dure", "tournoi": "T", "score": "6-4, 6-4"},
+        ]},
+        "B": {"matchs": [
+            {"date": "05.01.24", "nom_opposant": "A", "resultat": "victoire", "lien_detail_match": "m2",
+             "type_terrain": "dure", "tournoi": "T", "score": "6-4, 6-4"},
+        ]},
+    }
+
+    stream = build_match_stream(detail_joueurs)
+
+    assert stream["lien_detail_match"].to_list() == ["m1", "m2"]
+    assert stream.select("winner", "loser").rows() == [("A", "B"), ("B", "A")]
+
+
+def test_classements_avant_match_apres_rechargement(tmp_path):
+    complet = EloRatings()
+    pre_match_complet = complet.update_from_stream(flux_matchs())
+    complet.save(str(tmp_path / "elo.npz"))
+    recharge = EloRatings.load(str(tmp_path / "elo.npz"))
+
+    for row in pre_match_complet.iter_rows(named=True):
+        assert recharge.pre_match(row.pop("lien_detail_match")) == row
+    assert recharge.pre_match("inconnu") is None
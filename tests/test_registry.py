@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from src.models.compact import compile_model
+from src.models.registry import ModelRegistry, PromotedModel
+
+
+def donnees():
+    return make_classification(n_samples=200, n_features=5, random_state=2)
+
+
+def test_register_promote_load(tmp_path):
+    X, y = donnees()
+    registry = ModelRegistry(str(tmp_path))
+    assert registry.promoted() is None
+    with pytest.raises(FileNotFoundError):
+        registry.load()
+
+    modele = LogisticRegression().fit(X, y)
+    version = registry.register(modele, ["f0", "f1"], "empreinte", {"accuracy": 0.9}, mode="search")
+    assert registry.versions() == ["v0001"] and registry.promoted() is None
+
+    registry.promote(version)
+    charge, metadata = registry.load()
+    np.testing.assert_allclose(charge.predict_proba(X), modele.predict_proba(X))
+    assert metadata["features"] == ["f0", "f1"]
+    assert metadata["fingerprint"] == "empreinte"
+    assert metadata["metrics"] == {"accuracy": 0.9} and metadata["mode"] == "search"
+
+    assert registry.register(modele, None, "autre", {}, promote=True) == "v0002"
+    assert registry.promoted() == "v0002"
+    with pytest.raises(ValueError):
+        registry.promote("v0099")
+
+
+def test_artefact_compact_en_memmap(tmp_path):
+    X, y = donnees()
+    registry = ModelRegistry(str(tmp_path))
+    foret = RandomForestClassifier(n_estimators=10, random_state=1).fit(X, y)
+    registry.register(foret, None, "empreinte", {}, promote=True)
+
+    # Le modèle compilé est enregistré avec la version et servi en priorité
+    compact, metadata = registry.load()
+    assert metadata["artifacts"] == ["model", "compact"]
+    assert isinstance(compact.threshold, np.memmap)
+    np.testing.assert_allclose(compact.predict_proba(X), foret.predict_proba(X), atol=1e-5)
+
+    # Un modèle linéaire n'a pas de version compilée
+    registry.register(LogisticRegression().fit(X, y), None, "lineaire", {}, promote=True)
+    assert registry.load()[1]["artifacts"] == ["model"]
+
+    version = registry.versions()[0]
+    registry.add_artifact(version, "compact", compile_model(foret, prune_tol=0.1))
+    assert registry.metadata(version)["artifacts"] == ["model", "compact"]
+
+
+def test_promoted_model_remplace_la_version(tmp_path):
+    X, y = donnees()
+    registry = ModelRegistry(str(tmp_path))
+    with pytest.raises(FileNotFoundError):
+        PromotedModel(registry)
+
+    premier = LogisticRegression(C=0.01).fit(X, y)
+    registry.register(premier, None, "a", {}, promote=True)
+    servi = PromotedModel(registry, check_interval=3600)
+    assert servi.version == "v0001"
+
+    second = LogisticRegression(C=100).fit(X, y)
+    registry.register(second, None, "b", {}, promote=True)
+    # Pas encore vérifié : l'ancienne version reste servie
+    assert servi.get()[1]["fingerprint"] == "a"
+
+    servi.refresh(wait=True)
+    modele, metadata = servi.get()
+    assert servi.version == "v0002" and metadata["fingerprint"] == "b"
+    np.testing.assert_allclose(modele.predict_proba(X), second.predict_proba(X))
+
+    # Retour arrière : promouvoir une ancienne version
+    registry.promote("v0001")
+    servi.refresh(wait=True)
+    assert servi.version == "v0001"
@@ -0,0 +1,111 @@
+from datetime import date, timedelta
+import polars as pl
+import xgboost as xgb
+from joblib import dump, load
+from sklearn.datasets import make_classification
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+from sklearn.neighbors import KNeighborsClassifier
+from src.models.retrain import (
+    FULL_RETRAIN_DAYS,
+    features_and_target,
+    full_retrain_reason,
+    incremental_fit,
+    load_manifest,
+    new_rows,
+    record_version,
+    retrain,
+    save_manifest,
+)
+
+DEBUT = date(2024, 1, 1)
+
+
+def dataset(n=300):
+    X, y = make_classification(n_samples=n, n_features=5, random_state=1)
+    df = pl.DataFrame(X, schema=[f"f{i}" for i in range(X.shape[1])])
+    return df.with_columns(
+        pl.Series("target", y),
+        pl.Series("date", [DEBUT + timedelta(days=i) for i in range(n)]),
+        pl.lit("A").alias("player1_name"),
+        pl.lit("B").alias("player2_name"),
+    )
+
+
+def test_incremental_fit_ajoute_des_arbres():
+    df = dataset()
+    X, y = features_and_target(df)
+    assert X.shape == (300, 5)
+
+    foret = RandomForestClassifier(n_estimators=20, random_state=1).fit(X[:200], y[:200])
+    incremental_fit(foret, X[200:], y[200:], n_seen=200)
+    assert len(foret.estimators_) == 30
+    assert foret.get_params()["warm_start"] is False
+
+    boosting = GradientBoostingClassifier(n_estimators=20, random_state=1).fit(X[:200], y[:200])
+    incremental_fit(boosting, X[200:], y[200:], n_seen=200)
+    assert len(boosting.estimators_) == 30
+
+    modele = xgb.XGBClassifier(n_estimators=40).fit(X[:200], y[:200])
+    incremental_fit(modele, X[200:], y[200:], n_seen=200)
+    assert modele.get_booster().num_boosted_rounds() == 60
+    assert modele.get_params()["n_estimators"] == 60
+    # La mise à jour suivante part du nombre total d'arbres
+    incremental_fit(modele, X[:150], y[:150], n_seen=300)
+    assert modele.get_booster().num_boosted_rounds() == 90
+
+
+def test_full_retrain_reason():
+    df = dataset()
+    manifest = {"versions": []}
+    assert full_retrain_reason(manifest, DEBUT) is not None
+
+    record_version(manifest, df, "search", KNeighborsClassifier(), accuracy=0.8, today=DEBUT)
+    assert full_retrain_reason(manifest, DEBUT + timedelta(days=1), 0.78) is None
+    assert "baisse" in full_retrain_reason(manifest, DEBUT + timedelta(days=1), 0.7)
+    assert "jours" in full_retrain_reason(manifest, DEBUT + timedelta(days=FULL_RETRAIN_DAYS))
+
+
+def test_retrain(tmp_path):
+    df = dataset()
+    model_path, manifest_path = str(tmp_path / "model.joblib"), str(tmp_path / "model.json")
+    ancien = df.head(200)
+    X, y = features_and_target(ancien)
+    dump(RandomForestClassifier(n_estimators=20, random_state=1).fit(X, y), model_path)
+    manifest = load_manifest(manifest_path)
+    record_version(manifest, ancien, "search", load(model_path), accuracy=0.5, today=DEBUT)
+    save_manifest(manifest, manifest_path)
+
+    assert new_rows(df, manifest).height == 100
+    # Dates du dataset propre au format 'DD.MM.YY'
+    assert new_rows(df.with_columns(pl.col("date").dt.strftime("%d.%m.%y")), manifest).height == 100
+
+    version = retrain(df, model_path, manifest_path, today=DEBUT + timedelta(days=1))
+    assert version["mode"] == "incremental"
+    assert version["n_rows"] == 300
+    assert len(load(model_path).estimators_) == 30
+    assert retrain(df, model_path, manifest_path, today=DEBUT + timedelta(days=1)) is None
+
+    plus = dataset(350)
+    version = retrain(plus, model_path, manifest_path, today=DEBUT + timedelta(days=1), force_full=True)
+    assert version["mode"] == "full"
+    modele = load(model_path)
+    # Réentraînement complet avec les hyperparamètres de la recherche
+    assert len(modele.estimators_) == 20
+    assert modele.predict(features_and_target(plus)[0][:5]).shape == (5,)
+    assert [v["mode"] for v in load_manifest(manifest_path)["versions"]] == ["search", "incremental", "full"]
+
+
+def test_new_rows_meme_date():
+    df = dataset(10)
+    manifest = {"versions": []}
+    record_version(manifest, df, "search", KNeighborsClassifier(), today=DEBUT)
+
+    # Match du même jour que la dernière ligne vue, ajouté après l'entraînement
+    meme_jour = df.tail(1).with_columns(pl.lit("C").alias("player2_name"))
+    plus = pl.concat([df, meme_jour, dataset(11).tail(1)])
+    nouveaux = new_rows(plus, manifest)
+    assert nouveaux.select("player2_name", "date").rows() == [
+        ("C", DEBUT + timedelta(days=9)),
+        ("B", DEBUT + timedelta(days=10)),
+    ]
+    assert new_rows(df, manifest).is_empty()
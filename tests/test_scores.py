@@ -0,0 +1,86 @@
+import polars as pl
+import pytest
+from src.preprocessing.scores import parse_sets, summarize_matches, win_rates_asof
+from src.preprocessing.preprocessing import (
+    build_win_rates_lookup,
+    calculate_win_rates,
+    filter_matches_before_date,
+)
+
+
+def test_parse_sets():
+    matches = pl.DataFrame(
+        {
+            "score": ["7-64, 6-3", "6-4, 3-6, 6-2"],
+            "resultat": ["défaite", "victoire"],
+        }
+    )
+    sets = parse_sets(matches)
+
+    assert sets["match_index"].to_list() == [0, 0, 1, 1, 1]
+    assert sets["set_number"].to_list() == [1, 2, 1, 2, 3]
+    assert sets["games_won"].to_list() == [6, 3, 6, 3, 6]
+    assert sets["games_lost"].to_list() == [7, 6, 4, 6, 2]
+    assert sets["tiebreak"].to_list() == [True, False, False, False, False]
+
+
+def test_summarize_matches_abandon():
+    matches = pl.DataFrame(
+        {
+            "score": ["6-7, 7-5, 6-4", "6-3, 2-0 ret.", "w.o.", ""],
+            "resultat": ["défaite", "victoire", "victoire", "défaite"],
+        }
+    )
+    summary = summarize_matches(matches)
+
+    assert summary["nb_sets"].to_list() == [3, 2, 0, 0]
+    assert summary["has_tiebreak"].to_list() == [True, False, False, False]
+    assert summary["retired"].to_list() == [False, True, True, False]
+    assert summary["won"].to_list() == [False, True, True, False]
+
+
+def test_calculate_win_rates_tiebreak_perdu():
+    matches = [
+        {"resultat": "défaite", "score": "6-7, 7-5, 6-4"},
+        {"resultat": "victoire", "score": "6-3, 6-4"},
+    ]
+    win_rates = calculate_win_rates(matches)
+    assert win_rates == pytest.approx(
+        {"win_rate": 0.5, "win_rate_3_sets": 0.0, "win_rate_tiebreak": 0.0}
+    )
+
+
+def test_win_rates_asof_exclut_la_date_courante():
+    summary = summarize_matches(
+        pl.DataFrame(
+            {
+                "player": ["A", "A", "A", "B"],
+                "date": ["01.01.24", "05.01.24", "05.01.24", "05.01.24"],
+                "score": ["7-6, 6-4", "6-4, 6-4", "6-4, 4-6, 6-3", "6-4, 6-4"],
+                "resultat": ["victoire", "défaite", "victoire", "victoire"],
+            }
+        )
+    )
+    table = win_rates_asof(summary).sort("player", "date")
+
+    assert table.select("player", "date").rows() == [
+        ("A", "01.01.24"),
+        ("A", "05.01.24"),
+        ("B", "05.01.24"),
+    ]
+    assert table["win_rate"].to_list() == [0.0, 1.0, 0.0]
+    assert table["win_rate_tiebreak"].to_list() == [0.0, 1.0, 0.0]
+
+
+def test_build_win_rates_lookup_coherent():
+    matchs = [
+        {"date": "10.10.24", "score": "7-64, 6-3", "resultat": "victoire"},
+        {"date": "01.09.24", "score": "6-4, 3-6, 6-2", "resultat": "défaite"},
+        {"date": "01.08.24", "score": "6-7, 6-3, 7-6", "resultat": "victoire"},
+    ]
+    lookup = build_win_rates_lookup({"Player 1": {"matchs": matchs}})
+
+    for match in matchs:
+        precedents = filter_matches_before_date(matchs, match["date"])
+        attendu = calculate_win_rates(precedents)
+        assert lookup[("Player 1", match["date"])] == pytest.approx(attendu)
@@ -0,0 +1,57 @@
+from datetime import date
+import polars as pl
+from src.preprocessing.tournaments import (
+    add_tournament_metadata,
+    build_tournament_table,
+    normalize_tournament_name,
+    tournament_category,
+)
+
+
+def test_normalize_tournament_name():
+    assert (
+        normalize_tournament_name("Shanghai Rolex Masters - Shanghai / $10.2M")
+        == "shanghai rolex masters shanghai"
+    )
+
+
+def test_tournament_category():
+    assert tournament_category("Shanghai Rolex Masters - Shanghai / $10.2M") == 3
+    assert tournament_category("Roland Garros - Paris / €53.5M") == 4
+    assert tournament_category("Rolex Paris Masters - Paris / €5.7M") == 3
+    assert tournament_category("BNP Paribas Masters - Paris") == 3
+    assert tournament_category("Paris Bercy - Paris") == 3
+    assert tournament_category("Queen's Club Championships - London / €2.5M") == 2
+
+
+def test_tournament_category_evenements_mineurs():
+    # "paris" ou "halle" (dans "challenger") ne suffisent plus
+    assert tournament_category("Olympics - Paris") == 1
+    assert tournament_category("Paris Challenger - Paris / €100K") == 1
+    assert tournament_category("Open Parc - Paris / €600K") == 1
+    assert tournament_category("Challenger Lyon - Lyon / €100K") == 1
+    assert tournament_category("Jerome Open") == 1
+
+
+def test_build_tournament_table_et_jointure():
+    matches = pl.DataFrame(
+        {
+            "lien_detail_match": ["m1", "m2", "m3"],
+            "tournoi": ["Wimbledon - London", "Wimbledon - London", "Unknown Cup"],
+            "surface": ["gazon", "gazon", "dure"],
+            "date": [date(2023, 7, 10), date(2024, 7, 1), date(2024, 3, 1)],
+        }
+    )
+    tournaments = build_tournament_table(matches)
+
+    assert tournaments["tournoi"].to_list() == ["Unknown Cup", "Wimbledon - London"]
+    wimbledon = tournaments.row(1, named=True)
+    assert wimbledon["tournament_category"] == 4
+    assert wimbledon["tournament_surface"] == "gazon"
+    assert wimbledon["typical_month"] == 7
+    assert (wimbledon["first_date"], wimbledon["last_date"]) == (date(2023, 7, 10), date(2024, 7, 1))
+
+    joined = add_tournament_metadata(matches, tournaments.head(1))
+    assert joined["lien_detail_match"].to_list() == ["m1", "m2", "m3"]
+    assert joined["tournament_category"].to_list() == [1, 1, 1]
+    assert add_tournament_metadata(matches, tournaments)["tournament_category"].to_list() == [4, 4, 1]